@@ -9,13 +9,28 @@ import pickle
 import sys
 sys.path.append(r'C:\Users\herna\AppData\Roaming\Python\Python312\site-packages')
 
-import requests
 from datetime import datetime
-import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from scripts.json_backend import load
+from scripts.json_io import write_json, leer_json, configurar_salida_desde_argv, reporte_tamanos
+from scripts.dimensiones import BOTTOM_POSITIONS, compactar_v2, posiciones_pendientes
+from scripts.asset_manifest import publicar_hasheados
+from scripts.async_probe import sondear as sondear_async
+from scripts.dimension_cache import (armar_dimensiones, cargar_cache, entrada as entrada_cache,
+                                     guardar_cache, planificar)
 
 SCOPES = ['https://www.googleapis.com/auth/drive.readonly']
 
+# Campos del listado de Drive: además de los datos del archivo, las dimensiones reales
+# (imageMediaMetadata), el tamaño y el md5, así no hace falta pedir cada imagen aparte
+CAMPOS_ARCHIVO = 'id, name, webViewLink, modifiedTime, size, md5Checksum, imageMediaMetadata(width, height, rotation)'
+CAMPOS_METADATOS = 'id, modifiedTime, size, md5Checksum, imageMediaMetadata(width, height, rotation)'
+COLUMNAS_METADATOS = ['ancho', 'alto', 'rotacion', 'tamano', 'md5', 'modificado']
+# Marca de las filas cuyos metadatos ya salieron de un listado de Drive (aunque Drive no
+# haya informado dimensiones): completar_metadatos_excel no las vuelve a pedir
+COLUMNA_LISTADO = 'metadatos_listados'
+EXCEL_IMAGENES = 'imagenes_drive.xlsx'
+
 
 TIMESTAMP_FILE = './json/ultimo_scan.json'
 
@@ -23,15 +38,13 @@ def cargar_ultimo_timestamp():
     # Si el archivo no existe, es el primer escaneo: traemos todo
     if not os.path.exists(TIMESTAMP_FILE):
         return None
-    with open(TIMESTAMP_FILE, 'r') as f:
-        data = json.load(f)
+    data = load(TIMESTAMP_FILE)
     # Devuelve el string de fecha guardado, ej: "2025-04-29T14:41:23.847Z"
     return data.get('ultimo_modified_time', None)
 
 def guardar_ultimo_timestamp(timestamp_str):
     # Guarda el modifiedTime más reciente encontrado en Drive
-    with open(TIMESTAMP_FILE, 'w') as f:
-        json.dump({'ultimo_modified_time': timestamp_str}, f, indent=2)
+    write_json(TIMESTAMP_FILE, {'ultimo_modified_time': timestamp_str}, indent=2)
     print(f"Timestamp guardado: {timestamp_str}")
 
 # def obtener_credenciales():
@@ -90,6 +103,95 @@ def obtener_credenciales():
     return credenciales
 
 
+def metadatos_archivo(archivo):
+    """
+    Columnas de metadatos de un archivo del listado de Drive. El ancho y alto se
+    devuelven ya orientados: con rotación de 90° o 270° se intercambian.
+    """
+    meta = archivo.get('imageMediaMetadata') or {}
+    ancho, alto = meta.get('width'), meta.get('height')
+    rotacion = meta.get('rotation') or 0
+    if ancho and alto and rotacion % 2 == 1:
+        ancho, alto = alto, ancho
+    return {
+        'ancho': ancho,
+        'alto': alto,
+        'rotacion': rotacion,
+        'tamano': int(archivo['size']) if archivo.get('size') else None,
+        'md5': archivo.get('md5Checksum'),
+        'modificado': archivo.get('modifiedTime'),
+    }
+
+
+def listar_metadatos_drive(service, carpeta_id):
+    """Listado liviano de todas las imágenes con sus metadatos: {id: columnas}"""
+    metadatos = {}
+    page_token = None
+    while True:
+        response = service.files().list(
+            q=f"'{carpeta_id}' in parents and (mimeType contains 'image/')",
+            spaces='drive',
+            fields=f'nextPageToken, files({CAMPOS_METADATOS})',
+            pageSize=1000,
+            pageToken=page_token
+        ).execute()
+        for archivo in response.get('files', []):
+            metadatos[archivo['id']] = metadatos_archivo(archivo)
+        page_token = response.get('nextPageToken', None)
+        if page_token is None:
+            return metadatos
+
+
+def completar_metadatos_excel(service, carpeta_id, excel_path=EXCEL_IMAGENES):
+    """
+    Los escaneos incrementales solo listan archivos modificados: las filas que se
+    agregaron antes de guardar metadatos se completan una vez con un listado completo.
+    Después quedan marcadas en COLUMNA_LISTADO y no se vuelven a pedir, tengan o no
+    dimensiones en Drive.
+    """
+    df = pd.read_excel(excel_path)
+    faltantes = df[COLUMNA_LISTADO].isna() if COLUMNA_LISTADO in df.columns else pd.Series(True, index=df.index)
+    if not faltantes.any():
+        return
+    print(f"Completando metadatos de Drive para {int(faltantes.sum())} imágenes...")
+    metadatos = listar_metadatos_drive(service, carpeta_id)
+    for columna in COLUMNAS_METADATOS:
+        valores = df['id'].map(lambda drive_id: metadatos.get(drive_id, {}).get(columna))
+        df[columna] = df[columna].where(~faltantes, valores) if columna in df.columns else valores
+    df[COLUMNA_LISTADO] = True
+    df.to_excel(excel_path, index=False)
+
+
+def cargar_metadatos_drive(excel_path=EXCEL_IMAGENES):
+    """
+    {drive_id: {'width', 'height', 'size', 'md5', 'modifiedTime'}} según imagenes_drive.xlsx.
+    width/height quedan en None si Drive no informó las dimensiones.
+    """
+    if not os.path.exists(excel_path):
+        return {}
+    df = pd.read_excel(excel_path)
+    if 'ancho' not in df.columns:
+        return {}
+
+    def valor(v, tipo=None):
+        if pd.isna(v):
+            return None
+        return tipo(v) if tipo else v
+
+    columnas = zip(df['id'].tolist(), df['ancho'].tolist(), df['alto'].tolist(),
+                   df['tamano'].tolist(), df['md5'].tolist(), df['modificado'].tolist())
+    return {
+        drive_id: {
+            'width': valor(ancho, int) or None,
+            'height': valor(alto, int) or None,
+            'size': valor(tamano, int),
+            'md5': valor(md5),
+            'modifiedTime': valor(modificado),
+        }
+        for drive_id, ancho, alto, tamano, md5, modificado in columnas
+    }
+
+
 def escanear_carpeta(carpeta_id, verificar_eliminaciones=False):
     credenciales = obtener_credenciales()
     service = build('drive', 'v3', credentials=credenciales)
@@ -116,7 +218,8 @@ def escanear_carpeta(carpeta_id, verificar_eliminaciones=False):
             response = service.files().list(
                 q=f"'{carpeta_id}' in parents and (mimeType contains 'image/'){filtro_fecha}",
                 spaces='drive',
-                fields='nextPageToken, files(id, name, webViewLink, modifiedTime)',
+                fields=f'nextPageToken, files({CAMPOS_ARCHIVO})',
+                pageSize=1000,
                 pageToken=page_token
             ).execute()
             
@@ -142,7 +245,9 @@ def escanear_carpeta(carpeta_id, verificar_eliminaciones=False):
                     'id': archivo['id'],
                     'link_original': archivo['webViewLink'],
                     'link_vista': f"https://drive.google.com/uc?export=view&id={archivo['id']}",
-                    'articulo': articulo # Nueva columna con el nombre sin extensión
+                    'articulo': articulo, # Nueva columna con el nombre sin extensión
+                    **metadatos_archivo(archivo),  # Dimensiones reales, tamaño y md5
+                    COLUMNA_LISTADO: True
                 })
 
                 # Rastrear el modifiedTime más reciente de este escaneo
@@ -161,7 +266,7 @@ def escanear_carpeta(carpeta_id, verificar_eliminaciones=False):
             break
     
     # Crear DataFrame y exportar a Excel
-    excel_path = 'imagenes_drive.xlsx'
+    excel_path = EXCEL_IMAGENES
     
     if ultimo_timestamp and resultados:
         if os.path.exists(excel_path):
@@ -182,6 +287,12 @@ def escanear_carpeta(carpeta_id, verificar_eliminaciones=False):
     
     if nuevo_timestamp:
         guardar_ultimo_timestamp(nuevo_timestamp)
+
+    if os.path.exists(excel_path):
+        try:
+            completar_metadatos_excel(service, carpeta_id, excel_path)
+        except Exception as e:
+            print(f'No se pudieron completar los metadatos de Drive: {e}')
     
     
     if verificar_eliminaciones and os.path.exists(excel_path):
@@ -234,8 +345,11 @@ def obtener_ids_activos_drive(service, carpeta_id):
 # Añadir este nuevo método al final, antes del código de ejecución
 def generar_json_dimensiones_rapido():
     """
-    Genera un archivo JSON con dimensiones de imágenes usando
-    procesamiento paralelo para máxima velocidad
+    Calcula las dimensiones de las imágenes del catálogo usando
+    procesamiento paralelo para máxima velocidad. Devuelve el contenido de
+    catalogo_dimensiones.json sin escribirlo: lo escribe una sola vez
+    generar_posiciones_bottom_completo(data=...), ya con las posiciones, así
+    el frontend nunca ve imágenes nuevas sin imageType/bottomPosition.
     """
     # Rutas de archivos
     catalogo_path = './json/catalogo_imagenes.json'
@@ -247,15 +361,13 @@ def generar_json_dimensiones_rapido():
         return False
     
     # Cargar catálogo existente
-    with open(catalogo_path, 'r', encoding='utf-8') as file:
-        catalog = json.load(file)
+    catalog = load(catalogo_path)
     
     # Preparar estructura para el archivo de dimensiones
     # Cargar dimensiones existentes si ya hay un archivo previo
     if os.path.exists(dimensiones_path):
-        with open(dimensiones_path, 'r', encoding='utf-8') as file:
-            dimensiones = json.load(file)
-        print(f"Dimensiones existentes cargadas: {len(dimensiones['images_dimensions'])} imágenes ya procesadas")
+        dimensiones = load(dimensiones_path)
+        print(f"Dimensiones existentes cargadas: {len(dimensiones['images_dimensions'])} imágenes")
     else:
         dimensiones = {
             "version": "1.0",
@@ -265,181 +377,115 @@ def generar_json_dimensiones_rapido():
     
     # Obtener el diccionario de imágenes
     images_dict = catalog.get('images', {})
+
+    # Cache por id de Drive + firma (modifiedTime/md5): solo se sondean las imágenes
+    # nuevas o reemplazadas; las que tienen dimensiones en el listado de Drive no se sondean
+    metadatos = cargar_metadatos_drive()
+    cache_anterior = cargar_cache()
+    cache, pendientes = planificar(images_dict, metadatos, cache_anterior)
+    desde_drive = sum(1 for e in cache.values() if e['source'] == 'drive')
+    print(f"Dimensiones: {desde_drive} del listado de Drive, {len(cache) - desde_drive} del cache, "
+          f"{len(pendientes)} a sondear, {len(set(cache_anterior) - set(cache) - set(pendientes))} descartadas")
+    
+    if pendientes:
+        # Sondeo asíncrono de cabeceras (Range de unos KB por imagen): concurrencia acotada,
+        # conexiones reutilizadas, límite de tasa por host y reintentos con backoff.
+        # El progreso sale como eventos JSON (scripts/async_probe.py).
+        urls = {drive_id: f"https://lh3.googleusercontent.com/d/{drive_id}" for drive_id in pendientes}
+        resultados, metricas = sondear_async(urls)
+
+        for drive_id, resultado in resultados.items():
+            if resultado is None:
+                # Formato no reconocido o error: 4:3 por defecto (se reintenta en la próxima corrida)
+                cache[drive_id] = entrada_cache(800, 600, 'default', pendientes[drive_id])
+            else:
+                width, height, _ = resultado
+                cache[drive_id] = entrada_cache(width, height, 'probe', pendientes[drive_id])
+        print(f"Dimensiones sondeadas: {metricas['ok']} ok, {metricas['sin_dimensiones'] + metricas['errores']} "
+              f"con valor por defecto ({metricas['imagenes_por_s']} imágenes/s)")
+
+    # Las imágenes borradas del catálogo salen del archivo; las que no cambiaron quedan igual
+    dimensiones['images_dimensions'] = armar_dimensiones(images_dict, cache, dimensiones['images_dimensions'])
     
-    # Filtrar solo las imágenes que NO están en el archivo de dimensiones
-    ya_procesadas = set(dimensiones['images_dimensions'].keys())
-    images_dict = {k: v for k, v in images_dict.items() if k not in ya_procesadas}
-    total_images = len(images_dict)
-    
-    if total_images == 0:
-        print("No hay imágenes nuevas para procesar en dimensiones")
-        return True
-    
-    print(f"Imágenes nuevas a procesar: {total_images} imágenes para obtener dimensiones...")
-    
-    
-    
-    # Función para procesar una imagen individual
-    def procesar_imagen(code, drive_id):
-        try:
-            # URL de la imagen
-            image_url = f"https://lh3.googleusercontent.com/d/{drive_id}"
-            
-            # Hacer una solicitud HEAD para obtener solo los metadatos
-            # Si esto no funciona, podemos usar valores predeterminados
-            # o estimaciones basadas en proporción común
-            headers = {'User-Agent': 'Mozilla/5.0'}
-            response = requests.head(image_url, headers=headers, timeout=3)
-            
-            # Valores predeterminados basados en proporciones comunes
-            # Estas relaciones de aspecto son muy comunes en fotografías
-            ratios_comunes = [1.33, 1.5, 1.78, 0.75, 1.0] 
-            
-            # Para el propósito de un layout de tipo Pinterest, 
-            # lo importante es la proporción, no el tamaño real
-            width = 800
-            height = int(width / ratios_comunes[code.__hash__() % len(ratios_comunes)])
-            ratio = width / height
-            
-            # Intento adivinando por tipo de contenido
-            content_type = response.headers.get('Content-Type', '')
-            if 'image' in content_type:
-                # Las imágenes pequeñas suelen ser iconos (relación 1:1)
-                # Las grandes suelen ser fotos de productos (proporción 4:3 o 16:9)
-                content_length = int(response.headers.get('Content-Length', '0'))
-                if content_length < 10000:  # Es un icono pequeño
-                    ratio = 1.0 
-                elif content_length > 100000:  # Es una imagen grande
-                    ratio = 1.78  # 16:9
-                else:  # Imagen de tamaño medio
-                    ratio = 1.33  # 4:3
-                    
-                height = int(width / ratio)
-            
-            return code, {
-                "width": width,
-                "height": height,
-                "ratio": round(ratio, 3)
-            }
-            
-        except Exception as e:
-            print(f"Error procesando {code}: {str(e)}")
-            # Valores predeterminados en caso de error
-            return code, {
-                "width": 800,
-                "height": 600,
-                "ratio": 1.333
-            }
-    
-    # Usar procesamiento paralelo con múltiples hilos
-    max_workers = min(32, os.cpu_count() * 4)  # Ajustar según capacidad
-    print(f"Usando {max_workers} workers para procesamiento en paralelo")
-    
-    completed = 0
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Crear tareas para cada imagen
-        futures = {executor.submit(procesar_imagen, code, drive_id): code 
-                  for code, drive_id in images_dict.items()}
-        
-        # Procesar resultados a medida que se completan
-        for future in as_completed(futures):
-            code, dims = future.result()
-            dimensiones["images_dimensions"][code] = dims
-            
-            completed += 1
-            if completed % 50 == 0 or completed == total_images:
-                print(f"Progreso: {completed}/{total_images} imágenes procesadas ({int(completed/total_images*100)}%)")
-    
-    # Guardar el archivo de dimensiones
-    os.makedirs(os.path.dirname(dimensiones_path), exist_ok=True)
-    with open(dimensiones_path, 'w', encoding='utf-8') as file:
-        json.dump(dimensiones, file, indent=2)
-    print(f"Archivo de dimensiones generado con éxito: {dimensiones_path}")
+    guardar_cache(cache)
+    print(f"Dimensiones calculadas: {len(dimensiones['images_dimensions'])} imágenes")
     
-    return True
+    return dimensiones
+
 
+DIMENSIONES_V3_PATH = './json/catalogo_dimensiones_v3.json'
 
-def generar_posiciones_bottom_completo():
+
+def generar_posiciones_bottom_completo(data=None):
     """
-    Toma el archivo catalogo_dimensiones.json generado por generar_json_dimensiones_rapido()
-    y le agrega los campos de posicionamiento del bottom-row
+    Toma las dimensiones calculadas por generar_json_dimensiones_rapido() (`data`; sin
+    ella, el catalogo_dimensiones.json publicado), les agrega los campos de posicionamiento
+    del bottom-row y escribe el archivo una sola vez. Solo se recalculan las imágenes nuevas o cuyo ratio cambió: las demás
+    quedan exactamente como estaban, con su lastCalculated.
     """
     dimensiones_path = './json/catalogo_dimensiones.json'
     
-    # Verificar que existe el archivo base
-    if not os.path.exists(dimensiones_path):
-        print(f"Error: No se encontró {dimensiones_path}")
-        return False
-    
-    # Cargar dimensiones existentes
-    with open(dimensiones_path, 'r', encoding='utf-8') as file:
-        data = json.load(file)
-    
-    # Función para calcular posiciones (igual que la de JavaScript)
-    def calculate_bottom_positions(width, height, ratio):
-        # Determinar tipo de imagen
-        if ratio >= 1.6:
-            image_type = 'very_horizontal'
-        elif ratio >= 1.2:
-            image_type = 'horizontal'
-        elif ratio >= 0.8:
-            image_type = 'square'
-        else:
-            image_type = 'vertical'
-        
-        # Tabla de valores
-        bottom_values = {
-            'very_horizontal': {'mobile': 50, 'tablet': 65, 'desktop': 75},
-            'horizontal':      {'mobile': 55, 'tablet': 64, 'desktop': 74},
-            'square':          {'mobile': 52, 'tablet': 62, 'desktop': 72},
-            'vertical':        {'mobile': 48, 'tablet': 58, 'desktop': 68}
-        }
-        
-        return {
-            'imageType': image_type,
-            'bottomPosition': bottom_values[image_type]
-        }
-    
-    # Procesar cada imagen
-    processed_count = 0
-    for code, dims in data['images_dimensions'].items():
-        # Calcular posiciones
-        positions = calculate_bottom_positions(dims['width'], dims['height'], dims['ratio'])
+    if data is None:
+        # Verificar que existe el archivo base
+        if not os.path.exists(dimensiones_path):
+            print(f"Error: No se encontró {dimensiones_path}")
+            return False
         
-        # Agregar nuevos campos
-        dims['imageType'] = positions['imageType']
-        dims['bottomPosition'] = positions['bottomPosition']
+        # Cargar dimensiones existentes
+        data = load(dimensiones_path)
+    
+    # Clasificación vectorizada de toda la columna de ratios (umbrales y tabla
+    # compartidos con el JavaScript en scripts/dimensiones.py)
+    imagenes = data['images_dimensions']
+    pendientes = posiciones_pendientes(imagenes)
+    
+    # Procesar solo las imágenes nuevas o con ratio cambiado
+    ahora = datetime.now().isoformat()
+    for code, image_type in pendientes.items():
+        dims = imagenes[code]
+        dims['imageType'] = image_type
+        dims['bottomPosition'] = dict(BOTTOM_POSITIONS[image_type])
         dims['autoGenerated'] = True
-        dims['lastCalculated'] = datetime.now().isoformat()
-        
-        processed_count += 1
+        dims['lastCalculated'] = ahora
     
     # Actualizar metadatos
     data['version'] = '2.0'
-    data['lastUpdate'] = datetime.now().isoformat()
+    if pendientes or 'lastUpdate' not in data:
+        data['lastUpdate'] = ahora
     data['description'] = 'Catálogo con dimensiones y posiciones de bottom-row calculadas automáticamente'
     
-    # Guardar archivo actualizado
-    with open(dimensiones_path, 'w', encoding='utf-8') as file:
-        json.dump(data, file, indent=2)
+    # Guardar archivo actualizado (no se toca si no cambió nada)
+    os.makedirs(os.path.dirname(dimensiones_path), exist_ok=True)
+    write_json(dimensiones_path, data, indent=2, conservar=('lastUpdate',))
+
+    # Versión compacta v3 (tablas una sola vez, [ratio, tipo] por imagen)
+    write_json(DIMENSIONES_V3_PATH, compactar_v2(data), minificar=True)
     
-    print(f"✅ Posiciones calculadas para {processed_count} imágenes")
-    print(f"✅ Archivo actualizado: {dimensiones_path}")
+    print(f"✅ Posiciones calculadas para {len(pendientes)} imágenes ({len(imagenes) - len(pendientes)} sin cambios)")
+    print(f"✅ Archivo actualizado: {dimensiones_path} (compacto: {DIMENSIONES_V3_PATH})")
     return True
 
 # Uso del script
 ID_CARPETA = '1cBGnmG32LEJe1IOhhueV1hW-Qk1tdnDS'  # ID de la carpeta de Google Drive
-import sys
-limpiar = '--limpiar' in sys.argv
-archivo_excel = escanear_carpeta(ID_CARPETA, limpiar)
 
-#AGREUE 25-3-25
-# Agregar esta línea para ejecutar el nuevo método
-print("\nGenerando archivo de dimensiones de imágenes...")
-generar_json_dimensiones_rapido()
+# Solo escanear al ejecutar el script: scripts/build_manifest.py importa las etapas sin disparar el escaneo
+if __name__ == '__main__':
+    limpiar = '--limpiar' in sys.argv
+    configurar_salida_desde_argv(sys.argv)  # --minify / --precompress
+    archivo_excel = escanear_carpeta(ID_CARPETA, limpiar)
+
+    #AGREUE 25-3-25
+    # Agregar esta línea para ejecutar el nuevo método
+    print("\nCalculando dimensiones de imágenes...")
+    dimensiones = generar_json_dimensiones_rapido()
+
+    # AGREGAR AQUÍ - NUEVA FUNCIÓN
+    print("\nGenerando posiciones de bottom-row automáticamente...")
+    generar_posiciones_bottom_completo(dimensiones or None)
+    publicar_hasheados()  # Copias con hash en el nombre + json/manifest.json
 
-# AGREGAR AQUÍ - NUEVA FUNCIÓN
-print("\nGenerando posiciones de bottom-row automáticamente...")
-generar_posiciones_bottom_completo()
+    if '--size-report' in sys.argv:
+        reporte_tamanos(['json/catalogo_imagenes.json', 'json/catalogo_dimensiones.json',
+                         'json/catalogo_dimensiones_v3.json'])
 
 # FIN DEL ARCHIVO
\ No newline at end of file
@@ -0,0 +1,43 @@
+/**
+ * Lectura de productos_columnar.json (exportación por columnas de productos.json)
+ * @module productosColumnar
+ */
+
+/**
+ * Reconstruye la forma de productos.json a partir de los arreglos paralelos
+ * @param {Object} data - Contenido de productos_columnar.json
+ * @returns {Object} { codigo: { name, category, bulk, prices: { D, E, F } } }
+ */
+export function expandProductosColumnar(data) {
+  const { codes, names, categories, category, bulk, prices } = data;
+  const listas = Object.keys(prices);
+  const productos = {};
+  for (let i = 0; i < codes.length; i++) {
+    const precios = {};
+    for (const lista of listas) {
+      precios[lista] = prices[lista][i];
+    }
+    productos[codes[i]] = {
+      name: names[i],
+      category: categories[category[i]],
+      bulk: bulk[i],
+      prices: precios
+    };
+  }
+  return productos;
+}
+
+/**
+ * Descarga productos_columnar.json y lo devuelve con la forma de productos.json
+ * @param {string} [url] - Ruta del archivo por columnas
+ * @returns {Promise<Object>}
+ */
+export async function loadProductosColumnar(url = './json/productos_columnar.json') {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`No se pudo cargar ${url}: ${response.status}`);
+  }
+  return expandProductosColumnar(await response.json());
+}
+
+export default loadProductosColumnar;
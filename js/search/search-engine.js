@@ -1741,15 +1741,39 @@ function displayNoResults(query) {
     initSearch();
 
     
+    // Carga catalogo_dimensiones y lo deja con la forma v2 ({ images_dimensions: { codigo: { bottomPosition } } })
+    async function loadCatalogoDimensiones() {
+        try {
+            const response = await fetch('./json/catalogo_dimensiones_v3.json');
+            if (response.ok) {
+                const compacto = await response.json();
+                const posiciones = compacto.bottomPositions.map(fila =>
+                    Object.fromEntries(compacto.breakpoints.map((bp, i) => [bp, fila[i]])));
+                const images_dimensions = {};
+                for (const [codigo, [ratio, tipo]] of Object.entries(compacto.images)) {
+                    images_dimensions[codigo] = {
+                        ratio,
+                        imageType: compacto.types[tipo],
+                        bottomPosition: posiciones[tipo]
+                    };
+                }
+                return { version: compacto.version, images_dimensions };
+            }
+        } catch (error) {
+            console.warn('catalogo_dimensiones_v3.json no disponible, usando v2:', error);
+        }
+        const response = await fetch('./json/catalogo_dimensiones.json');
+        return response.json();
+    }
+
     // AGREGAR AQUÍ - // Función mejorada para ajustar posición del bottom-row basada en patrones
     // Función mejorada que usa datos del JSON catalogo_dimensiones.json
     async function adjustBottomRowPositions() {
     try {
         console.log('🔧 EJECUTANDO adjustBottomRowPositions...');
         
-        // 1. Cargar JSON
-        const response = await fetch('./json/catalogo_dimensiones.json');
-        const catalogoDimensiones = await response.json();
+        // 1. Cargar JSON (formato compacto v3 si está publicado; si no, el v2 completo)
+        const catalogoDimensiones = await loadCatalogoDimensiones();
         console.log('✅ JSON cargado en adjustBottomRowPositions');
         
         // 2. Detectar breakpoint
@@ -0,0 +1,69 @@
+# scripts/asset_manifest.py
+"""
+Publicación de los JSON con nombre según su contenido.
+
+Cada dataset de json/ se copia además a json/hashed/<nombre>.<hash>.json,
+donde <hash> son los primeros 10 caracteres del SHA-256 del contenido. Como
+el nombre cambia cuando cambia el contenido, esos archivos se pueden servir
+como inmutables (Cache-Control: max-age=31536000, immutable). json/manifest.json
+mapea el nombre lógico al archivo actual y es lo único que hay que revalidar:
+
+    {"version": "...", "files": {"productos.json": "hashed/productos.1a2b3c4d5e.json", ...}}
+
+Se conservan también los archivos del manifiesto anterior, para las páginas
+que lo cargaron justo antes del deploy; los más viejos se borran.
+"""
+import hashlib
+import os
+
+from scripts.json_io import write_json, leer_json, escribir_atomico
+
+JSON_DIR = 'json'
+HASHED_DIR = os.path.join(JSON_DIR, 'hashed')
+MANIFEST_PATH = os.path.join(JSON_DIR, 'manifest.json')
+
+# Nombres lógicos publicados (relativos a json/)
+ASSETS = [
+    'productos.json', 'clientes_permisos.json', 'grupos_clientes.json', 'promociones.json',
+    'margenes_clientes.json', 'catalogo_grupos.json', 'catalogo_imagenes.json',
+    'catalogo_dimensiones.json', 'catalogo_dimensiones_v3.json', 'clientes_finanzas.json',
+    'funcionalidades.json', 'funcionalidades_usuarios.json', 'productos_columnar.json',
+]
+
+
+def nombre_hasheado(nombre, contenido):
+    base, extension = os.path.splitext(nombre)
+    return f'{base}.{hashlib.sha256(contenido).hexdigest()[:10]}{extension}'
+
+
+def publicar_hasheados(assets=None):
+    """
+    Copia cada asset existente a json/hashed/ con su hash en el nombre y
+    actualiza json/manifest.json. Devuelve el manifiesto.
+    """
+    anterior = leer_json(MANIFEST_PATH, {}) or {}
+    archivos = {}
+    for nombre in assets or ASSETS:
+        path = os.path.join(JSON_DIR, nombre)
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            contenido = f.read()
+        hasheado = os.path.join(HASHED_DIR, nombre_hasheado(nombre, contenido))
+        if not os.path.exists(hasheado):
+            escribir_atomico(hasheado, contenido)
+        archivos[nombre] = os.path.relpath(hasheado, JSON_DIR).replace(os.sep, '/')
+
+    version = hashlib.sha256(''.join(f'{k}={v};' for k, v in sorted(archivos.items())).encode('utf-8')).hexdigest()[:12]
+    manifest = {'version': version, 'files': archivos}
+    write_json(MANIFEST_PATH, manifest, indent=2)
+
+    # Se conservan los archivos del manifiesto actual y del anterior
+    vigentes = set(archivos.values()) | set((anterior.get('files') or {}).values())
+    if os.path.isdir(HASHED_DIR):
+        for archivo in os.listdir(HASHED_DIR):
+            relativo = f'hashed/{archivo}'
+            if relativo not in vigentes and not archivo.startswith('.'):
+                os.remove(os.path.join(HASHED_DIR, archivo))
+    print(f'Manifiesto de assets actualizado: {len(archivos)} archivos (versión {version})')
+    return manifest
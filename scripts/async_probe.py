@@ -0,0 +1,201 @@
+# scripts/async_probe.py
+"""
+Sondeo asíncrono de dimensiones de muchas imágenes (image_probe.sondear_imagen).
+
+- Concurrencia acotada: como mucho `concurrencia` imágenes en vuelo.
+- Conexiones reutilizadas: una sola requests.Session con un pool del tamaño
+  de la concurrencia (los pedidos corren en un pool de hilos propio; el
+  repo ya usa requests y así no se suma otra dependencia HTTP).
+- Límite de tasa por host con un token bucket (`tasa_por_host` pedidos/s,
+  ráfagas de hasta `rafaga`).
+- Reintentos con backoff exponencial y jitter completo ante 429, 5xx,
+  timeouts y errores de conexión; se respeta Retry-After si viene.
+- Métricas estructuradas: eventos JSON de una línea ('progreso' cada
+  `intervalo` segundos y 'fin'), con contadores por estado HTTP y tasa.
+"""
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from scripts.image_probe import sondear_imagen
+from scripts.json_backend import dumps
+
+CONCURRENCIA = 16
+TASA_POR_HOST = 20.0
+RAFAGA = 20
+REINTENTOS = 4
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 16.0
+TIMEOUT = 10
+INTERVALO_METRICAS = 5.0
+
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Token bucket: `tasa` tokens por segundo, acumulando hasta `capacidad`"""
+
+    def __init__(self, tasa, capacidad):
+        self.tasa = tasa
+        self.capacidad = capacidad
+        self.tokens = capacidad
+        self.ultimo = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def adquirir(self):
+        async with self.lock:
+            while True:
+                ahora = time.monotonic()
+                self.tokens = min(self.capacidad, self.tokens + (ahora - self.ultimo) * self.tasa)
+                self.ultimo = ahora
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.tasa)
+
+
+class Metricas:
+    """Contadores del sondeo; snapshot() devuelve un evento listo para serializar"""
+
+    def __init__(self, total):
+        self.total = total
+        self.inicio = time.monotonic()
+        self.contadores = {'pedidos': 0, 'completadas': 0, 'ok': 0, 'sin_dimensiones': 0,
+                           'errores': 0, 'reintentos': 0, 'en_curso': 0}
+        self.estados = {}
+
+    def sumar(self, clave, cantidad=1):
+        self.contadores[clave] += cantidad
+
+    def estado(self, codigo):
+        self.estados[str(codigo)] = self.estados.get(str(codigo), 0) + 1
+
+    def snapshot(self, evento):
+        transcurrido = time.monotonic() - self.inicio
+        return dict(
+            evento=evento,
+            total=self.total,
+            transcurrido_s=round(transcurrido, 3),
+            imagenes_por_s=round(self.contadores['completadas'] / transcurrido, 2) if transcurrido else 0.0,
+            estados_http=dict(self.estados),
+            **self.contadores,
+        )
+
+
+def reportar_json(evento):
+    """Reporte por defecto: una línea JSON por evento"""
+    print(dumps(evento, minificar=True, ensure_ascii=False))
+
+
+def espera_backoff(intento, base=BACKOFF_BASE, maximo=BACKOFF_MAX, retry_after=None):
+    """Backoff exponencial con jitter completo; Retry-After (segundos) manda si es mayor"""
+    espera = random.uniform(0, min(maximo, base * 2 ** intento))
+    if retry_after:
+        try:
+            espera = max(espera, min(maximo, float(retry_after)))
+        except ValueError:
+            pass  # Retry-After con fecha HTTP: se usa el backoff
+    return espera
+
+
+def crear_sesion(concurrencia=CONCURRENCIA):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=concurrencia)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+async def _sondear_con_reintentos(clave, url, contexto):
+    metricas = contexto['metricas']
+    bucket = contexto['buckets'].setdefault(
+        urlsplit(url).netloc, TokenBucket(contexto['tasa_por_host'], contexto['rafaga']))
+    loop = asyncio.get_running_loop()
+
+    for intento in range(contexto['reintentos'] + 1):
+        await bucket.adquirir()
+        metricas.sumar('pedidos')
+        retry_after = None
+        estados = []  # lo llena el hilo; se vuelca a las métricas desde el loop
+        try:
+            resultado = await loop.run_in_executor(
+                contexto['executor'], sondear_imagen, contexto['session'], url, contexto['timeout'], estados)
+            for codigo in estados:
+                metricas.estado(codigo)
+            return resultado
+        except requests.HTTPError as e:
+            codigo = e.response.status_code if e.response is not None else 0
+            metricas.estado(codigo)
+            if codigo not in ESTADOS_REINTENTABLES:
+                raise
+            retry_after = e.response.headers.get('Retry-After')
+        except (requests.ConnectionError, requests.Timeout):
+            metricas.estado('conexion')
+        if intento == contexto['reintentos']:
+            raise RuntimeError(f'{clave}: sin respuesta válida tras {intento + 1} intentos')
+        metricas.sumar('reintentos')
+        await asyncio.sleep(espera_backoff(intento, contexto['backoff_base'], contexto['backoff_max'], retry_after))
+
+
+async def _reportar_periodicamente(metricas, reportar, intervalo):
+    while True:
+        await asyncio.sleep(intervalo)
+        reportar(metricas.snapshot('progreso'))
+
+
+async def sondear_todas(urls, concurrencia=CONCURRENCIA, tasa_por_host=TASA_POR_HOST, rafaga=RAFAGA,
+                        reintentos=REINTENTOS, backoff_base=BACKOFF_BASE, backoff_max=BACKOFF_MAX,
+                        timeout=TIMEOUT, session=None, reportar=reportar_json, intervalo=INTERVALO_METRICAS):
+    """
+    Sondea {clave: url} y devuelve ({clave: (ancho, alto, formato) o None}, métricas finales).
+    Una imagen que falla (error no reintentable o reintentos agotados) queda en None.
+    """
+    propia = session is None
+    session = session or crear_sesion(concurrencia)
+    metricas = Metricas(len(urls))
+    semaforo = asyncio.Semaphore(concurrencia)
+    contexto = {
+        'session': session, 'metricas': metricas, 'buckets': {}, 'timeout': timeout,
+        'tasa_por_host': tasa_por_host, 'rafaga': rafaga, 'reintentos': reintentos,
+        'backoff_base': backoff_base, 'backoff_max': backoff_max,
+        'executor': ThreadPoolExecutor(max_workers=concurrencia),
+    }
+    resultados = {}
+
+    async def una(clave, url):
+        async with semaforo:
+            metricas.sumar('en_curso')
+            try:
+                resultado = await _sondear_con_reintentos(clave, url, contexto)
+                metricas.sumar('ok' if resultado else 'sin_dimensiones')
+            except Exception as e:
+                resultado = None
+                metricas.sumar('errores')
+                reportar({'evento': 'error', 'clave': clave, 'error': str(e)})
+            finally:
+                metricas.sumar('en_curso', -1)
+                metricas.sumar('completadas')
+            resultados[clave] = resultado
+
+    reporte = asyncio.create_task(_reportar_periodicamente(metricas, reportar, intervalo))
+    try:
+        await asyncio.gather(*(una(clave, url) for clave, url in urls.items()))
+    finally:
+        reporte.cancel()
+        contexto['executor'].shutdown(wait=False)
+        if propia:
+            session.close()
+
+    final = metricas.snapshot('fin')
+    reportar(final)
+    return resultados, final
+
+
+def sondear(urls, **opciones):
+    """Versión sincrónica de sondear_todas (para llamar desde código no async)"""
+    return asyncio.run(sondear_todas(urls, **opciones))
@@ -0,0 +1,90 @@
+# scripts/benchmark_json.py
+"""
+Compara la biblioteca estándar json con el backend rápido (orjson) sobre
+los archivos reales de json/: tiempo de lectura, tiempo de escritura con el
+formato publicado (indent=2, ensure_ascii según el archivo) y si ambos
+backends producen exactamente los mismos bytes.
+
+Uso (desde la raíz del repo):
+    python scripts/benchmark_json.py               # todos los json/*.json
+    python scripts/benchmark_json.py json/productos.json --repeticiones 10
+"""
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts import json_backend
+
+
+def _medir(funcion, repeticiones):
+    """Mejor tiempo (segundos) de `repeticiones` ejecuciones"""
+    mejor = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        transcurrido = time.perf_counter() - inicio
+        mejor = transcurrido if mejor is None else min(mejor, transcurrido)
+    return mejor, resultado
+
+
+def _con_backend(nombre, funcion):
+    anterior = os.environ.get('JSON_BACKEND')
+    os.environ['JSON_BACKEND'] = nombre
+    try:
+        return funcion()
+    finally:
+        if anterior is None:
+            del os.environ['JSON_BACKEND']
+        else:
+            os.environ['JSON_BACKEND'] = anterior
+
+
+def comparar(path, repeticiones=5):
+    with open(path, 'rb') as f:
+        contenido = f.read()
+    ensure_ascii = contenido.isascii()
+    fila = {'archivo': path, 'bytes': len(contenido)}
+    salidas = {}
+    for nombre in ('json', 'orjson'):
+        lectura, data = _con_backend(nombre, lambda: _medir(lambda: json_backend.loads(contenido), repeticiones))
+        escritura, salida = _con_backend(nombre, lambda: _medir(
+            lambda: json_backend.dumps_bytes(data, indent=2, ensure_ascii=ensure_ascii), repeticiones))
+        fila[f'{nombre}_lectura'] = lectura
+        fila[f'{nombre}_escritura'] = escritura
+        salidas[nombre] = salida
+    fila['iguales'] = salidas['json'] == salidas['orjson']
+    return fila
+
+
+def main():
+    if json_backend.orjson is None:
+        print('orjson no está instalado (pip install orjson): solo hay biblioteca estándar para comparar')
+        return
+
+    args = sys.argv[1:]
+    repeticiones = 5
+    if '--repeticiones' in args:
+        indice = args.index('--repeticiones')
+        repeticiones = int(args[indice + 1])
+        del args[indice:indice + 2]
+    paths = args or sorted(glob.glob('json/*.json'))
+
+    print(f'{"Archivo":40} {"KB":>8} {"lee json":>9} {"lee orjson":>10} {"escribe json":>12} '
+          f'{"escribe orjson":>14} {"iguales":>8}')
+    total = {'json': 0.0, 'orjson': 0.0}
+    for path in paths:
+        fila = comparar(path, repeticiones)
+        for nombre in total:
+            total[nombre] += fila[f'{nombre}_lectura'] + fila[f'{nombre}_escritura']
+        print(f'{path:40} {fila["bytes"] / 1024:8.0f} {fila["json_lectura"] * 1000:7.1f}ms '
+              f'{fila["orjson_lectura"] * 1000:8.1f}ms {fila["json_escritura"] * 1000:10.1f}ms '
+              f'{fila["orjson_escritura"] * 1000:12.1f}ms {"sí" if fila["iguales"] else "NO":>8}')
+    if total['orjson']:
+        print(f'\nTotal lectura+escritura: json {total["json"]:.3f}s, orjson {total["orjson"]:.3f}s '
+              f'({total["json"] / total["orjson"]:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+# scripts/build_manifest.py
+"""
+Reconstrucción incremental de los JSON de json/.
+
+Cada objetivo declara qué entradas locales lo producen (libros Excel,
+imagenes_drive.xlsx u otros JSON) y qué conversor lo genera. Son las
+conversiones desde Excel local: lo que llega de Google Sheets lo resuelve
+excel_to_json.py con su propio cache de hashes de hojas.
+
+El manifiesto (.cache/build_manifest.json) guarda la huella de cada entrada
+y de cada salida con las que se construyó cada objetivo; una corrida solo
+ejecuta los conversores cuyas entradas cambiaron, o cuya salida falta o fue
+reemplazada después (p. ej. por los datos de la hoja), en orden de
+dependencias. Los objetivos de un mismo nivel corren en paralelo.
+
+excel_to_json.py construye por acá su respaldo local (FallbackLocal) y
+--solo-imagenes.
+
+Uso (desde la raíz del repo):
+    python scripts/build_manifest.py                 # reconstruye lo que cambió
+    python scripts/build_manifest.py --dry-run       # solo lista lo pendiente
+    python scripts/build_manifest.py --force productos catalogo_grupos
+"""
+import hashlib
+import importlib
+import os
+import sys
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from scripts.json_backend import dumps_bytes, load
+
+MANIFEST_PATH = '.cache/build_manifest.json'
+
+# objetivo -> entradas, salidas y conversor ('modulo:funcion')
+OBJETIVOS = {
+    'productos': {
+        'entradas': ['excel/PRODUCTOS.xlsx'],
+        'salidas': ['json/productos.json'],
+        'conversor': 'scripts.excel_to_json:excel_to_json',
+    },
+    'clientes_permisos': {
+        'entradas': ['excel/CLIENTES_PERMISOS.xlsx'],
+        'salidas': ['json/clientes_permisos.json'],
+        'conversor': 'scripts.excel_to_json:process_clients',
+    },
+    'grupos_clientes': {
+        'entradas': ['excel/GRUPOS_CLIENTES.xlsx'],
+        'salidas': ['json/grupos_clientes.json'],
+        'conversor': 'scripts.excel_to_json:process_groups',
+    },
+    'promociones': {
+        'entradas': ['excel/PROMOCIONES.xlsx'],
+        'salidas': ['json/promociones.json'],
+        'conversor': 'scripts.excel_to_json:process_promotions',
+    },
+    'margenes_clientes': {
+        'entradas': ['excel/MARGENES_CLIENTES.xlsx'],
+        'salidas': ['json/margenes_clientes.json'],
+        'conversor': 'scripts.excel_to_json:process_margins_local',
+    },
+    'catalogo_grupos': {
+        'entradas': ['excel/catalogo_grupos.xlsx'],
+        'salidas': ['json/catalogo_grupos.json'],
+        'conversor': 'scripts.excel_to_json:process_catalogo_grupos_local',
+    },
+    'catalogo_imagenes': {
+        'entradas': ['imagenes_drive.xlsx'],
+        'salidas': ['json/catalogo_imagenes.json'],
+        'conversor': 'scripts.excel_to_json:process_image_catalog_local',
+    },
+    'clientes_finanzas': {
+        'entradas': ['excel/clientes_finanzas.xlsx'],
+        'salidas': ['json/clientes_finanzas.json'],
+        'conversor': 'scripts.convertir_clientes_finanzas:main',
+    },
+    'funcionalidades': {
+        'entradas': ['excel/funcionalidades_maestro.xlsx', 'excel/usuarios_funcionalidades.xlsx'],
+        'salidas': ['json/funcionalidades.json', 'json/funcionalidades_usuarios.json'],
+        'conversor': 'scripts.converter_usuarios_funcionalidades_to_json:main',
+    },
+    # Etapas de drive_scanner.py que dependen del catálogo de imágenes
+    'catalogo_dimensiones': {
+        'entradas': ['json/catalogo_imagenes.json', 'imagenes_drive.xlsx'],
+        'salidas': ['json/catalogo_dimensiones.json', 'json/catalogo_dimensiones_v3.json'],
+        'conversor': 'scripts.build_manifest:construir_dimensiones',
+    },
+}
+
+
+def construir_dimensiones():
+    """Etapas de dimensiones y posiciones de drive_scanner.py (sin escanear Drive)"""
+    import drive_scanner
+    dimensiones = drive_scanner.generar_json_dimensiones_rapido()
+    if dimensiones is False:
+        raise RuntimeError('No se pudo generar catalogo_dimensiones.json')
+    drive_scanner.generar_posiciones_bottom_completo(dimensiones)
+
+
+def huella_archivo(path):
+    """SHA-256 del archivo, o None si no existe"""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def huellas_entradas(objetivo):
+    """Huella actual de cada entrada del objetivo"""
+    return {path: huella_archivo(path) for path in OBJETIVOS[objetivo]['entradas']}
+
+
+def orden_por_niveles(objetivos):
+    """
+    Agrupa los objetivos en niveles: cada uno solo depende de objetivos de niveles
+    anteriores (una entrada de un objetivo es la salida de otro).
+    """
+    productor = {salida: nombre for nombre, d in OBJETIVOS.items() for salida in d['salidas']}
+    dependencias = {
+        nombre: {productor[e] for e in OBJETIVOS[nombre]['entradas'] if e in productor} - {nombre}
+        for nombre in objetivos
+    }
+    niveles = []
+    pendientes = set(objetivos)
+    while pendientes:
+        nivel = sorted(n for n in pendientes if not (dependencias[n] & pendientes))
+        if not nivel:
+            raise ValueError(f'Dependencias circulares entre: {", ".join(sorted(pendientes))}')
+        niveles.append(nivel)
+        pendientes -= set(nivel)
+    return niveles
+
+
+def cargar_json(path):
+    try:
+        return load(path)
+    except (OSError, ValueError):
+        return {}
+
+
+def guardar_manifest(manifest):
+    os.makedirs(os.path.dirname(MANIFEST_PATH), exist_ok=True)
+    with open(MANIFEST_PATH, 'wb') as f:
+        f.write(dumps_bytes(manifest, indent=2, sort_keys=True))
+
+
+def motivo_reconstruccion(objetivo, huellas, manifest):
+    """Por qué hay que reconstruir el objetivo, o None si está al día"""
+    registro = manifest.get('objetivos', {}).get(objetivo)
+    if registro is None:
+        return 'sin construcción previa'
+    faltantes = [s for s in OBJETIVOS[objetivo]['salidas'] if not os.path.exists(s)]
+    if faltantes:
+        return f'falta {", ".join(faltantes)}'
+    reemplazadas = [s for s in OBJETIVOS[objetivo]['salidas']
+                    if registro.get('salidas', {}).get(s) != huella_archivo(s)]
+    if reemplazadas:
+        return f'se reemplazó {", ".join(reemplazadas)}'
+    cambiadas = [e for e, h in huellas.items() if registro.get('entradas', {}).get(e) != h]
+    if cambiadas:
+        return f'cambió {", ".join(cambiadas)}'
+    return None
+
+
+def error_conversion(objetivo, resultado):
+    """
+    Motivo por el que una conversión que no lanzó excepción igual falló, o None.
+    Varios conversores atrapan sus errores y devuelven False; además tienen que
+    existir todas las salidas.
+    """
+    if resultado is False:
+        return 'el conversor informó un error'
+    faltantes = [s for s in OBJETIVOS[objetivo]['salidas'] if not os.path.exists(s)]
+    if faltantes:
+        return f'no generó {", ".join(faltantes)}'
+    return None
+
+
+def _resolver(conversor):
+    modulo, funcion = conversor.split(':')
+    return getattr(importlib.import_module(modulo), funcion)
+
+
+def construir(objetivos=None, forzar=(), dry_run=False):
+    """
+    Reconstruye, en orden de dependencias, los objetivos cuyas entradas cambiaron.
+    Devuelve {objetivo: 'al día' | 'reconstruido' | 'error' | 'pendiente' (dry_run)}.
+    """
+    objetivos = list(objetivos or OBJETIVOS)
+    desconocidos = [o for o in list(objetivos) + list(forzar) if o not in OBJETIVOS]
+    if desconocidos:
+        raise ValueError(f'Objetivos desconocidos: {", ".join(desconocidos)}')
+
+    manifest = cargar_json(MANIFEST_PATH)
+    manifest.setdefault('objetivos', {})
+    estados = {}
+
+    for nivel in orden_por_niveles(objetivos):
+        # Las huellas se calculan por nivel: ven las salidas recién generadas del nivel anterior
+        huellas = {o: huellas_entradas(o) for o in nivel}
+        tareas = []
+        for objetivo in nivel:
+            motivo = 'forzado' if objetivo in forzar else motivo_reconstruccion(objetivo, huellas[objetivo], manifest)
+            if motivo is None:
+                print(f'{objetivo}: al día')
+                estados[objetivo] = 'al día'
+                continue
+            print(f'{objetivo}: reconstruir ({motivo})')
+            estados[objetivo] = 'pendiente'
+            tareas.append(objetivo)
+
+        if dry_run or not tareas:
+            continue
+
+        from scripts.excel_to_json import ejecutar_en_paralelo
+        tareas = [(o, _resolver(OBJETIVOS[o]['conversor']), ()) for o in tareas]
+        for objetivo, resultado, _, error in ejecutar_en_paralelo(tareas):
+            error = error or error_conversion(objetivo, resultado)
+            if error:
+                print(f'Error construyendo {objetivo}: {error}')
+                # Sin registro, la próxima corrida lo vuelve a intentar aunque nada cambie
+                manifest['objetivos'].pop(objetivo, None)
+                estados[objetivo] = 'error'
+                continue
+            manifest['objetivos'][objetivo] = {
+                'entradas': huellas[objetivo],
+                'salidas': {s: huella_archivo(s) for s in OBJETIVOS[objetivo]['salidas']},
+                'conversor': OBJETIVOS[objetivo]['conversor'],
+                'construido': datetime.now().isoformat(),
+            }
+            estados[objetivo] = 'reconstruido'
+        guardar_manifest(manifest)
+
+    return estados
+
+
+def main():
+    os.chdir(ROOT_DIR)  # los conversores usan rutas relativas a la raíz
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    dry_run = '--dry-run' in sys.argv
+    forzar = (args or list(OBJETIVOS)) if '--force' in sys.argv else ()
+    estados = construir(args or None, forzar=forzar, dry_run=dry_run)
+    if not dry_run:
+        print(f'Objetivos reconstruidos: {sum(1 for e in estados.values() if e == "reconstruido")}')
+        from scripts.deltas import registrar_versiones
+        from scripts.asset_manifest import publicar_hasheados
+        registrar_versiones()
+        publicar_hasheados()
+
+
+if __name__ == '__main__':
+    main()
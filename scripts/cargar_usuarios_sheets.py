@@ -6,7 +6,6 @@ Ademas de cargar, valida que las credenciales y los permisos
 esten bien configurados. Si este script corre, la Etapa 0 esta cerrada.
 """
 
-import json
 import sys
 from pathlib import Path
 
@@ -14,6 +13,9 @@ import gspread
 from google.oauth2.service_account import Credentials
 
 RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+from scripts.json_backend import load
+
 CREDENCIAL = RAIZ / 'credenciales' / 'service-account.json'
 ORIGEN = RAIZ / 'json' / 'funcionalidades_usuarios.json'
 
@@ -43,8 +45,7 @@ def leer_usuarios():
         print(f'ERROR: no se encuentra {ORIGEN}')
         sys.exit(1)
 
-    with open(ORIGEN, encoding='utf-8') as f:
-        datos = json.load(f)
+    datos = load(ORIGEN)
 
     usuarios = datos.get('usuarios', datos)
     filas = []
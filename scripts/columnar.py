@@ -0,0 +1,66 @@
+# scripts/columnar.py
+"""
+Exportación de productos por columnas (productos_columnar.json).
+
+En lugar de un objeto por producto con las claves name/category/bulk/prices
+repetidas, cada campo es un arreglo paralelo a `codes`. Las categorías se
+guardan una sola vez en `categories` y cada producto tiene su índice en
+`category`; los precios son arreglos de enteros por lista (D, E, F).
+
+    {"version": "1.0", "count": 2,
+     "codes": ["ABF2031000", "ABR9612"],
+     "names": ["ALAMBRE ...", "RESISTENCIA ..."],
+     "categories": ["8.ALAMBRE DE FARDO AB", "1.DUCHA ELECTRICA/ACCESO"],
+     "category": [0, 1],
+     "bulk": [10.0, 1.0],
+     "prices": {"D": [1161, 3604], "E": [...], "F": [...]}}
+
+columnas_a_productos() reconstruye la forma de productos.json
+(js/productosColumnar.js hace lo mismo en el navegador).
+"""
+LISTAS_PRECIO = ['D', 'E', 'F']
+
+
+def productos_a_columnas(products):
+    """Convierte {codigo: producto} (salida de process_products) al formato por columnas"""
+    categorias = {}
+    columnas = {
+        'codes': [], 'names': [], 'category': [], 'bulk': [],
+        'prices': {lista: [] for lista in LISTAS_PRECIO},
+    }
+    for codigo, producto in products.items():
+        columnas['codes'].append(codigo)
+        columnas['names'].append(producto['name'])
+        columnas['category'].append(categorias.setdefault(producto['category'], len(categorias)))
+        columnas['bulk'].append(producto['bulk'])
+        for lista in LISTAS_PRECIO:
+            columnas['prices'][lista].append(producto['prices'][lista])
+
+    return {
+        'version': '1.0',
+        'count': len(columnas['codes']),
+        'codes': columnas['codes'],
+        'names': columnas['names'],
+        'categories': list(categorias),
+        'category': columnas['category'],
+        'bulk': columnas['bulk'],
+        'prices': columnas['prices'],
+    }
+
+
+def columnas_a_productos(data):
+    """Reconstruye {codigo: {'name', 'category', 'bulk', 'prices': {'D', 'E', 'F'}}}"""
+    categorias = data['categories']
+    precios = data['prices']
+    listas = list(precios)
+    filas = zip(data['codes'], data['names'], data['category'], data['bulk'],
+                zip(*(precios[lista] for lista in listas)))
+    return {
+        codigo: {
+            'name': nombre,
+            'category': categorias[indice],
+            'bulk': bulto,
+            'prices': dict(zip(listas, valores)),
+        }
+        for codigo, nombre, indice, bulto, valores in filas
+    }
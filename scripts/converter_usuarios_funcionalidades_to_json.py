@@ -1,8 +1,11 @@
 import openpyxl
-import json
 import os
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.json_io import write_json
+
 def leer_funcionalidades_maestro():
     """Lee el archivo funcionalidades_maestro.xlsx y retorna diccionario"""
     
@@ -151,8 +154,7 @@ def guardar_json(data, filename):
     json_path.parent.mkdir(exist_ok=True)
     
     try:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        write_json(str(json_path), data, indent=2, ensure_ascii=False)
         print(f"✅ Guardado: {json_path}")
         return True
     except Exception as e:
@@ -174,7 +176,7 @@ def main():
     
     if not funcionalidades_data:
         print("\n❌ Error al leer funcionalidades_maestro.xlsx")
-        return
+        return False
     
     # Leer usuarios_funcionalidades.xlsx
     print("\n📋 PASO 2: Leyendo usuarios y funcionalidades...")
@@ -182,7 +184,7 @@ def main():
     
     if not usuarios_data:
         print("\n❌ Error al leer usuarios_funcionalidades.xlsx")
-        return
+        return False
     
     # Guardar JSONs
     print("\n💾 PASO 3: Guardando archivos JSON...")
@@ -200,6 +202,7 @@ def main():
     else:
         print("⚠️  CONVERSIÓN COMPLETADA CON ERRORES")
     print("="*60 + "\n")
+    return exito1 and exito2
 
 
 if __name__ == "__main__":
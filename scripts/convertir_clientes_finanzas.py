@@ -1,7 +1,12 @@
 import pandas as pd
-import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from scripts.excel_reader import leer_excel
+from scripts.json_backend import load
+from scripts.json_io import write_json
+
 def limpiar_moneda(valor):
     """Convierte valor monetario a número"""
     if pd.isna(valor):
@@ -50,10 +55,10 @@ def main():
     
     # Leer Excel
     try:
-        df = pd.read_excel(excel_path)
+        df = leer_excel(excel_path, 'clientes_finanzas')
     except FileNotFoundError:
         print(f"❌ ERROR: No se encontró el archivo {excel_path}")
-        return
+        return False
     
     print(f"✅ Leídas {len(df)} filas")
     
@@ -84,20 +89,20 @@ def main():
     if json_path.exists():
         print(f"⚠️  Sobrescribiendo archivo existente: {json_path}")
 
+    exito = False
     try:
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(output, f, ensure_ascii=False, indent=2)
+        write_json(str(json_path), output, indent=2, ensure_ascii=False)
         
         # Verificar que se guardó correctamente
-        with open(json_path, 'r', encoding='utf-8') as f:
-            verificacion = json.load(f)
-            clientes_guardados = len(verificacion.get('clientes', {}))
+        verificacion = load(json_path)
+        clientes_guardados = len(verificacion.get('clientes', {}))
         
         print(f"✅ Guardado: {json_path}")
         print(f"✅ Verificado: {clientes_guardados} clientes en el archivo")
         
         if clientes_guardados != len(clientes):
             print(f"⚠️  ADVERTENCIA: Se esperaban {len(clientes)} pero hay {clientes_guardados}")
+        exito = True
 
     except PermissionError:
         print(f"❌ ERROR: No se puede escribir el archivo (puede estar abierto en otro programa)")
@@ -106,6 +111,7 @@ def main():
         print(f"❌ ERROR al guardar: {e}")
 
     print("\n" + "="*60 + "\n")
+    return exito
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
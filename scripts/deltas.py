@@ -0,0 +1,181 @@
+# scripts/deltas.py
+"""
+Parches (deltas) entre builds consecutivos de los JSON publicados.
+
+Después de cada build, registrar_versiones() compara cada dataset con la
+copia del build anterior (guardada en .cache/deltas/) y, si cambió, escribe
+json/deltas/<dataset>/<desde>_<hasta>.json con las claves agregadas,
+eliminadas y modificadas. json/deltas/manifest.json mantiene, por dataset,
+la versión actual y la cadena de parches: un navegador que tiene la versión
+X aplica en orden los parches desde X hasta la actual; si X no está en la
+cadena, vuelve a bajar el archivo completo.
+
+La versión de un archivo son los primeros 12 caracteres del SHA-256 de su
+contenido publicado.
+"""
+import hashlib
+import os
+from datetime import datetime
+
+from scripts.json_backend import loads
+from scripts.json_io import write_json, escribir_atomico
+
+DELTAS_DIR = 'json/deltas'
+MANIFEST_PATH = os.path.join(DELTAS_DIR, 'manifest.json')
+SNAPSHOTS_DIR = '.cache/deltas'
+
+# Parches que se conservan por dataset
+MAX_PARCHES = 30
+# Si el parche pesa más que esta fracción del archivo completo, no vale la pena
+MAX_PROPORCION = 0.5
+
+# dataset -> archivo publicado y, si los registros no están en la raíz, la clave que los contiene
+DATASETS = {
+    'productos': {'path': 'json/productos.json', 'registros': None},
+    'clientes_permisos': {'path': 'json/clientes_permisos.json', 'registros': None},
+    'catalogo_imagenes': {'path': 'json/catalogo_imagenes.json', 'registros': 'images'},
+}
+
+
+def version_de(contenido):
+    return hashlib.sha256(contenido).hexdigest()[:12]
+
+
+def _separar(data, registros):
+    """Devuelve (registros, campos sueltos de la raíz)"""
+    if registros is None:
+        return data, {}
+    campos = {k: v for k, v in data.items() if k != registros}
+    return data.get(registros, {}), campos
+
+
+def calcular_delta(anterior, nuevo, registros=None):
+    """Claves agregadas, eliminadas y modificadas entre dos versiones de un dataset"""
+    previos, campos_previos = _separar(anterior, registros)
+    actuales, campos_actuales = _separar(nuevo, registros)
+    delta = {
+        'added': {k: v for k, v in actuales.items() if k not in previos},
+        'removed': [k for k in previos if k not in actuales],
+        'changed': {k: v for k, v in actuales.items() if k in previos and previos[k] != v},
+    }
+    if registros is not None:
+        delta['fields'] = {k: v for k, v in campos_actuales.items() if campos_previos.get(k) != v}
+        delta['removedFields'] = [k for k in campos_previos if k not in campos_actuales]
+    return delta
+
+
+def aplicar_delta(base, delta, registros=None):
+    """Aplica un parche a una versión anterior (lo mismo que haría el frontend)"""
+    resultado = dict(base)
+    destino = resultado if registros is None else dict(resultado.get(registros, {}))
+    for clave in delta['removed']:
+        destino.pop(clave, None)
+    for clave, valor in delta['changed'].items():
+        destino[clave] = valor
+    destino.update(delta['added'])
+    if registros is not None:
+        for clave in delta.get('removedFields', []):
+            resultado.pop(clave, None)
+        resultado.update(delta.get('fields', {}))
+        resultado[registros] = destino
+    return resultado
+
+
+def _leer(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def cargar_manifest():
+    contenido = _leer(MANIFEST_PATH)
+    if contenido is None:
+        return {'datasets': {}}
+    try:
+        return loads(contenido)
+    except ValueError:
+        return {'datasets': {}}
+
+
+def _podar(cadena, dataset):
+    """Deja los últimos MAX_PARCHES parches y borra los archivos de los demás"""
+    for parche in cadena[:-MAX_PARCHES]:
+        path = os.path.join(DELTAS_DIR, dataset, parche['file'])
+        if os.path.exists(path):
+            os.remove(path)
+    return cadena[-MAX_PARCHES:]
+
+
+def registrar_version(dataset, manifest):
+    """
+    Compara el dataset publicado con la copia del build anterior y, si cambió,
+    escribe el parche y lo agrega a la cadena del manifiesto. Devuelve True si
+    hubo una versión nueva.
+    """
+    definicion = DATASETS[dataset]
+    contenido = _leer(definicion['path'])
+    if contenido is None:
+        return False
+
+    snapshot_path = os.path.join(SNAPSHOTS_DIR, os.path.basename(definicion['path']))
+    previo = _leer(snapshot_path)
+    version = version_de(contenido)
+    estado = manifest['datasets'].setdefault(dataset, {'current': None, 'file': definicion['path'], 'chain': []})
+    if estado['current'] == version:
+        if previo != contenido:
+            escribir_atomico(snapshot_path, contenido)
+        return False
+
+    cadena = estado['chain']
+    if previo is None or version_de(previo) != estado['current']:
+        # Sin la copia del build anterior no se puede armar el parche: la cadena empieza de nuevo
+        print(f'{dataset}: sin versión anterior registrada, se reinicia la cadena de parches')
+        cadena = []
+        _borrar_parches(dataset)
+    elif version_de(previo) != version:
+        desde = version_de(previo)
+        delta = calcular_delta(loads(previo), loads(contenido), definicion['registros'])
+        archivo = f'{desde}_{version}.json'
+        path = os.path.join(DELTAS_DIR, dataset, archivo)
+        write_json(path, dict({'dataset': dataset, 'from': desde, 'to': version}, **delta), indent=2)
+        peso = os.path.getsize(path)
+        if peso > len(contenido) * MAX_PROPORCION:
+            print(f'{dataset}: el parche ({peso} bytes) no compensa frente al archivo completo; se reinicia la cadena')
+            cadena = []
+            _borrar_parches(dataset)
+        else:
+            cadena = _podar(cadena + [{
+                'from': desde,
+                'to': version,
+                'file': archivo,
+                'added': len(delta['added']),
+                'removed': len(delta['removed']),
+                'changed': len(delta['changed']),
+                'bytes': peso,
+                'created': datetime.now().isoformat(),
+            }], dataset)
+            print(f'{dataset}: parche {archivo} ({len(delta["added"])} agregados, '
+                  f'{len(delta["removed"])} eliminados, {len(delta["changed"])} modificados, {peso} bytes)')
+
+    estado['current'] = version
+    estado['chain'] = cadena
+    escribir_atomico(snapshot_path, contenido)
+    return True
+
+
+def _borrar_parches(dataset):
+    directorio = os.path.join(DELTAS_DIR, dataset)
+    if os.path.isdir(directorio):
+        for archivo in os.listdir(directorio):
+            os.remove(os.path.join(directorio, archivo))
+
+
+def registrar_versiones(datasets=None):
+    """Registra la versión actual de cada dataset y actualiza json/deltas/manifest.json"""
+    manifest = cargar_manifest()
+    nuevas = [d for d in (datasets or DATASETS) if registrar_version(d, manifest)]
+    if nuevas:
+        write_json(MANIFEST_PATH, manifest, indent=2)
+    return nuevas
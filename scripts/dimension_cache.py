@@ -0,0 +1,102 @@
+# scripts/dimension_cache.py
+"""
+Cache de dimensiones de imágenes por archivo de Drive.
+
+Cada entrada está indexada por el id de Drive y guarda, junto a las
+dimensiones, la firma del archivo (modifiedTime y md5Checksum del listado).
+En cada corrida:
+- Las imágenes con dimensiones en el listado de Drive las toman de ahí.
+- Las demás reutilizan su entrada si la firma no cambió (md5 si lo hay; si
+  no, modifiedTime). Si cambió, o es nueva, se vuelven a sondear.
+- Las entradas de imágenes que ya no están en el catálogo se descartan, y
+  sus códigos desaparecen de catalogo_dimensiones.json.
+Los valores por defecto (sondeo fallido) no se consideran vigentes: se
+reintentan en la corrida siguiente. Sin cache (primera corrida o cache de
+Actions vencido) se sondea todo lo que el listado de Drive no trae: los
+valores viejos de catalogo_dimensiones.json eran estimaciones, no medidas.
+"""
+import os
+
+from scripts.json_io import leer_json, write_json
+
+DIMENSIONES_CACHE_PATH = '.cache/dimensiones_cache.json'
+
+
+def firma_de(meta):
+    if not meta:
+        return None
+    return {'modifiedTime': meta.get('modifiedTime'), 'md5': meta.get('md5')}
+
+
+def entrada(width, height, origen, firma):
+    return {
+        'width': width,
+        'height': height,
+        'ratio': round(width / height, 3),
+        'source': origen,
+        'modifiedTime': (firma or {}).get('modifiedTime'),
+        'md5': (firma or {}).get('md5'),
+    }
+
+
+def vigente(anterior, firma):
+    """True si la entrada del cache sigue valiendo para un archivo con esta firma"""
+    if anterior is None or anterior.get('source') == 'default':
+        return False
+    if firma is None:
+        return True  # sin datos del listado no hay forma de saber si cambió
+    if firma.get('md5') and anterior.get('md5'):
+        return firma['md5'] == anterior['md5']
+    return firma.get('modifiedTime') is not None and firma['modifiedTime'] == anterior.get('modifiedTime')
+
+
+def planificar(imagenes, metadatos, cache):
+    """
+    imagenes: {codigo: drive_id} del catálogo; metadatos: listado de Drive por id;
+    cache: entradas previas por id. Devuelve (nuevo_cache, pendientes), donde
+    pendientes es {drive_id: firma} de las imágenes que hay que sondear.
+    """
+    nuevo = {}
+    pendientes = {}
+    for drive_id in imagenes.values():
+        if not isinstance(drive_id, str) or drive_id in nuevo or drive_id in pendientes:
+            continue
+        meta = metadatos.get(drive_id)
+        firma = firma_de(meta)
+        if meta and meta.get('width') and meta.get('height'):
+            nuevo[drive_id] = entrada(meta['width'], meta['height'], 'drive', firma)
+        elif vigente(cache.get(drive_id), firma):
+            nuevo[drive_id] = cache[drive_id]
+        else:
+            pendientes[drive_id] = firma
+    return nuevo, pendientes
+
+
+def armar_dimensiones(imagenes, cache, anteriores):
+    """
+    images_dimensions para catalogo_dimensiones.json. Los códigos cuyas dimensiones
+    no cambiaron conservan su objeto anterior (con imageType, bottomPosition, etc.)
+    y su posición; los nuevos van al final en el orden del catálogo.
+    """
+    resultado = {}
+    orden = [c for c in anteriores if c in imagenes] + [c for c in imagenes if c not in anteriores]
+    for codigo in orden:
+        datos = cache.get(imagenes[codigo])
+        if datos is None:
+            continue
+        dims = {'width': datos['width'], 'height': datos['height'], 'ratio': datos['ratio']}
+        previo = anteriores.get(codigo)
+        if previo and all(previo.get(k) == v for k, v in dims.items()):
+            resultado[codigo] = previo
+        else:
+            resultado[codigo] = dims
+    return resultado
+
+
+def cargar_cache(path=DIMENSIONES_CACHE_PATH):
+    return (leer_json(path) or {}).get('images', {})
+
+
+def guardar_cache(cache, path=DIMENSIONES_CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_json(path, {'version': '1.0', 'images': cache}, indent=2)
@@ -0,0 +1,134 @@
+# scripts/dimensiones.py
+"""
+Clasificación de imágenes y formatos de catalogo_dimensiones.json.
+
+v2 (el que lee hoy search-engine.js): por imagen width, height, ratio,
+imageType, bottomPosition completo, autoGenerated y lastCalculated.
+
+v3 (compacto, catalogo_dimensiones_v3.json): las tablas de tipos y de
+posiciones por breakpoint van una sola vez y cada imagen es una tupla
+[ratio, índice de tipo]. Si el alto/ancho no se deducen del ratio con el
+ancho base (800 x int(800 / ratio)), se agregan como [ratio, tipo, ancho, alto].
+expandir_v3() lo devuelve a v2 para los consumidores viejos; las marcas
+lastCalculated por imagen no se guardan en v3 y se expanden con lastUpdate.
+"""
+from scripts.json_io import leer_json
+
+try:
+    import numpy as np
+except ImportError:  # opcional: sin numpy se clasifica imagen por imagen
+    np = None
+
+# Tipos de imagen en orden de clasificación: el primero cuyo umbral alcance el ratio
+TIPOS_IMAGEN = ['very_horizontal', 'horizontal', 'square', 'vertical']
+UMBRALES = [1.6, 1.2, 0.8, 0.0]
+BREAKPOINTS = ['mobile', 'tablet', 'desktop']
+
+# Posición del bottom-row por tipo (la misma tabla que usa el JavaScript)
+BOTTOM_POSITIONS = {
+    'very_horizontal': {'mobile': 50, 'tablet': 65, 'desktop': 75},
+    'horizontal':      {'mobile': 55, 'tablet': 64, 'desktop': 74},
+    'square':          {'mobile': 52, 'tablet': 62, 'desktop': 72},
+    'vertical':        {'mobile': 48, 'tablet': 58, 'desktop': 68}
+}
+
+ANCHO_BASE = 800
+
+
+def clasificar_ratio(ratio):
+    """Tipo de imagen según su proporción ancho/alto"""
+    for tipo, umbral in zip(TIPOS_IMAGEN, UMBRALES):
+        if ratio >= umbral:
+            return tipo
+    return TIPOS_IMAGEN[-1]
+
+
+def clasificar_ratios(ratios):
+    """
+    clasificar_ratio sobre una columna de ratios de una sola vez: con numpy,
+    un searchsorted contra los umbrales ordenados de menor a mayor.
+    """
+    if np is None:
+        return [clasificar_ratio(r) for r in ratios]
+    ascendentes = np.array(UMBRALES[-2::-1])  # [0.8, 1.2, 1.6]
+    indices = len(ascendentes) - np.searchsorted(ascendentes, np.asarray(ratios, dtype=float), side='right')
+    return np.array(TIPOS_IMAGEN, dtype=object)[indices].tolist()
+
+
+def posiciones_pendientes(imagenes):
+    """
+    {codigo: tipo} de las imágenes de images_dimensions sin posiciones calculadas
+    o cuyo tipo (o tabla de posiciones) ya no corresponde a su ratio.
+    """
+    codigos = list(imagenes)
+    tipos = clasificar_ratios([imagenes[c]['ratio'] for c in codigos])
+    return {
+        codigo: tipo
+        for codigo, tipo in zip(codigos, tipos)
+        if imagenes[codigo].get('imageType') != tipo
+        or imagenes[codigo].get('bottomPosition') != BOTTOM_POSITIONS[tipo]
+        or 'lastCalculated' not in imagenes[codigo]
+    }
+
+
+def _dimensiones_implicitas(ratio):
+    return ANCHO_BASE, int(ANCHO_BASE / ratio)
+
+
+def compactar_v2(data):
+    """Convierte el contenido de catalogo_dimensiones.json (v1/v2) al formato v3"""
+    indices = {tipo: i for i, tipo in enumerate(TIPOS_IMAGEN)}
+    imagenes = {}
+    for codigo, dims in data.get('images_dimensions', {}).items():
+        ratio = dims['ratio']
+        tipo = dims.get('imageType') or clasificar_ratio(ratio)
+        tupla = [ratio, indices[tipo]]
+        if (dims.get('width'), dims.get('height')) != _dimensiones_implicitas(ratio):
+            tupla += [dims.get('width'), dims.get('height')]
+        imagenes[codigo] = tupla
+
+    return {
+        'version': '3.0',
+        'lastUpdate': data.get('lastUpdate'),
+        'description': data.get('description', ''),
+        'types': TIPOS_IMAGEN,
+        'thresholds': UMBRALES,
+        'breakpoints': BREAKPOINTS,
+        'bottomPositions': [[BOTTOM_POSITIONS[t][b] for b in BREAKPOINTS] for t in TIPOS_IMAGEN],
+        'fields': ['ratio', 'type', 'width', 'height'],
+        'images': imagenes,
+    }
+
+
+def expandir_v3(data):
+    """Reconstruye el formato v2 a partir del v3"""
+    tipos = data['types']
+    posiciones = [dict(zip(data['breakpoints'], fila)) for fila in data['bottomPositions']]
+    imagenes = {}
+    for codigo, tupla in data['images'].items():
+        ratio, indice = tupla[0], tupla[1]
+        ancho, alto = tupla[2:4] if len(tupla) >= 4 else _dimensiones_implicitas(ratio)
+        imagenes[codigo] = {
+            'width': ancho,
+            'height': alto,
+            'ratio': ratio,
+            'imageType': tipos[indice],
+            'bottomPosition': dict(posiciones[indice]),
+            'autoGenerated': True,
+            'lastCalculated': data.get('lastUpdate'),
+        }
+
+    v2 = {'version': '2.0', 'lastUpdate': data.get('lastUpdate'), 'images_dimensions': imagenes}
+    if data.get('description'):
+        v2['description'] = data['description']
+    return v2
+
+
+def leer_dimensiones(path):
+    """Lee catalogo_dimensiones en cualquier versión y lo devuelve en formato v2 (None si no existe)"""
+    data = leer_json(path)
+    if data is None:
+        return None
+    if str(data.get('version', '')).startswith('3'):
+        return expandir_v3(data)
+    return data
@@ -0,0 +1,177 @@
+# scripts/excel_reader.py
+"""
+Capa de lectura de Excel para los conversores.
+
+Cada conversor declara qué columnas (y opcionalmente qué dtypes) necesita,
+así pandas descarta el resto al parsear. El motor se elige una sola vez:
+calamine (lector en Rust, `pip install python-calamine`) si está instalado
+y la versión de pandas lo soporta; si no, openpyxl, que pandas ya abre en
+modo read_only (lectura en streaming, sin cargar estilos).
+Se puede forzar con la variable de entorno EXCEL_ENGINE.
+
+Los DataFrames ya parseados se guardan en .cache/excel/, uno por lectura
+(archivo + hoja + columnas + motor), junto con la ruta, mtime, tamaño y
+hash del libro. Una lectura posterior de un libro sin cambios se carga del
+cache; cualquier cambio en el contenido invalida la entrada.
+"""
+import hashlib
+import os
+import pickle
+import pandas as pd
+
+from scripts.json_backend import dumps_bytes, load
+
+# Columnas que usa cada conversor (las demás no se parsean)
+COLUMNAS = {
+    'productos': ['CODIGO', 'ARTICULO', 'RUBRO', 'BULTO', 'P_LISTA_D', 'P_LISTA_E', 'P_LISTA_F'],
+    'clientes_permisos': ['CUENTA', 'NOMBRE', 'CATEGORIAS', 'LISTA_PRECIOS'],
+    'grupos_clientes': ['NOMBRE_GRUPO', 'CLIENTES'],
+    'promociones': ['CODIGO_PRODUCTO', 'TIPO_LISTA', 'PRECIO_ESPECIAL', 'VIGENCIA_HASTA', 'GRUPOS'],
+    'margenes_clientes': ['Cliente', 'Nombre', 'Margen', 'Mostrar', 'Fecha_Cambio'],
+    'catalogo_grupos': ['Codigo_Producto'],
+    'catalogo_imagenes': ['articulo', 'id'],
+    'clientes_finanzas': ['Cliente_ID', 'Nombre_Cliente', 'Vendedor', 'PG_Prom_3M', 'CP_Este_Mes',
+                          'Saldo_Total', 'PG_Este_Mes', 'Cupo_Mes', 'Ult_Operacion'],
+}
+
+# Tipos forzados al leer; solo donde no cambia el JSON publicado
+DTYPES = {
+    'catalogo_grupos': {'Codigo_Producto': str},
+}
+
+EXCEL_CACHE_DIR = '.cache/excel'
+
+_motor = None
+
+
+def motor_excel():
+    """Devuelve el motor de lectura a usar ('calamine' u 'openpyxl')"""
+    global _motor
+    if _motor is None:
+        _motor = os.environ.get('EXCEL_ENGINE') or _detectar_motor()
+    return _motor
+
+
+def _detectar_motor():
+    try:
+        import python_calamine  # noqa: F401
+    except ImportError:
+        return 'openpyxl'
+    # pandas soporta engine='calamine' desde la 2.2
+    version = tuple(int(p) for p in pd.__version__.split('.')[:2] if p.isdigit())
+    return 'calamine' if version >= (2, 2) else 'openpyxl'
+
+
+def _selector(columnas):
+    """usecols como función: las columnas que falten no rompen la lectura"""
+    if columnas is None:
+        return None
+    permitidas = set(columnas)
+    return lambda nombre: nombre in permitidas
+
+
+def hash_archivo(path, bloque=1024 * 1024):
+    """SHA-256 del contenido del archivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(bloque), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _clave_lectura(path, sheet_name, columnas, dtypes):
+    """Identifica una lectura concreta: el mismo libro leído con otras columnas es otra entrada"""
+    lectura = {
+        'path': os.path.abspath(path),
+        'sheet_name': sheet_name,
+        'columnas': sorted(columnas) if columnas else None,
+        'dtypes': {k: getattr(v, '__name__', str(v)) for k, v in sorted((dtypes or {}).items())},
+        'motor': motor_excel(),
+        'pandas': pd.__version__,
+    }
+    return hashlib.sha1(dumps_bytes(lectura, indent=None, sort_keys=True)).hexdigest()
+
+
+# Errores de un pickle truncado, corrupto o escrito por otra versión de pandas/numpy
+_ERRORES_PICKLE = (pickle.UnpicklingError, EOFError, ValueError, AttributeError, ImportError, TypeError)
+
+
+def _borrar_entrada(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _leer_cache(clave, firma):
+    meta_path = os.path.join(EXCEL_CACHE_DIR, f'{clave}.json')
+    datos_path = os.path.join(EXCEL_CACHE_DIR, f'{clave}.pkl')
+    try:
+        meta = load(meta_path)
+    except (OSError, ValueError):
+        return None
+    if meta.get('sha256') != firma['sha256']:
+        return None
+    try:
+        return pd.read_pickle(datos_path)
+    except OSError:
+        return None
+    except _ERRORES_PICKLE as e:
+        # Entrada inservible: se borra y se vuelve a leer el Excel
+        print(f'Cache de {firma["path"]} inválido ({type(e).__name__}: {e}), se relee el Excel')
+        _borrar_entrada(datos_path, meta_path)
+        return None
+
+
+def _guardar_cache(clave, firma, datos):
+    """Escribe datos y metadatos a temporales y los renombra: nunca queda una entrada a medias"""
+    os.makedirs(EXCEL_CACHE_DIR, exist_ok=True)
+    meta_path = os.path.join(EXCEL_CACHE_DIR, f'{clave}.json')
+    datos_path = os.path.join(EXCEL_CACHE_DIR, f'{clave}.pkl')
+    sufijo = f'.{os.getpid()}.tmp'
+    try:
+        pd.to_pickle(datos, datos_path + sufijo)
+        os.replace(datos_path + sufijo, datos_path)
+        with open(meta_path + sufijo, 'wb') as f:
+            f.write(dumps_bytes(firma, indent=2))
+        os.replace(meta_path + sufijo, meta_path)
+    except OSError as e:
+        print(f'No se pudo guardar el cache de {firma["path"]}: {e}')
+
+
+def leer_excel(path, dataset=None, columnas=None, dtypes=None, sheet_name=0, cache=True):
+    """
+    Lee un Excel con el motor rápido, parseando solo las columnas necesarias.
+    `dataset` toma las columnas y dtypes declarados en COLUMNAS/DTYPES;
+    `columnas`/`dtypes` permiten pasarlos explícitamente. Sin ninguno, lee todo.
+    Con `cache`, un libro cuyo contenido no cambió se carga del cache local.
+    """
+    if dataset is not None:
+        columnas = columnas or COLUMNAS.get(dataset)
+        dtypes = dtypes or DTYPES.get(dataset)
+
+    firma = None
+    if cache:
+        stat = os.stat(path)
+        firma = {
+            'path': os.path.abspath(path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': hash_archivo(path),
+        }
+        clave = _clave_lectura(path, sheet_name, columnas, dtypes)
+        datos = _leer_cache(clave, firma)
+        if datos is not None:
+            return datos
+
+    datos = pd.read_excel(
+        path,
+        sheet_name=sheet_name,
+        usecols=_selector(columnas),
+        dtype=dtypes,
+        engine=motor_excel(),
+    )
+    if cache:
+        _guardar_cache(clave, firma, datos)
+    return datos
@@ -1,10 +1,42 @@
 # scripts/excel_to_json.py
 import pandas as pd
-import json
+import hashlib
 import os
 import requests
 import re
+import sys
+import time
+from urllib.parse import quote
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 from datetime import datetime  # Agregamos esta importación
+from requests.adapters import HTTPAdapter
+
+# Permite `python scripts/excel_to_json.py` e `import scripts.excel_to_json` por igual
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from scripts.excel_reader import leer_excel
+from scripts.json_backend import dumps, dumps_bytes, load
+from scripts.json_io import write_json, configurar_salida_desde_argv, reporte_tamanos
+from scripts.shards import escribir_shards
+from scripts.columnar import productos_a_columnas
+from scripts.deltas import registrar_versiones
+from scripts.asset_manifest import publicar_hasheados
+from scripts.build_manifest import OBJETIVOS, construir
+from scripts.gviz import read_gviz_response, gviz_rows, gviz_to_columns, merge_gviz_windows, CELDA_VACIA
+
+
+# Tiempos de espera para Google Sheets: (conexión, lectura) por hoja y límite global del fetch
+SHEETS_TIMEOUT = (5, 30)
+SHEETS_DEADLINE = 120
+
+# Hojas grandes que se descargan en ventanas `limit/offset` paralelas (filas por ventana)
+SHEETS_VENTANAS = {'productos': 2500}
+VENTANAS_PARALELAS = 4
+REINTENTOS_VENTANA = 2
+# Tope de filas de una hoja por ventanas: acota los lotes si gviz ignora el offset
+MAX_FILAS_VENTANAS = 200000
+
+# Hash del contenido de cada hoja procesada, para omitir las que no cambiaron
+SHEETS_CACHE_PATH = '.cache/sheets_cache.json'
 
 
 def get_sheet_ids():
@@ -33,65 +65,237 @@ def get_sheet_ids():
         raise
 
 
-def get_sheet_data(sheet_id):
-    """Obtiene datos de Google Sheets"""
+def crear_sesion_sheets(pool_size=10):
+    """Crea una sesión keep-alive compartida para todas las descargas de Sheets"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_sheet_data(sheet_id, session=None, timeout=SHEETS_TIMEOUT, tq=None):
+    """Obtiene datos de Google Sheets (opcionalmente filtrados con una consulta `tq`)"""
     try:
         url = f'https://docs.google.com/spreadsheets/d/{sheet_id}/gviz/tq?tqx=out:json'
-        response = requests.get(url)
-        return json.loads(response.text[47:-2])
+        if tq:
+            url += f'&tq={quote(tq)}'
+        response = (session or requests).get(url, timeout=timeout, stream=True)
+        response.raise_for_status()
+        return read_gviz_response(response)
     except Exception as e:
         print(f'Error obteniendo datos de Google Sheets: {e}')
         return None
 
-def update_from_sheets():
-    """Actualiza JSONs desde Google Sheets"""
+
+def get_sheet_window(sheet_id, offset, limite, session=None, timeout=SHEETS_TIMEOUT):
+    """Descarga una ventana de filas; reintenta solo esa ventana si falla"""
+    tq = f'select * limit {limite} offset {offset}'
+    for intento in range(REINTENTOS_VENTANA + 1):
+        data = get_sheet_data(sheet_id, session, timeout, tq=tq)
+        if data:
+            return data
+        if intento < REINTENTOS_VENTANA:
+            print(f'Reintentando ventana offset={offset} ({intento + 1}/{REINTENTOS_VENTANA})')
+    raise RuntimeError(f'No se pudo descargar la ventana offset={offset}')
+
+
+def get_sheet_data_ranged(sheet_id, session=None, timeout=SHEETS_TIMEOUT,
+                          limite=2500, paralelas=VENTANAS_PARALELAS, max_filas=MAX_FILAS_VENTANAS):
+    """
+    Descarga una hoja grande en ventanas `limit/offset` en paralelo y las une en orden.
+    Se piden lotes de `paralelas` ventanas hasta que una vuelve incompleta (fin de la hoja),
+    como mucho hasta `max_filas` filas.
+    Si alguna ventana falla, trae más filas que el límite, se pasa del tope o la unión
+    no cuadra, se descarga la hoja entera de una vez.
+    """
+    ventanas = []
+    max_lotes = -(-max_filas // (limite * paralelas))
+    try:
+        with ThreadPoolExecutor(max_workers=paralelas) as executor:
+            for lote_numero in range(max_lotes):
+                offset = lote_numero * paralelas * limite
+                offsets = [offset + i * limite for i in range(paralelas)]
+                lote = list(executor.map(
+                    lambda o: get_sheet_window(sheet_id, o, limite, session, timeout), offsets))
+
+                for o, data in zip(offsets, lote):
+                    if len(gviz_rows(data)) > limite:
+                        raise ValueError(f'La ventana offset={o} trajo {len(gviz_rows(data))} filas (límite {limite})')
+
+                fin = next((i for i, data in enumerate(lote) if len(gviz_rows(data)) < limite), None)
+                if fin is None:
+                    ventanas.extend(zip(offsets, lote))
+                    continue
+
+                # Después de la ventana incompleta no debería haber más filas
+                if any(gviz_rows(data) for data in lote[fin + 1:]):
+                    raise ValueError(f'Hay filas después de la ventana incompleta offset={offsets[fin]}')
+                ventanas.extend(zip(offsets[:fin + 1], lote[:fin + 1]))
+                break
+            else:
+                raise ValueError(f'La hoja supera {max_filas} filas sin llegar al final (¿se ignora el offset?)')
+
+        data = merge_gviz_windows(ventanas, limite)
+        print(f'Hoja descargada en {len(ventanas)} ventanas ({len(gviz_rows(data))} filas)')
+        return data
+    except Exception as e:
+        print(f'Error en descarga por ventanas ({e}), se descarga la hoja completa')
+        return get_sheet_data(sheet_id, session, timeout)
+
+
+def fetch_all_sheets(sheets, timeout=SHEETS_TIMEOUT, deadline=SHEETS_DEADLINE, ventanas=SHEETS_VENTANAS):
+    """
+    Descarga todas las hojas a la vez sobre una única sesión keep-alive.
+    El tiempo total lo marca la hoja más lenta (acotado por `deadline`);
+    las hojas que fallan o no llegan a tiempo quedan en None.
+    Las hojas listadas en `ventanas` se bajan en ventanas paralelas (None para desactivarlo).
+    """
+    resultados = {name: None for name in sheets}
+    if not sheets:
+        return resultados
+
+    inicio = time.monotonic()
+    session = crear_sesion_sheets(pool_size=len(sheets) + VENTANAS_PARALELAS * len(ventanas or {}))
+    executor = ThreadPoolExecutor(max_workers=len(sheets))
+    futures = {}
+    for name, sheet_id in sheets.items():
+        if ventanas and name in ventanas:
+            future = executor.submit(get_sheet_data_ranged, sheet_id, session, timeout, ventanas[name])
+        else:
+            future = executor.submit(get_sheet_data, sheet_id, session, timeout)
+        futures[future] = name
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            name = futures[future]
+            resultados[name] = future.result()
+            print(f'Descargado {name} ({time.monotonic() - inicio:.2f}s)')
+    except FuturesTimeoutError:
+        pendientes = [name for future, name in futures.items() if not future.done()]
+        print(f'Tiempo límite de {deadline}s agotado, sin respuesta de: {", ".join(pendientes)}')
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        session.close()
+
+    print(f'Descarga de {len(sheets)} hojas completada en {time.monotonic() - inicio:.2f}s')
+    return resultados
+
+def hash_sheet_table(data):
+    """Hash estable de la tabla gviz (columnas y filas), sin los metadatos de la respuesta"""
+    table = data.get('table', {})
+    normalizado = dumps_bytes(
+        {'cols': table.get('cols', []), 'rows': table.get('rows', [])},
+        sort_keys=True,
+        minificar=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(normalizado).hexdigest()
+
+
+def cargar_cache_sheets():
+    """Lee el cache de hashes de hojas; si no existe o está corrupto, empieza vacío"""
+    try:
+        return load(SHEETS_CACHE_PATH)
+    except (OSError, ValueError):
+        return {}
+
+
+def guardar_cache_sheets(cache):
+    os.makedirs(os.path.dirname(SHEETS_CACHE_PATH), exist_ok=True)
+    with open(SHEETS_CACHE_PATH, 'wb') as f:
+        f.write(dumps_bytes(cache, indent=2, sort_keys=True))
+
+
+def procesar_si_cambio(sheet_id, data, json_path, procesar):
+    """
+    Ejecuta `procesar(data)` solo si la hoja cambió desde la última corrida
+    (o si falta el JSON de salida). Devuelve False si se omitió.
+    """
+    cache = cargar_cache_sheets()
+    digest = hash_sheet_table(data)
+    entrada = cache.get(sheet_id, {})
+    if entrada.get('hash') == digest and os.path.exists(json_path):
+        print(f'Sin cambios en la hoja, se conserva {json_path}')
+        return False
+
+    procesar(data)
+    cache[sheet_id] = {'hash': digest, 'output': json_path}
+    guardar_cache_sheets(cache)
+    return True
+
+
+def invalidar_cache_sheets(json_path):
+    """Olvida el hash de la hoja que genera `json_path` (p. ej. tras reconstruirlo desde Excel local)"""
+    cache = cargar_cache_sheets()
+    restantes = {sheet_id: e for sheet_id, e in cache.items() if e.get('output') != json_path}
+    if len(restantes) != len(cache):
+        guardar_cache_sheets(restantes)
+
+
+def update_from_sheets(fallback=None):
+    """
+    Actualiza JSONs desde Google Sheets.
+    Las hojas que fallan se reconstruyen solo ellas desde su Excel local.
+    Devuelve los datos descargados para que update_margenes() los reutilice.
+    """
+    fallback = fallback or FallbackLocal()
     try:
         sheets = get_sheet_ids()
-        for name, sheet_id in sheets.items():
+        # catalogo_imagenes se procesa desde el Excel local, no hace falta descargarlo
+        descargas = {name: sheet_id for name, sheet_id in sheets.items() if name != 'catalogo_imagenes'}
+        datos_sheets = fetch_all_sheets(descargas)
+
+        fallidos = []
+        for name in sheets:
             try:
+                if name == 'catalogo_imagenes':
+                    #process_image_catalog(data) EN ESTA LINEA SE VA A LEER EL SHEET DEL DRIVE, PERO TIENE 
+                    #PROBLEMA A VECES, MAS SEGURO ES DEL EXCEL EN LOCAL
+                    print(f'Omitiendo {name} (se procesará desde Excel local)')
+                    continue
+                if name == 'margenes_clientes':
+                    # Se procesa en update_margenes() con los datos ya descargados
+                    continue
+
                 print(f'Procesando {name} desde Google Sheets')
-                data = get_sheet_data(sheet_id)
-                if data:
-                    if name == 'catalogo_imagenes':
-                        # Procesar catálogo de imágenes
-                        #process_image_catalog(data) EN ESTA LINEA SE VA A LEER EL SHEET DEL DRIVE, PERO TIENE 
-                        #PROBLEMA A VECES, MAS SEGURO ES DEL EXCEL EN LOCAL
-                        print(f'Omitiendo {name} (se procesará desde Excel local)')
-                        continue
-
-                    elif name == 'catalogo_grupos':
-                        # Procesar catálogo de grupos
-                        process_catalogo_grupos(data)
-                    else:    
-                        # Procesar otros sheets
-                        process_sheet_data(name, data)
+                data = datos_sheets.get(name)
+                if not data:
+                    print(f'Sin datos de Google Sheets para {name}')
+                    fallidos.append(name)
+                    continue
+
+                if name == 'catalogo_grupos':
+                    # Procesar catálogo de grupos
+                    procesar = process_catalogo_grupos
+                else:    
+                    # Procesar otros sheets
+                    procesar = lambda data, name=name: process_sheet_data(name, data)
+                if procesar_si_cambio(sheets[name], data, f'json/{name}.json', procesar):
                     print(f'Actualizado {name}.json desde Google Sheets')
 
             except Exception as e:
                 print(f'Error procesando {name}: {e}')
-                # Solo actualizar desde local si NO es el catálogo de imágenes
-                if name != 'catalogo_imagenes':
-                    print(f'Intentando actualizar {name} desde Excel local')
-                    update_from_local()
+                fallidos.append(name)
+
+        if fallidos:
+            print(f'Intentando actualizar desde Excel local: {", ".join(fallidos)}')
+            update_from_local(fallidos, fallback)
+
+        return datos_sheets
                   
     except Exception as e:
         print(f'Error en actualización desde Sheets: {e}')
         # Solo actualizar desde local si hubo un error general
         print('Intentando actualización local para archivos no críticos')
-        update_from_local()
+        update_from_local(fallback=fallback)
+        return {}
 
 
 
-def update_from_local():
-    """Actualiza JSONs desde archivos Excel locales"""
+def update_from_local(datasets=None, fallback=None):
+    """Actualiza JSONs desde archivos Excel locales (todos, o solo los `datasets` indicados)"""
     try:
         print('Actualizando desde archivos Excel locales')
-        excel_to_json()
-        process_clients()
-        process_groups()
-        process_promotions()
-        process_catalogo_grupos_local()  # Agregamos el proceso del catálogo
-        process_image_catalog_local()  # Añade esta línea 20-3-25
+        (fallback or FallbackLocal()).ejecutar(datasets or DATASETS_LOCALES)
         print('Actualización local completada')
     except Exception as e:
         print(f'Error en actualización local: {e}')
@@ -101,124 +305,143 @@ def process_sheet_data(name, data):
     """Procesa los datos obtenidos de Google Sheets y los guarda como JSON"""
     try:
         result = {}
+        # La tabla se transpone una sola vez; los procesadores trabajan por columna.
+        # Las fechas se dejan como literal gviz para no cambiar el JSON publicado.
+        _, columnas = gviz_to_columns(data, decode_dates=False, vacia=CELDA_VACIA)
         
         # Solo mostrar logs detallados para clientes_permisos
         if name == 'clientes_permisos':
             print(f'\nProcesando sheet: {name}')
-            print(f'Total de filas encontradas: {len(data["table"]["rows"])}')
-            
-            for index, row in enumerate(data['table']['rows']):
-                print(f'\nRevisando fila {index + 1}:')
-                print(f'Contenido de la fila: {row}')
-                
-                if not row['c'][0]:
-                    print(f'Fila {index + 1} saltada: No tiene datos en la primera columna')
-                    continue
-                    
-                if not row['c'][0].get('v'):
-                    print(f'Fila {index + 1} saltada: No tiene valor en la primera columna')
-                    continue
+            print(f'Total de filas encontradas: {len(gviz_rows(data))}')
 
-                process_client_row(result, row)
+            process_client_columns(result, columnas)
                 
             print(f'\nTotal de clientes procesados: {len(result)}')
             print(f'Clientes procesados: {list(result.keys())}')
+        elif name == 'grupos_clientes':
+            process_group_columns(result, columnas)
+        elif name == 'productos':
+            process_product_columns(result, columnas)
+        elif name == 'promociones':
+            process_promotion_columns(result, columnas)
+
+        if name == 'productos':
+            publicar_productos(result, ensure_ascii=False)
         else:
-            # Para otros sheets, procesar sin logs detallados
-            for row in data['table']['rows']:
-                if row['c'][0] and row['c'][0].get('v'):
-                    if name == 'grupos_clientes':
-                        process_group_row(result, row)
-                    elif name == 'productos':
-                        process_product_row(result, row)
-                    elif name == 'promociones':
-                        process_promotion_row(result, row)
-
-        with open(f'json/{name}.json', 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+            write_json(f'json/{name}.json', result, indent=2, ensure_ascii=False)
             
     except Exception as e:
         print(f'Error procesando datos de {name}: {e}')
         raise
 
 
+# Las columnas vienen de gviz_to_columns(vacia=CELDA_VACIA): una celda nula toma el
+# valor por defecto; una celda presente sin valor ({"v": null}) queda como None,
+# igual que cuando las filas se procesaban una por una.
+
+def _presente(valor):
+    """True si la celda existe y tiene valor (las filas sin clave se saltan)"""
+    return valor is not CELDA_VACIA and bool(valor)
 
-def process_product_row(result, row):
-    """Procesa una fila de productos desde Google Sheets"""
-    codigo = str(row['c'][0]['v'])
+
+def _valores_o(columna, defecto):
+    """Reemplaza las celdas nulas de una columna por `defecto`"""
+    return [defecto if v is CELDA_VACIA else v for v in columna]
+
+
+def _enteros_truncados(columna):
+    """Trunca a entero los valores numéricos; el resto queda en 0"""
+    return [int(v) if isinstance(v, (int, float)) else 0 for v in columna]
+
+
+def _listas_separadas(columna):
+    """Separa por comas cada celda; las nulas quedan como lista vacía ({"v": null} da ['None'])"""
+    return [[] if v is CELDA_VACIA else str(v).split(',') for v in columna]
+
+
+def _cuentas(columna, etiqueta):
+    """Normaliza números de cuenta (12.0 -> '12'); las vacías o inválidas quedan en None"""
+    cuentas = []
+    for valor in columna:
+        if not _presente(valor):
+            cuentas.append(None)
+            continue
+        try:
+            cuentas.append(str(int(float(valor))))
+        except (TypeError, ValueError) as e:
+            print(f'Error procesando {etiqueta} {valor}: {e}')
+            cuentas.append(None)
+    return cuentas
+
+
+def process_product_columns(result, columnas):
+    """Procesa las columnas de productos desde Google Sheets"""
+    codigos, nombres, rubros, bultos = columnas[:4]
 
     #24-3
     # Truncar los precios para eliminar los decimales
-    precio_d = int(row['c'][4]['v']) if row['c'][4] and isinstance(row['c'][4]['v'], (int, float)) else 0
-    precio_e = int(row['c'][5]['v']) if row['c'][5] and isinstance(row['c'][5]['v'], (int, float)) else 0
-    precio_f = int(row['c'][6]['v']) if row['c'][6] and isinstance(row['c'][6]['v'], (int, float)) else 0
-    #24-3
-
-    result[codigo] = {
-        'name': row['c'][1]['v'] if row['c'][1] else '',
-        'category': row['c'][2]['v'] if row['c'][2] else '',
-        'bulk': row['c'][3]['v'] if row['c'][3] else '',
-        'prices': {
-            'D': precio_d,
-            'E': precio_e,
-            'F': precio_f
+    precios_d, precios_e, precios_f = (_enteros_truncados(col) for col in columnas[4:7])
+
+    filas = zip(codigos, _valores_o(nombres, ''), _valores_o(rubros, ''), _valores_o(bultos, ''),
+                precios_d, precios_e, precios_f)
+    for codigo, nombre, rubro, bulto, precio_d, precio_e, precio_f in filas:
+        if not _presente(codigo):
+            continue
+        result[str(codigo)] = {
+            'name': nombre,
+            'category': rubro,
+            'bulk': bulto,
+            'prices': {
+                'D': precio_d,
+                'E': precio_e,
+                'F': precio_f
+            }
         }
-        #'prices': {
-           # 'D': row['c'][4]['v'] if row['c'][4] else 0,
-            #'E': row['c'][5]['v'] if row['c'][5] else 0,
-           # 'F': row['c'][6]['v'] if row['c'][6] else 0
-        #}
-    }
-
-def process_client_row(result, row):
-    """Procesa una fila de clientes desde Google Sheets"""
-    try:
-        # Log de datos crudos
-        print(f'Procesando fila cruda: {row}')
 
-        # Convertir el valor a entero antes de usarlo como key
-        cuenta_valor = row['c'][0]['v']
-        cuenta = str(int(float(cuenta_valor)))  # Convierte a entero y luego a string
-        print(f'Cuenta procesada: {cuenta}')
-        
+def process_client_columns(result, columnas):
+    """Procesa las columnas de clientes desde Google Sheets"""
+    cuentas_valor, nombres, categorias, listas = columnas[:4]
+
+    # Convertir el valor a entero antes de usarlo como key
+    cuentas = _cuentas(cuentas_valor, 'cuenta')
+    saltadas = 0
+    for cuenta, nombre, cats, lista in zip(cuentas, _valores_o(nombres, ''),
+                                           _valores_o(categorias, ''), _valores_o(listas, '')):
+        if cuenta is None:
+            saltadas += 1
+            continue
         result[cuenta] = {
-            'name': row['c'][1]['v'] if row['c'][1] else '',
-            'categories': row['c'][2]['v'] if row['c'][2] else '',
-            'priceList': row['c'][3]['v'] if row['c'][3] else ''
+            'name': nombre,
+            'categories': cats,
+            'priceList': lista
         }
-        print(f'Datos del cliente: {cuenta}')
-        print(f'Cliente {cuenta} agregado exitosamente')
 
-    except Exception as e:
-        print(f'Error procesando cuenta {cuenta_valor if "cuenta_valor" in locals() else "desconocida"}: {e}')
+    if saltadas:
+        print(f'Filas saltadas sin cuenta válida en la primera columna: {saltadas}')
 
-# MODIFICACIÓN 2: Crear process_margin_row()
-def process_margin_row(result, row):
-    """Procesa una fila de márgenes desde Google Sheets"""
-    try:
-        print(f'Procesando fila de margen: {row}')
+# MODIFICACIÓN 2: Procesar márgenes por columnas
+def process_margin_columns(result, columnas):
+    """Procesa las columnas de márgenes desde Google Sheets"""
+    fechas, clientes_valor, nombres, margenes, mostrar = columnas[:5]
+
+    # Cliente está en columna B (índice 1)
+    clientes = _cuentas(clientes_valor, 'margen para cliente')
+    filas = zip(clientes, _valores_o(nombres, ''), margenes, _valores_o(mostrar, 'lista'), _valores_o(fechas, ''))
+    for cliente, nombre, margen, modo, fecha_cambio in filas:
+        if cliente is None:
+            continue
+        try:
+            margen = 0 if margen is CELDA_VACIA else int(margen)
+        except (TypeError, ValueError) as e:
+            print(f'Error procesando margen para cliente {cliente}: {e}')
+            continue
 
-        # Obtener cliente (columna B, índice 1)
-        cliente_valor = row['c'][1]['v']
-        cliente = str(int(float(cliente_valor)))
-        print(f'Cliente procesado: {cliente}')
-        
-        # Obtener datos de las otras columnas
-        nombre = row['c'][2]['v'] if row['c'][2] else ''
-        margen = int(row['c'][3]['v']) if row['c'][3] else 0
-        mostrar = row['c'][4]['v'] if row['c'][4] else 'lista'
-        fecha_cambio = row['c'][0]['v'] if row['c'][0] else ''  # Marca temporal
-        
         result[cliente] = {
             'nombre': nombre,
             'margen': margen,
-            'mostrar': mostrar,
-            'ultima_actualizacion': fecha_cambio
+            'mostrar': modo,
+            'ultima_actualizacion': fecha_cambio  # Marca temporal
         }
-        print(f'Margen para cliente {cliente} agregado exitosamente')
-
-    except Exception as e:
-        print(f'Error procesando margen para cliente {cliente_valor if "cliente_valor" in locals() else "desconocido"}: {e}')
 
 # MODIFICACIÓN 3: Crear función específica para márgenes
 def process_margenes_sheet_data(data):
@@ -227,28 +450,16 @@ def process_margenes_sheet_data(data):
         result = {}
         
         print(f'\nProcesando sheet de márgenes')
-        print(f'Total de filas encontradas: {len(data["table"]["rows"])}')
-        
-        for index, row in enumerate(data['table']['rows']):
-            print(f'\nRevisando fila {index + 1}:')
-            print(f'Contenido de la fila: {row}')
-            
-            # Cliente está en columna B (índice 1)
-            if not row['c'][1]:
-                print(f'Fila {index + 1} saltada: No tiene datos de cliente')
-                continue
-            if not row['c'][1].get('v'):
-                print(f'Fila {index + 1} saltada: No tiene valor de cliente')
-                continue
-            
-            process_margin_row(result, row)
+        print(f'Total de filas encontradas: {len(gviz_rows(data))}')
+
+        _, columnas = gviz_to_columns(data, decode_dates=False, vacia=CELDA_VACIA)
+        process_margin_columns(result, columnas)
             
         print(f'\nTotal de márgenes procesados: {len(result)}')
         print(f'Clientes procesados: {list(result.keys())}')
 
         # Guardar JSON
-        with open('json/margenes_clientes.json', 'w', encoding='utf-8') as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
+        write_json('json/margenes_clientes.json', result, indent=2, ensure_ascii=False)
             
     except Exception as e:
         print(f'Error procesando datos de márgenes: {e}')
@@ -260,44 +471,66 @@ def process_margins_local():
     """Procesa MARGENES_CLIENTES.xlsx y genera margenes_clientes.json"""
     try:
         # Leer Excel
-        df = pd.read_excel('excel/MARGENES_CLIENTES.xlsx')
+        df = leer_excel('excel/MARGENES_CLIENTES.xlsx', 'margenes_clientes')
         
         # Procesar datos
-        margins_data = {}
-        for _, row in df.iterrows():
-            cliente = str(row['Cliente'])
-            margins_data[cliente] = {
-                'nombre': row['Nombre'],
-                'margen': int(row['Margen']),
-                'mostrar': row['Mostrar'],
-                'ultima_actualizacion': str(row['Fecha_Cambio']) if 'Fecha_Cambio' in row else ''
+        if 'Fecha_Cambio' in df.columns:
+            fechas = [str(v) for v in df['Fecha_Cambio'].tolist()]
+        else:
+            fechas = [''] * len(df)
+        columnas = zip(df['Cliente'].tolist(), df['Nombre'].tolist(), df['Margen'].tolist(),
+                       df['Mostrar'].tolist(), fechas)
+        margins_data = {
+            str(cliente): {
+                'nombre': nombre,
+                'margen': int(margen),
+                'mostrar': mostrar,
+                'ultima_actualizacion': fecha
             }
+            for cliente, nombre, margen, mostrar, fecha in columnas
+        }
             
         # Guardar JSON
-        with open('json/margenes_clientes.json', 'w', encoding='utf-8') as f:
-            json.dump(margins_data, f, indent=2, ensure_ascii=False)
+        write_json('json/margenes_clientes.json', margins_data, indent=2, ensure_ascii=False)
             
         print('margenes_clientes.json generado exitosamente')
+        return True
             
     except Exception as e:
         print(f'Error procesando márgenes: {e}')
+        return False
 
 
 # MODIFICACIÓN 5: Crear función específica para actualización local de márgenes
-def update_margenes_from_local():
+def update_margenes_from_local(fallback=None):
     """Actualiza márgenes desde archivo Excel local"""
     try:
         print('Actualizando márgenes desde Excel local')
-        process_margins_local()
+        (fallback or FallbackLocal()).ejecutar(['margenes_clientes'])
         print('Actualización de márgenes local completada')
     except Exception as e:
         print(f'Error en actualización de márgenes local: {e}')
 
 
 # MODIFICACIÓN 6: Crear función específica para actualización de márgenes desde Google Sheets
-def update_margenes_from_sheets():
-    """Actualiza márgenes específicamente desde Google Sheets"""
+def update_margenes_from_sheets(datos_sheets=None, fallback=None):
+    """
+    Actualiza márgenes específicamente desde Google Sheets.
+    Si update_from_sheets() ya descargó la hoja, se reutiliza sin volver a pedirla.
+    """
     try:
+        if datos_sheets and 'margenes_clientes' in datos_sheets:
+            data = datos_sheets['margenes_clientes']
+            if data:
+                print(f'Procesando margenes_clientes desde Google Sheets (ya descargado)')
+                sheet_id = get_sheet_ids()['margenes_clientes']
+                if procesar_si_cambio(sheet_id, data, 'json/margenes_clientes.json', process_margenes_sheet_data):
+                    print(f'Actualizado margenes_clientes.json desde Google Sheets')
+            else:
+                print('No se pudieron obtener datos de Google Sheets, usando Excel local')
+                update_margenes_from_local(fallback)
+            return
+
         sheets = get_sheet_ids()
         
         if 'margenes_clientes' in sheets:
@@ -306,134 +539,147 @@ def update_margenes_from_sheets():
             
             data = get_sheet_data(sheet_id)
             if data:
-                process_margenes_sheet_data(data)
-                print(f'Actualizado margenes_clientes.json desde Google Sheets')
+                if procesar_si_cambio(sheet_id, data, 'json/margenes_clientes.json', process_margenes_sheet_data):
+                    print(f'Actualizado margenes_clientes.json desde Google Sheets')
             else:
                 print('No se pudieron obtener datos de Google Sheets, usando Excel local')
-                update_margenes_from_local()
+                update_margenes_from_local(fallback)
         else:
             print('ID de margenes_clientes no encontrado en config.js')
             
     except Exception as e:
         print(f'Error en actualización de márgenes desde Sheets: {e}')
         print('Intentando actualización local de márgenes')
-        update_margenes_from_local()
+        update_margenes_from_local(fallback)
 
 
 # FUNCIÓN PRINCIPAL PARA ACTUALIZAR SOLO MÁRGENES
-def update_margenes():
+def update_margenes(datos_sheets=None, fallback=None):
     """Función principal para actualizar solo márgenes (Sheets primero, Excel como backup)"""
     try:
         print('Iniciando actualización de márgenes')
-        update_margenes_from_sheets()
+        update_margenes_from_sheets(datos_sheets, fallback)
     except Exception as e:
         print(f'Error en actualización desde Sheets: {e}')
         print('Intentando actualización local')
-        update_margenes_from_local()
+        update_margenes_from_local(fallback)
 
 
 
-def process_group_row(result, row):
-    """Procesa una fila de grupos desde Google Sheets"""
-    nombre_grupo = row['c'][0]['v']
-    clientes = str(row['c'][1]['v']).split(',') if row['c'][1] else []
-    if 'groups' not in result:
-        result['groups'] = {}
-    result['groups'][nombre_grupo] = clientes
+def process_group_columns(result, columnas):
+    """Procesa las columnas de grupos desde Google Sheets"""
+    nombres_grupo, clientes = columnas[:2]
+    for nombre_grupo, lista in zip(nombres_grupo, _listas_separadas(clientes)):
+        if _presente(nombre_grupo):
+            result.setdefault('groups', {})[nombre_grupo] = lista
 
-def process_promotion_row(result, row):
-    """Procesa una fila de promociones desde Google Sheets"""
-    codigo = str(row['c'][0]['v'])
+def process_promotion_columns(result, columnas):
+    """Procesa las columnas de promociones desde Google Sheets"""
+    codigos, tipos, precios, vigencias, grupos = columnas[:5]
 
     #24-3
     # Truncar el precio para eliminar los decimales
-    precio = 0
-    if row['c'][2] and isinstance(row['c'][2]['v'], (int, float)):
-        precio = int(row['c'][2]['v'])
+    precios = _enteros_truncados(precios)
     #24-3
 
-
-    if 'promotions' not in result:
-        result['promotions'] = {}
-    result['promotions'][codigo] = {
-        'tipoLista': row['c'][1]['v'] if row['c'][1] else '',
-        'precio': precio,
-        #24-3 'precio': row['c'][2]['v'] if row['c'][2] else 0,
-        'vigencia': row['c'][3]['v'] if row['c'][3] else '',
-        'grupos': str(row['c'][4]['v']).split(',') if row['c'][4] else []
-    }
+    filas = zip(codigos, _valores_o(tipos, ''), precios, _valores_o(vigencias, ''), _listas_separadas(grupos))
+    for codigo, tipo, precio, vigencia, grupos_promo in filas:
+        if not _presente(codigo):
+            continue
+        result.setdefault('promotions', {})[str(codigo)] = {
+            'tipoLista': tipo,
+            'precio': precio,
+            'vigencia': vigencia,
+            'grupos': grupos_promo
+        }
 
 # Mantener todas las funciones existentes de procesamiento local
 # [Aquí van todas tus funciones existentes sin cambios]
 
 
 
-def process_products(df):
-    products = {}
-    for _, row in df.iterrows():
+def _precios_enteros(serie):
+    """
+    Trunca una columna de precios a enteros (igual que int() celda por celda);
+    los valores no numéricos quedan en 0.
+    """
+    if pd.api.types.is_numeric_dtype(serie) and not pd.api.types.is_bool_dtype(serie):
+        return serie.astype('int64').tolist()
+    return [int(v) if isinstance(v, (int, float)) else 0 for v in serie.tolist()]
 
-        #24-3
-        # Truncar los precios para eliminar los decimales
-        precio_d = int(row['P_LISTA_D']) if isinstance(row['P_LISTA_D'], (int, float)) else 0
-        precio_e = int(row['P_LISTA_E']) if isinstance(row['P_LISTA_E'], (int, float)) else 0
-        precio_f = int(row['P_LISTA_F']) if isinstance(row['P_LISTA_F'], (int, float)) else 0
-        #24-3
 
-        products[row['CODIGO']] = {
-            'name': row['ARTICULO'],
-            'category': row['RUBRO'],
-            'bulk': row['BULTO'],
-            #24-3
-            'prices': {
-                'D': precio_d,
-                'E': precio_e,
-                'F': precio_f
-            }
-            #24-3
+def process_products(df):
+    #24-3
+    # Truncar los precios para eliminar los decimales (por columna, no por fila)
+    precios = zip(*(_precios_enteros(df[col]) for col in ('P_LISTA_D', 'P_LISTA_E', 'P_LISTA_F')))
+    #24-3
 
-            #'prices': {
-             #   'D': row['P_LISTA_D'],
-              #  'E': row['P_LISTA_E'],
-               # 'F': row['P_LISTA_F']
-           # }
+    columnas = zip(df['CODIGO'].tolist(), df['ARTICULO'].tolist(), df['RUBRO'].tolist(),
+                   df['BULTO'].tolist(), precios)
+    products = {
+        codigo: {
+            'name': nombre,
+            'category': rubro,
+            'bulk': bulto,
+            'prices': {'D': precio_d, 'E': precio_e, 'F': precio_f}
         }
+        for codigo, nombre, rubro, bulto, (precio_d, precio_e, precio_f) in columnas
+    }
     print('productos.json generado exitosamente')    
     return products 
 
 
 def excel_to_json():
     # Procesar PRODUCTOS.xlsx
-    df_products = pd.read_excel('excel/PRODUCTOS.xlsx')
+    df_products = leer_excel('excel/PRODUCTOS.xlsx', 'productos')
     products_json = process_products(df_products)
     
     # Guardar JSONs
-    with open('json/productos.json', 'w') as f:
-        json.dump(products_json, f, indent=2)
+    publicar_productos(products_json)
+
+
+def publicar_productos(products, ensure_ascii=True):
+    """
+    Escribe productos.json y, si PRODUCTOS_SHARDS indica un criterio ('rubro' o
+    'prefijo'), también los fragmentos de json/productos/ con su índice.
+    Con PRODUCTOS_COLUMNAR=1 escribe además productos_columnar.json.
+    """
+    write_json('json/productos.json', products, indent=2, ensure_ascii=ensure_ascii)
+    criterio = os.environ.get('PRODUCTOS_SHARDS')
+    if criterio:
+        escribir_shards(products, criterio, ensure_ascii=ensure_ascii)
+    if os.environ.get('PRODUCTOS_COLUMNAR') == '1':
+        write_json('json/productos_columnar.json', productos_a_columnas(products),
+                   ensure_ascii=ensure_ascii, minificar=True)
 
 
 def process_clients():
     """Procesa CLIENTES_PERMISOS.xlsx y genera clients.json"""
     try:
         # Leer Excel
-        df = pd.read_excel('excel/CLIENTES_PERMISOS.xlsx')
+        df = leer_excel('excel/CLIENTES_PERMISOS.xlsx', 'clientes_permisos')
         
         # Procesar datos
-        clients_data = {}
-        for _, row in df.iterrows():
-            clients_data[str(row['CUENTA'])] = {
-                'name': row['NOMBRE'],
-                'categories': row['CATEGORIAS'],
-                'priceList': row['LISTA_PRECIOS']
+        columnas = zip(df['CUENTA'].tolist(), df['NOMBRE'].tolist(),
+                       df['CATEGORIAS'].tolist(), df['LISTA_PRECIOS'].tolist())
+        clients_data = {
+            str(cuenta): {
+                'name': nombre,
+                'categories': categorias,
+                'priceList': lista
             }
+            for cuenta, nombre, categorias, lista in columnas
+        }
             
         # Guardar JSON
-        with open('json/clientes_permisos.json', 'w') as f:
-            json.dump(clients_data, f, indent=2)
+        write_json('json/clientes_permisos.json', clients_data, indent=2)
             
         print('clientes_permisos.json generado exitosamente')
+        return True
             
     except Exception as e:
-        print(f'Error procesando clientes: {e}')     
+        print(f'Error procesando clientes: {e}')
+        return False     
 
 
 
@@ -441,62 +687,59 @@ def process_groups():
         """Procesa GRUPOS_CLIENTES.xlsx y genera groups.json"""
         try:
             # Leer Excel
-            df = pd.read_excel('excel/GRUPOS_CLIENTES.xlsx')
+            df = leer_excel('excel/GRUPOS_CLIENTES.xlsx', 'grupos_clientes')
             
             # Procesar datos
-            groups_data = {"groups": {}}
-            for _, row in df.iterrows():
-                group_name = row['NOMBRE_GRUPO']
-                clients = str(row['CLIENTES']).split(',')
-                groups_data["groups"][group_name] = clients
+            clientes = [str(v).split(',') for v in df['CLIENTES'].tolist()]
+            groups_data = {"groups": dict(zip(df['NOMBRE_GRUPO'].tolist(), clientes))}
                 
             # Guardar JSON
-            with open('json/grupos_clientes.json', 'w') as f:
-                json.dump(groups_data, f, indent=2)
+            write_json('json/grupos_clientes.json', groups_data, indent=2)
                 
             print('grupos_clientes.json generado exitosamente')
+            return True
                 
         except Exception as e:
             print(f'Error procesando grupos: {e}')
+            return False
 
 def process_promotions():
     """Procesa PROMOCIONES.xlsx y genera promotions.json"""
     try:
         # Leer Excel
-        df = pd.read_excel('excel/PROMOCIONES.xlsx')
+        df = leer_excel('excel/PROMOCIONES.xlsx', 'promociones')
 
         # Convertir todas las columnas de tipo datetime a cadenas 
         for column in df.select_dtypes(include=['datetime']): 
             df[column] = df[column].astype(str)
         
+        #24-3   
+        # Truncar el precio para eliminar los decimales
+        precios = _precios_enteros(df['PRECIO_ESPECIAL'])
+        #24-3
+
         # Procesar datos
-        promotions_data = {"promotions": {}}
-        for _, row in df.iterrows():
-            code = row['CODIGO_PRODUCTO']
-
-             #24-3   
-             # Truncar el precio para eliminar los decimales
-            precio = 0
-            if isinstance(row['PRECIO_ESPECIAL'], (int, float)):
-                precio = int(row['PRECIO_ESPECIAL'])
-            #24-3
-
-            promotions_data["promotions"][code] = {
-                "tipoLista": row['TIPO_LISTA'],
+        columnas = zip(df['CODIGO_PRODUCTO'].tolist(), df['TIPO_LISTA'].tolist(), precios,
+                       df['VIGENCIA_HASTA'].tolist(), df['GRUPOS'].tolist())
+        promotions_data = {"promotions": {
+            code: {
+                "tipoLista": tipo,
                 "precio": precio,
-                #24-3 "precio": row['PRECIO_ESPECIAL'],
-                "vigencia": row['VIGENCIA_HASTA'],
-                "grupos": row['GRUPOS'].split(',')
+                "vigencia": vigencia,
+                "grupos": grupos.split(',')
             }
+            for code, tipo, precio, vigencia, grupos in columnas
+        }}
             
         # Guardar JSON
-        with open('json/promociones.json', 'w') as f:
-            json.dump(promotions_data, f, indent=2)
+        write_json('json/promociones.json', promotions_data, indent=2)
             
         print('promociones.json generado exitosamente')
+        return True
             
     except Exception as e:
         print(f'Error procesando promociones: {e}')
+        return False
 
     def convert_excel_to_json(input_dir='excel', output_dir='json'):
         """
@@ -528,23 +771,61 @@ def process_promotions():
                 data = df.to_dict('records')
                 
                 # Guardar JSON
-                with open(json_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2)
+                write_json(json_path, data, indent=2, ensure_ascii=False)
                 
                 print(f"Archivo {excel_file} convertido exitosamente a {json_file}")
                 
             except Exception as e:
                 print(f"Error procesando {excel_file}: {str(e)}")
 
+def _medir_tarea(funcion, args):
+    """Corre una tarea en el proceso hijo y devuelve (resultado, segundos, error)"""
+    inicio = time.perf_counter()
+    try:
+        return funcion(*args), time.perf_counter() - inicio, None
+    except Exception as e:
+        return None, time.perf_counter() - inicio, f'{type(e).__name__}: {e}'
+
+
+def ejecutar_en_paralelo(tareas, max_workers=None):
+    """
+    Ejecuta tareas independientes [(nombre, funcion, args), ...] en un pool de procesos
+    del tamaño de la máquina. Devuelve, en el orden recibido, (nombre, resultado, segundos, error)
+    por tarea: un error en una conversión no corta las demás.
+    """
+    if not tareas:
+        return []
+
+    inicio = time.perf_counter()
+    if len(tareas) == 1:
+        nombre, funcion, args = tareas[0]
+        resultados = [(nombre, *_medir_tarea(funcion, args))]
+    else:
+        workers = max_workers or min(len(tareas), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [(nombre, executor.submit(_medir_tarea, funcion, args)) for nombre, funcion, args in tareas]
+            resultados = []
+            for nombre, future in futures:
+                try:
+                    resultados.append((nombre, *future.result()))
+                except Exception as e:  # p. ej. el proceso hijo murió
+                    resultados.append((nombre, None, 0.0, f'{type(e).__name__}: {e}'))
+
+    for nombre, _, segundos, error in resultados:
+        estado = f'ERROR ({error})' if error else 'ok'
+        print(f'  {nombre}: {segundos:.2f}s {estado}')
+    print(f'{len(tareas)} conversiones en {time.perf_counter() - inicio:.2f}s')
+    return resultados
+
+
 def convert_excel_to_json(excel_file, json_file,silent=False):
     """
     Convierte un archivo Excel específico a JSON.
     """
     try:
-        df = pd.read_excel(excel_file)
+        df = leer_excel(excel_file)
         data = df.to_dict('records')
-        with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        write_json(json_file, data, indent=2, ensure_ascii=False)
         if not silent:  # Solo imprime si silent es False  
             print(f"Successfully converted {os.path.basename(excel_file)} to {os.path.basename(json_file)}")
         return True
@@ -573,16 +854,20 @@ def convert_all_excel_files(excel_dir, json_dir,silent=False):
     }
     
     results = []
+    tareas = []
     for excel_file, json_file in excel_files.items():
         excel_path = os.path.join(excel_dir, excel_file)
         json_path = os.path.join(json_dir, json_file)
         
         if os.path.exists(excel_path):
-            success = convert_excel_to_json(excel_path, json_path, silent)
-            results.append((json_file, success))
+            tareas.append((json_file, convert_excel_to_json, (excel_path, json_path, silent)))
         elif not silent:
             print(f"Archivo Excel no encontrado: {excel_file}")
             results.append((json_file, False))
+
+    # Los libros no dependen entre sí: se convierten en paralelo
+    for json_file, success, _, error in ejecutar_en_paralelo(tareas):
+        results.append((json_file, bool(success) and error is None))
     return all(success for _, success in results)        
 
 # AGREGUE ESTO- MANEJO CATALOGO GRUPOS, CONVIERTE EXCEL LOCAL A JSON
@@ -618,8 +903,7 @@ def process_catalogo_grupos(data):
         # Guardar JSON
         os.makedirs(os.path.dirname(json_path), exist_ok=True)
         print('Guardando resultados...')
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(catalogo_json, f, indent=2, ensure_ascii=False)
+        write_json(json_path, catalogo_json, indent=2, ensure_ascii=False)
             
         # Reporte final
         for grupo, productos in catalogo_json.items():
@@ -637,6 +921,14 @@ Proceso completado exitosamente:
         print(f'Error procesando catálogo de grupos: {str(e)}')
         raise
 
+def limpiar_codigos_grupo(df):
+    """Códigos de producto de una hoja de grupo: sin vacíos, sin espacios y sin repetidos"""
+    return (df['Codigo_Producto']
+            .dropna()
+            .str.strip()
+            .unique()
+            .tolist())
+
 def process_catalogo_grupos_local():
     """
     Procesa el catálogo de grupos desde Excel local.
@@ -647,41 +939,27 @@ def process_catalogo_grupos_local():
         json_path = 'json/catalogo_grupos.json'
         
         print('Iniciando procesamiento del catálogo de grupos...')
-        excel = pd.ExcelFile(excel_path)
+        # Todas las hojas (grupos) en una sola pasada por el libro, solo la columna necesaria
+        hojas = leer_excel(excel_path, 'catalogo_grupos', sheet_name=None)
         
         # Obtener nombres de grupos de las hojas
-        grupos = excel.sheet_names
+        grupos = list(hojas)
         print(f'Se encontraron {len(grupos)} grupos para procesar')
         
+        # Limpiar cada grupo (hoja) en paralelo; map conserva el orden de las hojas
+        with ThreadPoolExecutor(max_workers=min(8, len(grupos) or 1)) as executor:
+            listas = list(executor.map(limpiar_codigos_grupo, hojas.values()))
+
         catalogo_json = {}
-        
-        # Procesar cada grupo (hoja)
-        for nombre_grupo in grupos:
-            print(f'Procesando grupo: {nombre_grupo}')
-            
-            # Leer solo la columna necesaria
-            df = pd.read_excel(
-                excel,
-                sheet_name=nombre_grupo,
-                usecols=['Codigo_Producto'],
-                dtype={'Codigo_Producto': str}
-            )
-            
-            # Procesar y limpiar datos
-            productos = (df['Codigo_Producto']
-                        .dropna()
-                        .str.strip()
-                        .unique()
-                        .tolist())
-            
+        for nombre_grupo, productos in zip(grupos, listas):
             catalogo_json[nombre_grupo] = productos
+            print(f'Procesando grupo: {nombre_grupo}')
             print(f'  → {len(productos)} productos procesados')
 
         # Guardar JSON
         os.makedirs(os.path.dirname(json_path), exist_ok=True)
         print('Guardando catálogo en JSON...')
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(catalogo_json, f, indent=2, ensure_ascii=False)
+        write_json(json_path, catalogo_json, indent=2, ensure_ascii=False)
             
         # Reporte final
         total_productos = sum(len(productos) for productos in catalogo_json.values())
@@ -725,9 +1003,7 @@ def process_image_catalog(data):
 
         # Guardar el archivo
         os.makedirs(os.path.dirname(json_path), exist_ok=True)
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
-            f.flush()
+        write_json(json_path, output, indent=2, ensure_ascii=False, conservar=('lastUpdate',))
         
         print(f"Catálogo de imágenes actualizado exitosamente")
 
@@ -749,11 +1025,10 @@ def verify_json_file(file_path):
             print(f"¡Error! El archivo no existe en: {file_path}")
             return False
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = json.load(f)
-            print(f"Contenido actual del archivo:")
-            print(json.dumps(content, indent=2))
-            return True
+        content = load(file_path)
+        print(f"Contenido actual del archivo:")
+        print(dumps(content, indent=2))
+        return True
     except Exception as e:
         print(f"Error verificando archivo: {str(e)}")
         return False
@@ -768,20 +1043,21 @@ def process_image_catalog_local():
         
         if not os.path.exists(excel_path):
             print(f"Archivo no encontrado: {excel_path}")
-            return
+            return False
             
         # Leer Excel
-        df = pd.read_excel(excel_path)
+        df = leer_excel(excel_path, 'catalogo_imagenes')
         
         # Crear mapa de imágenes
-        new_images = {}
-        for _, row in df.iterrows():
-            # Usar la columna 'articulo' como código y la columna 'id' como ID de imagen
-            codigo = str(row.get('articulo', '')).strip()
-            image_id = str(row.get('id', '')).strip()
-            
-            if codigo and image_id:
-                new_images[codigo] = image_id
+        # Usar la columna 'articulo' como código y la columna 'id' como ID de imagen
+        vacia = [''] * len(df)
+        codigos = [str(v).strip() for v in df['articulo'].tolist()] if 'articulo' in df.columns else vacia
+        image_ids = [str(v).strip() for v in df['id'].tolist()] if 'id' in df.columns else vacia
+        new_images = {
+            codigo: image_id
+            for codigo, image_id in zip(codigos, image_ids)
+            if codigo and image_id
+        }
                 
         # Crear el objeto de salida directamente con las nuevas imágenes
         output = {
@@ -796,13 +1072,14 @@ def process_image_catalog_local():
         
         # Guardar JSON
         os.makedirs(os.path.dirname(json_path), exist_ok=True)
-        with open(json_path, 'w', encoding='utf-8') as f:
-            json.dump(output, f, indent=2, ensure_ascii=False)
+        write_json(json_path, output, indent=2, ensure_ascii=False, conservar=('lastUpdate',))
             
         print(f'catalogo_imagenes.json generado exitosamente desde Excel local')
+        return True
             
     except Exception as e:
         print(f'Error procesando catálogo de imágenes local: {str(e)}')
+        return False
 
 def handle_git_conflicts(file_path):
     """Maneja conflictos de Git en archivos JSON"""
@@ -836,26 +1113,88 @@ def handle_git_conflicts(file_path):
 
 
 
+DATASETS_LOCALES = [
+    'productos',
+    'clientes_permisos',
+    'grupos_clientes',
+    'promociones',
+    'catalogo_grupos',
+    'catalogo_imagenes',
+]
+
+
+class FallbackLocal:
+    """
+    Planificador del respaldo local de una corrida: reconstruye desde su Excel
+    solo los datasets que se le piden y nunca repite una conversión en la misma corrida.
+    Las conversiones pasan por build_manifest: las que están al día (mismo Excel
+    y el JSON no se reemplazó desde entonces) no se vuelven a ejecutar.
+    """
+
+    def __init__(self):
+        self.ejecutados = set()
+
+    def ejecutar(self, datasets):
+        """Ejecuta en paralelo la conversión local de cada dataset pendiente"""
+        pendientes = []
+        for name in datasets:
+            if name in self.ejecutados:
+                print(f'{name} ya se reconstruyó desde Excel local en esta corrida, se omite')
+                continue
+            if name not in OBJETIVOS:
+                print(f'No hay conversión local para {name}')
+                continue
+
+            self.ejecutados.add(name)
+            pendientes.append(name)
+
+        if not pendientes:
+            return
+        for name, estado in construir(pendientes).items():
+            if estado == 'error':
+                print(f'Error reconstruyendo {name} desde Excel local')
+            else:
+                # El JSON ya no corresponde a la última versión vista de la hoja
+                invalidar_cache_sheets(f'json/{name}.json')
+
+
 def main():
     """Función principal que intenta primero Google Sheets y luego local"""
+    fallback = FallbackLocal()
     try:
         print('Iniciando actualización de JSONs')
         if not verify_json_file('json/catalogo_imagenes.json'):  # Pasamos la ruta del archivo
             print("Error: No se puede escribir en el directorio json")
             return
         print('Iniciando actualización de JSONs')
-        update_from_sheets()
-        update_margenes()  # NUEVA LÍNEA - Actualizar márgenes desde Google Sheets
+        datos_sheets = update_from_sheets(fallback)
+        update_margenes(datos_sheets, fallback)  # Reutiliza la hoja de márgenes ya descargada
     except Exception as e:
         print(f'Error en actualización desde Sheets: {e}')
         print('Intentando actualización local')
-        update_from_local()
-        update_margenes_from_local()  # NUEVA LÍNEA - Actualizar márgenes desde Excel local
+        update_from_local(fallback=fallback)
+        update_margenes_from_local(fallback)  # NUEVA LÍNEA - Actualizar márgenes desde Excel local
+
+# JSON publicados que entran en el reporte de tamaños
+JSON_REPORTE = [
+    'json/productos.json', 'json/clientes_permisos.json', 'json/grupos_clientes.json',
+    'json/promociones.json', 'json/margenes_clientes.json', 'json/catalogo_grupos.json',
+    'json/catalogo_imagenes.json', 'json/productos_columnar.json',
+]
 
 if __name__ == "__main__":
-    import sys
+    configurar_salida_desde_argv(sys.argv)  # --minify / --precompress
+    for arg in sys.argv:
+        if arg.startswith('--shards'):  # --shards (por rubro) o --shards=prefijo
+            os.environ['PRODUCTOS_SHARDS'] = arg.partition('=')[2] or 'rubro'
+    if '--columnar' in sys.argv:
+        os.environ['PRODUCTOS_COLUMNAR'] = '1'
     if '--solo-imagenes' in sys.argv:
         print('Modo: solo actualización de catálogo de imágenes')
-        process_image_catalog_local()
+        construir(['catalogo_imagenes'])
     else:
-        main()
\ No newline at end of file
+        main()
+    registrar_versiones()  # Parches contra el build anterior (json/deltas/)
+    publicar_hasheados()  # Copias con hash en el nombre + json/manifest.json
+    if '--size-report' in sys.argv:
+        reporte_tamanos(JSON_REPORTE)
\ No newline at end of file
@@ -0,0 +1,165 @@
+# scripts/gviz.py
+"""
+Decodificación de respuestas gviz (tqx=out:json) de Google Sheets.
+
+La respuesta viene envuelta en JSONP:
+
+    /*O_o*/
+    google.visualization.Query.setResponse({...});
+
+En lugar de recortar offsets fijos de `response.text`, se busca el sobre
+`setResponse(` y se decodifica el objeto directamente desde esa posición.
+"""
+import json
+import re
+from datetime import date, datetime
+from itertools import zip_longest
+
+ENVELOPE = 'setResponse('
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+
+# Literal de fecha gviz: Date(año, mes_base_0, día[, hora, minuto, segundo[, ms]])
+DATE_LITERAL = re.compile(r'^Date\((\d+(?:,\s*\d+){2,6})\)$')
+
+
+def decode_gviz_payload(text):
+    """Extrae el objeto de respuesta gviz de un texto JSONP sin copiar subcadenas"""
+    inicio = text.find(ENVELOPE)
+    if inicio == -1:
+        raise ValueError('Respuesta gviz sin sobre setResponse(')
+
+    # raw_decode parsea desde el índice indicado: no hace falta recortar el texto
+    data, fin = _decoder.raw_decode(text, inicio + len(ENVELOPE))
+    if not text.startswith(')', fin):
+        raise ValueError(f'Respuesta gviz mal cerrada en la posición {fin}')
+
+    if data.get('status') == 'error':
+        errores = '; '.join(e.get('detailed_message') or e.get('message', '') for e in data.get('errors', []))
+        raise ValueError(f'Google Sheets devolvió un error: {errores}')
+    if 'table' not in data:
+        raise ValueError('Respuesta gviz sin tabla')
+    return data
+
+
+def read_gviz_response(response, chunk_size=CHUNK_SIZE):
+    """
+    Lee el cuerpo de una respuesta HTTP (requests, idealmente con stream=True)
+    por bloques en un único buffer y lo decodifica una sola vez.
+
+    Solo la lectura es por bloques: el JSON se parsea entero al final, así que
+    el cuerpo completo queda en memoria. Se decodifica siempre como UTF-8 (el
+    JSON de gviz lo es) y no con `response.encoding`, que requests pone en
+    ISO-8859-1 cuando el Content-Type no trae charset.
+    """
+    buffer = bytearray()
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        buffer += chunk
+    return decode_gviz_payload(buffer.decode('utf-8'))
+
+
+# Marca de celda nula (`null` en la fila) para gviz_to_columns(vacia=CELDA_VACIA):
+# la distingue de una celda presente sin valor ({"v": null}), que queda en None
+CELDA_VACIA = type('CeldaVacia', (), {'__repr__': lambda self: 'CELDA_VACIA'})()
+
+
+def gviz_columns(data):
+    """Metadatos tipados de las columnas: id, label, type y pattern (si lo hay)"""
+    return [
+        {
+            'id': col.get('id', ''),
+            'label': col.get('label', ''),
+            'type': col.get('type', 'string'),
+            'pattern': col.get('pattern'),
+        }
+        for col in data['table'].get('cols', [])
+    ]
+
+
+def gviz_rows(data):
+    """Filas de la tabla gviz tal como las entrega Google ({'c': [...]})"""
+    return data['table'].get('rows', [])
+
+
+def parse_gviz_date(valor):
+    """
+    Convierte un literal `Date(y,m,d[,h,mi,s[,ms]])` en date/datetime.
+    Ojo: gviz cuenta los meses desde 0. Si no es un literal válido, devuelve el valor tal cual.
+    """
+    if not isinstance(valor, str):
+        return valor
+    match = DATE_LITERAL.match(valor)
+    if not match:
+        return valor
+    partes = [int(p) for p in match.group(1).split(',')]
+    partes[1] += 1
+    if len(partes) == 3:
+        return date(*partes)
+    if len(partes) == 7:
+        partes[6] *= 1000  # milisegundos -> microsegundos
+    return datetime(*partes)
+
+
+def gviz_to_columns(data, decode_dates=True, vacia=None):
+    """
+    Transpone la tabla gviz una sola vez a columnas de valores crudos (`v`).
+    Devuelve (cols, columnas), donde columnas[i] es la lista de valores de cols[i]
+    (`vacia` para celdas nulas o faltantes; None para {"v": null}). Con
+    decode_dates, las columnas date/datetime se convierten a objetos date/datetime.
+    """
+    cols = gviz_columns(data)
+    valores = (
+        [celda.get('v') if celda else vacia for celda in (row.get('c') or [])]
+        for row in gviz_rows(data)
+    )
+    # zip_longest completa con `vacia` las filas más cortas que la cabecera
+    columnas = [list(col) for col in zip_longest(*valores, fillvalue=vacia)] if cols else []
+    columnas = columnas[:len(cols)]
+    while len(columnas) < len(cols):
+        columnas.append([vacia] * len(gviz_rows(data)))
+
+    if decode_dates:
+        for i, col in enumerate(cols):
+            if col['type'] in ('date', 'datetime'):
+                columnas[i] = [parse_gviz_date(v) for v in columnas[i]]
+    return cols, columnas
+
+
+def merge_gviz_windows(ventanas, limite):
+    """
+    Une en orden las respuestas de consultas `limit/offset` de una misma hoja.
+    `ventanas` es una lista de (offset, data) ordenada por offset. Verifica que
+    todas compartan columnas, que no falten filas entre ventanas (solo la última
+    puede venir incompleta) y que no se repitan filas en los bordes.
+    Lanza ValueError si algo no cuadra.
+    """
+    if not ventanas:
+        raise ValueError('No hay ventanas para unir')
+
+    _, primera = ventanas[0]
+    columnas = [(c['id'], c['label'], c['type']) for c in gviz_columns(primera)]
+    filas = []
+    offset_esperado = 0
+    anterior = None
+
+    for indice, (offset, data) in enumerate(ventanas):
+        if offset != offset_esperado:
+            raise ValueError(f'Ventana fuera de orden: offset {offset}, se esperaba {offset_esperado}')
+        if [(c['id'], c['label'], c['type']) for c in gviz_columns(data)] != columnas:
+            raise ValueError(f'Las columnas de la ventana offset={offset} no coinciden con la primera')
+
+        actuales = gviz_rows(data)
+        es_ultima = indice == len(ventanas) - 1
+        if len(actuales) > limite or (not es_ultima and len(actuales) != limite):
+            raise ValueError(f'La ventana offset={offset} trajo {len(actuales)} filas (límite {limite}): faltan o sobran filas')
+        if anterior and actuales and anterior[-1] == actuales[0]:
+            raise ValueError(f'Fila duplicada en el borde de la ventana offset={offset}')
+
+        filas.extend(actuales)
+        anterior = actuales
+        offset_esperado += limite
+
+    unida = dict(primera)
+    unida['table'] = dict(primera['table'], rows=filas)
+    return unida
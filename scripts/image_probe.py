@@ -0,0 +1,174 @@
+# scripts/image_probe.py
+"""
+Dimensiones exactas de una imagen leyendo solo su cabecera.
+
+Se pide a lh3 el comienzo del archivo con un Range (`bytes=0-16383`) y se
+parsea la cabecera del formato:
+- PNG: chunk IHDR.
+- GIF: descriptor lógico de pantalla.
+- JPEG: primer marcador SOFn (y la orientación EXIF, que intercambia ancho
+  y alto en las rotaciones de 90°).
+- WebP: chunks VP8 (con pérdida), VP8L (sin pérdida) y VP8X (extendido).
+
+Si el servidor ignora el Range y responde el archivo completo, se deja de
+leer al llegar al límite. Si la cabecera no entra en el primer bloque (un
+JPEG con una miniatura EXIF grande, por ejemplo), se pide un bloque mayor.
+"""
+import struct
+
+BYTES_INICIALES = 16 * 1024
+BYTES_MAXIMOS = 128 * 1024
+USER_AGENT = 'Mozilla/5.0'
+
+# SOF0..SOF15 salvo DHT (C4), JPG (C8) y DAC (CC)
+_MARCADORES_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def _png(datos):
+    if len(datos) >= 24 and datos[12:16] == b'IHDR':
+        return struct.unpack('>II', datos[16:24])
+    return None
+
+
+def _gif(datos):
+    if len(datos) >= 10:
+        return struct.unpack('<HH', datos[6:10])
+    return None
+
+
+def _orientacion_exif(segmento):
+    """Orientación EXIF (1-8) de un segmento APP1, o None"""
+    if not segmento.startswith(b'Exif\x00\x00') or len(segmento) < 14:
+        return None
+    tiff = segmento[6:]
+    orden = {b'II': '<', b'MM': '>'}.get(tiff[:2])
+    if orden is None:
+        return None
+    offset = struct.unpack(orden + 'I', tiff[4:8])[0]
+    if offset + 2 > len(tiff):
+        return None
+    entradas = struct.unpack(orden + 'H', tiff[offset:offset + 2])[0]
+    for i in range(entradas):
+        inicio = offset + 2 + i * 12
+        if inicio + 12 > len(tiff):
+            return None
+        etiqueta, tipo = struct.unpack(orden + 'HH', tiff[inicio:inicio + 4])
+        if etiqueta == 0x0112 and tipo == 3:
+            return struct.unpack(orden + 'H', tiff[inicio + 8:inicio + 10])[0]
+    return None
+
+
+def _jpeg(datos):
+    posicion = 2
+    orientacion = None
+    while posicion + 4 <= len(datos):
+        if datos[posicion] != 0xFF:
+            return None  # flujo corrupto
+        marcador = datos[posicion + 1]
+        if marcador == 0xFF:  # relleno entre marcadores
+            posicion += 1
+            continue
+        if marcador in (0x01, 0xD8) or 0xD0 <= marcador <= 0xD7:  # marcadores sin longitud
+            posicion += 2
+            continue
+        largo = struct.unpack('>H', datos[posicion + 2:posicion + 4])[0]
+        if marcador in _MARCADORES_SOF:
+            if posicion + 9 > len(datos):
+                return None
+            alto, ancho = struct.unpack('>HH', datos[posicion + 5:posicion + 9])
+            if orientacion in (5, 6, 7, 8):
+                ancho, alto = alto, ancho
+            return ancho, alto
+        if marcador == 0xE1 and orientacion is None:
+            orientacion = _orientacion_exif(datos[posicion + 4:posicion + 2 + largo])
+        if marcador == 0xDA:  # comienzo de los datos de imagen sin SOF: no se puede saber
+            return None
+        posicion += 2 + largo
+    return None
+
+
+def _webp(datos):
+    if len(datos) < 30:
+        return None
+    chunk = datos[12:16]
+    if chunk == b'VP8 ':
+        # Cabecera del frame clave: firma 9d 01 2a y dimensiones de 14 bits
+        if datos[23:26] != b'\x9d\x01\x2a':
+            return None
+        ancho, alto = struct.unpack('<HH', datos[26:30])
+        return ancho & 0x3FFF, alto & 0x3FFF
+    if chunk == b'VP8L':
+        if datos[20] != 0x2F:
+            return None
+        bits = struct.unpack('<I', datos[21:25])[0]
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        ancho = int.from_bytes(datos[24:27], 'little') + 1
+        alto = int.from_bytes(datos[27:30], 'little') + 1
+        return ancho, alto
+    return None
+
+
+def detectar_formato(datos):
+    if datos.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if datos[:6] in (b'GIF87a', b'GIF89a'):
+        return 'gif'
+    if datos.startswith(b'\xff\xd8'):
+        return 'jpeg'
+    if datos[:4] == b'RIFF' and datos[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+
+_PARSERS = {'png': _png, 'gif': _gif, 'jpeg': _jpeg, 'webp': _webp}
+
+
+def dimensiones_de_cabecera(datos):
+    """
+    (ancho, alto, formato) a partir de los primeros bytes de una imagen, o None
+    si el formato no se reconoce o la cabecera está incompleta.
+    """
+    formato = detectar_formato(datos)
+    if formato is None:
+        return None
+    try:
+        dimensiones = _PARSERS[formato](datos)
+    except (struct.error, IndexError):
+        return None
+    if not dimensiones or not all(dimensiones):
+        return None
+    return dimensiones[0], dimensiones[1], formato
+
+
+def leer_inicio(session, url, limite, timeout=10, estados=None):
+    """
+    Primeros `limite` bytes de la URL (Range; si el servidor lo ignora, se corta la lectura).
+    Si se pasa la lista `estados`, se le agrega el código HTTP de la respuesta (200 o 206).
+    """
+    headers = {'User-Agent': USER_AGENT, 'Range': f'bytes=0-{limite - 1}'}
+    with session.get(url, headers=headers, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        if estados is not None:
+            estados.append(response.status_code)
+        datos = bytearray()
+        for chunk in response.iter_content(chunk_size=8192):
+            datos += chunk
+            if len(datos) >= limite:
+                break
+    return bytes(datos[:limite])
+
+
+def sondear_imagen(session, url, timeout=10, estados=None):
+    """
+    Dimensiones reales de la imagen en `url` como (ancho, alto, formato), o None.
+    Empieza con BYTES_INICIALES y amplía el rango hasta BYTES_MAXIMOS si hace falta.
+    `estados` junta los códigos HTTP de cada pedido (ver leer_inicio).
+    """
+    limite = BYTES_INICIALES
+    while True:
+        datos = leer_inicio(session, url, limite, timeout, estados)
+        resultado = dimensiones_de_cabecera(datos)
+        if resultado is not None or len(datos) < limite or limite >= BYTES_MAXIMOS:
+            return resultado
+        limite = min(limite * 4, BYTES_MAXIMOS)
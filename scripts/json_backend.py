@@ -0,0 +1,120 @@
+# scripts/json_backend.py
+"""
+Backend de serialización JSON para todos los scripts.
+
+Si orjson está instalado (`pip install orjson`) se usa para leer y escribir;
+si no, la biblioteca estándar. La salida es idéntica byte a byte a
+json.dumps(indent=2 / separators compactos, ensure_ascii=...), así que
+cambiar de backend no genera diffs en json/:
+
+- ensure_ascii=True: orjson escribe UTF-8; se escapan después los
+  caracteres no ASCII (y DEL) como \\uXXXX, igual que la estándar.
+- Los datos que orjson escribiría distinto (NaN/Infinity, floats con
+  exponente, claves no string, enteros de más de 64 bits, indent != 2)
+  se serializan con la biblioteca estándar.
+- Al leer, lo que orjson rechaza (p. ej. NaN, que pandas deja en algunos
+  JSON) se vuelve a leer con la biblioteca estándar.
+
+JSON_BACKEND=json fuerza la biblioteca estándar.
+Benchmark con los archivos reales: python scripts/benchmark_json.py
+"""
+import json
+import math
+import os
+import re
+
+try:
+    import orjson
+except ImportError:  # opcional: sin orjson se usa la biblioteca estándar
+    orjson = None
+
+_NO_ASCII = re.compile('[\x7f-\U0010ffff]')
+
+
+def backend():
+    """Nombre del backend en uso ('orjson' o 'json')"""
+    if orjson is None or os.environ.get('JSON_BACKEND') == 'json':
+        return 'json'
+    return 'orjson'
+
+
+def _escapar_no_ascii(match):
+    codigo = ord(match.group(0))
+    if codigo < 0x10000:
+        return f'\\u{codigo:04x}'
+    codigo -= 0x10000
+    return f'\\u{0xd800 | (codigo >> 10):04x}\\u{0xdc00 | (codigo & 0x3ff):04x}'
+
+
+def _float_compatible(valor):
+    # repr usa exponente fuera de [1e-4, 1e16); orjson lo escribe sin '+' ni ceros ('1e16')
+    return math.isfinite(valor) and (valor == 0 or 1e-4 <= abs(valor) < 1e16)
+
+
+def compatible_con_orjson(data):
+    """True si orjson produce exactamente la misma salida que la biblioteca estándar"""
+    pendientes = [data]
+    while pendientes:
+        valor = pendientes.pop()
+        tipo = type(valor)
+        if tipo is dict:
+            for clave in valor:
+                if type(clave) is not str:
+                    return False
+            pendientes.extend(valor.values())
+        elif tipo is list or tipo is tuple:
+            pendientes.extend(valor)
+        elif tipo is float:
+            if not _float_compatible(valor):
+                return False
+        elif tipo is int:
+            if not -2 ** 63 <= valor < 2 ** 64:
+                return False
+        elif not (tipo is str or tipo is bool or valor is None):
+            return False  # subclases y otros tipos: que decida la biblioteca estándar
+    return True
+
+
+def dumps_bytes(data, indent=2, ensure_ascii=True, sort_keys=False, minificar=False):
+    """Serializa a bytes UTF-8; mismo resultado que json.dumps(...).encode('utf-8')"""
+    if backend() == 'orjson' and (minificar or indent == 2) and compatible_con_orjson(data):
+        opciones = 0 if minificar else orjson.OPT_INDENT_2
+        if sort_keys:
+            opciones |= orjson.OPT_SORT_KEYS
+        try:
+            contenido = orjson.dumps(data, option=opciones)
+        except orjson.JSONEncodeError:
+            contenido = None  # p. ej. surrogates sueltos: lo resuelve la biblioteca estándar
+        if contenido is not None:
+            if ensure_ascii:
+                contenido = _NO_ASCII.sub(_escapar_no_ascii, contenido.decode('utf-8')).encode('ascii')
+            return contenido
+
+    if minificar:
+        texto = json.dumps(data, ensure_ascii=ensure_ascii, sort_keys=sort_keys, separators=(',', ':'))
+    else:
+        texto = json.dumps(data, indent=indent, ensure_ascii=ensure_ascii, sort_keys=sort_keys)
+    return texto.encode('utf-8')
+
+
+def dumps(data, **opciones):
+    """Como json.dumps, pero con el backend rápido (para imprimir o hashear)"""
+    return dumps_bytes(data, **opciones).decode('utf-8')
+
+
+def loads(contenido):
+    """Parsea bytes o str JSON"""
+    if backend() == 'orjson':
+        try:
+            return orjson.loads(contenido)
+        except orjson.JSONDecodeError:
+            pass  # NaN, enteros enormes, etc.: lo resuelve la biblioteca estándar
+    if isinstance(contenido, (bytes, bytearray)):
+        contenido = contenido.decode('utf-8')
+    return json.loads(contenido)
+
+
+def load(path):
+    """Lee y parsea un archivo JSON"""
+    with open(path, 'rb') as f:
+        return loads(f.read())
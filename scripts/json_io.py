@@ -0,0 +1,214 @@
+# scripts/json_io.py
+"""
+Escritura compartida de los JSON publicados en json/.
+
+- Serializa siempre igual (mismo indent, mismo orden de claves: el de
+  inserción, que los conversores construyen en el orden del Excel/Sheet;
+  sort_keys=True lo ordena alfabéticamente).
+- Si el contenido resultante es idéntico al del archivo actual, no escribe:
+  sin cambios de mtime ni diffs en git.
+- Las marcas de tiempo indicadas en `conservar` (p. ej. lastUpdate) se
+  mantienen con su valor anterior mientras el resto del objeto no cambie.
+- Escribe a un temporal en el mismo directorio y lo renombra, así el sitio
+  nunca sirve un productos.json a medio escribir.
+
+Modo de salida para payloads grandes (opcional, por variables de entorno o
+configurar_salida(); los scripts aceptan --minify, --precompress y
+--size-report, que imprime el tamaño de cada JSON y sus variantes):
+- JSON_MINIFY=1: JSON sin espacios (separadores compactos, sin indentar).
+- JSON_PRECOMPRESS=1: además genera `archivo.json.gz` (gzip nivel 9) y
+  `archivo.json.br` (brotli calidad 11, si el paquete brotli está instalado)
+  para servidores que sirven variantes precomprimidas.
+Está desactivado por defecto: el JSON minificado queda en una sola línea y
+cada cambio sería un diff del archivo completo en git.
+
+La serialización y el parseo pasan por scripts/json_backend.py (orjson si
+está instalado, con salida idéntica a la de la biblioteca estándar).
+"""
+import gzip
+import hashlib
+import os
+import tempfile
+
+from scripts.json_backend import dumps_bytes, loads
+
+try:
+    import brotli
+except ImportError:  # opcional: sin brotli solo se genera .gz
+    brotli = None
+
+# Solo se precomprimen archivos a partir de este tamaño
+COMPRIMIR_DESDE = 10 * 1024
+
+
+def _leer_umask():
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Permisos de los archivos escritos (0666 menos umask). La umask se lee una sola vez al
+# importar: os.umask cambia la del proceso entero y competiría con los hilos de escritura
+MODO_ARCHIVO = 0o666 & ~_leer_umask()
+
+
+def configurar_salida(minificar=None, precomprimir=None):
+    """Activa/desactiva el modo minificado y las variantes precomprimidas (también en procesos hijos)"""
+    if minificar is not None:
+        os.environ['JSON_MINIFY'] = '1' if minificar else '0'
+    if precomprimir is not None:
+        os.environ['JSON_PRECOMPRESS'] = '1' if precomprimir else '0'
+
+
+def configurar_salida_desde_argv(argv):
+    configurar_salida(minificar=True if '--minify' in argv else None,
+                      precomprimir=True if '--precompress' in argv else None)
+
+
+def minificar_activo():
+    return os.environ.get('JSON_MINIFY') == '1'
+
+
+def precomprimir_activo():
+    return os.environ.get('JSON_PRECOMPRESS') == '1'
+
+
+def serializar(data, indent=2, ensure_ascii=True, sort_keys=False, minificar=False):
+    """Serializa `data` a bytes UTF-8 con el formato de los JSON publicados"""
+    return dumps_bytes(data, indent=indent, ensure_ascii=ensure_ascii, sort_keys=sort_keys, minificar=minificar)
+
+
+def comprimidos(contenido):
+    """Variantes precomprimidas {extensión: bytes}; gzip con mtime=0 para que sea reproducible"""
+    variantes = {'.gz': gzip.compress(contenido, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variantes['.br'] = brotli.compress(contenido, quality=11)
+    return variantes
+
+
+def actualizar_comprimidos(path, contenido, reescrito):
+    """
+    Mantiene las variantes .gz/.br al día con `contenido`. Si la precompresión está
+    apagada, borra las que hayan quedado desactualizadas al reescribir el JSON.
+    """
+    sidecars = [path + ext for ext in ('.gz', '.br')]
+    if not precomprimir_activo() or len(contenido) < COMPRIMIR_DESDE:
+        if reescrito:
+            for sidecar in sidecars:
+                if os.path.exists(sidecar):
+                    os.remove(sidecar)
+        return
+    for ext, datos in comprimidos(contenido).items():
+        if reescrito or not os.path.exists(path + ext):
+            escribir_atomico(path + ext, datos)
+
+
+def _sin_marcas(objeto, claves):
+    return {k: v for k, v in objeto.items() if k not in claves}
+
+
+def conservar_marcas(nuevo, anterior, claves):
+    """
+    Devuelve `nuevo` con las marcas de tiempo (`claves`) de `anterior` en cada objeto
+    cuyo contenido, sin contar esas marcas, no cambió. Se aplica en todos los niveles.
+    """
+    if not (isinstance(nuevo, dict) and isinstance(anterior, dict)):
+        return nuevo
+    resultado = {
+        k: v if k in claves else conservar_marcas(v, anterior.get(k), claves)
+        for k, v in nuevo.items()
+    }
+    if _sin_marcas(resultado, claves) == _sin_marcas(anterior, claves):
+        for clave in claves:
+            if clave in resultado and clave in anterior:
+                resultado[clave] = anterior[clave]
+    return resultado
+
+
+def leer_json(path, default=None):
+    """Lee un JSON; devuelve `default` si no existe o no se puede parsear"""
+    try:
+        with open(path, 'rb') as f:
+            return loads(f.read())
+    except (OSError, ValueError):
+        return default
+
+
+def escribir_atomico(path, contenido):
+    """Escribe bytes a un temporal del mismo directorio y lo renombra sobre `path`"""
+    directorio = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directorio, exist_ok=True)
+    fd, temporal = tempfile.mkstemp(dir=directorio, prefix='.' + os.path.basename(path) + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(contenido)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp crea el archivo con 0600: se deja con los permisos normales
+        os.chmod(temporal, MODO_ARCHIVO)
+        os.replace(temporal, path)
+    except BaseException:
+        if os.path.exists(temporal):
+            os.remove(temporal)
+        raise
+
+
+def write_json(path, data, indent=2, ensure_ascii=True, sort_keys=False, conservar=(), minificar=None):
+    """
+    Escribe `data` en `path` solo si el contenido cambió, de forma atómica.
+    `conservar` lista claves de marcas de tiempo que no cuentan como cambio.
+    `minificar` (por defecto, según JSON_MINIFY) escribe el JSON compacto.
+    Devuelve True si el archivo se escribió.
+    """
+    if minificar is None:
+        minificar = minificar_activo()
+    actual = None
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            actual = f.read()
+
+    if conservar and actual is not None:
+        try:
+            data = conservar_marcas(data, loads(actual), set(conservar))
+        except ValueError:
+            pass  # el archivo actual no es JSON válido: se reescribe entero
+
+    contenido = serializar(data, indent=indent, ensure_ascii=ensure_ascii, sort_keys=sort_keys, minificar=minificar)
+    if actual is not None and hashlib.sha256(actual).digest() == hashlib.sha256(contenido).digest():
+        print(f'Sin cambios: {path}')
+        actualizar_comprimidos(path, contenido, reescrito=False)
+        return False
+
+    escribir_atomico(path, contenido)
+    actualizar_comprimidos(path, contenido, reescrito=True)
+    return True
+
+
+def reporte_tamanos(paths):
+    """
+    Imprime y devuelve, por archivo, el tamaño publicado, el que tendría con
+    indent=2, y el de sus variantes .gz/.br si existen.
+    """
+    filas = []
+    for path in paths:
+        if not os.path.exists(path):
+            continue
+        with open(path, 'rb') as f:
+            contenido = f.read()
+        try:
+            legible = len(serializar(loads(contenido), indent=2, ensure_ascii=False))
+        except ValueError:
+            legible = None
+        fila = {'archivo': path, 'bytes': len(contenido), 'indentado': legible}
+        for ext in ('.gz', '.br'):
+            fila[ext] = os.path.getsize(path + ext) if os.path.exists(path + ext) else None
+        filas.append(fila)
+
+    def kb(valor):
+        return f'{valor / 1024:,.1f} KB' if valor is not None else '-'
+
+    print(f'\n{"Archivo":45} {"indent=2":>12} {"publicado":>12} {".gz":>12} {".br":>12}')
+    for fila in filas:
+        print(f'{fila["archivo"]:45} {kb(fila["indentado"]):>12} {kb(fila["bytes"]):>12} '
+              f'{kb(fila[".gz"]):>12} {kb(fila[".br"]):>12}')
+    return filas
@@ -0,0 +1,111 @@
+# scripts/shards.py
+"""
+Exportación de productos.json partida en fragmentos (shards).
+
+Igual que json/search/optimized/ divide el índice de búsqueda por letra,
+los productos se reparten en json/productos/ según un criterio:
+- 'rubro': familia de la categoría (lo que va antes del primer punto,
+  '8.ALAMBRE DE FARDO AB' -> '8').
+- 'prefijo': primeros caracteres del código de producto.
+
+master_index.json lista cada fragmento con su archivo, las categorías que
+contiene, la cantidad de productos, el tamaño en bytes y el hash SHA-256,
+así el frontend baja solo los fragmentos de las categorías del cliente.
+productos.json se sigue generando completo.
+"""
+import hashlib
+import os
+import re
+from datetime import datetime
+
+from scripts.json_io import write_json
+
+SHARDS_DIR = 'json/productos'
+MASTER_INDEX = 'master_index.json'
+PREFIJO_SHARD = 'productos_'
+LARGO_PREFIJO = 1
+
+
+def clave_rubro(codigo, producto):
+    categoria = producto.get('category')
+    if categoria is None or categoria != categoria:  # None o NaN
+        return ''
+    return str(categoria).split('.', 1)[0].strip()
+
+
+def clave_prefijo(codigo, producto):
+    return str(codigo)[:LARGO_PREFIJO].upper()
+
+
+CRITERIOS = {
+    'rubro': clave_rubro,
+    'prefijo': clave_prefijo,
+}
+
+
+def nombre_shard(clave):
+    """Nombre apto para archivo: minúsculas, solo [a-z0-9_]"""
+    nombre = re.sub(r'[^a-z0-9]+', '_', clave.lower()).strip('_')
+    return nombre or 'otros'
+
+
+def agrupar_productos(products, criterio='rubro'):
+    """Reparte los productos en {nombre_shard: {codigo: producto}} conservando el orden"""
+    clave = CRITERIOS[criterio]
+    shards = {}
+    for codigo, producto in products.items():
+        shards.setdefault(nombre_shard(clave(codigo, producto)), {})[codigo] = producto
+    return dict(sorted(shards.items()))
+
+
+def _categorias(productos):
+    return sorted({str(p.get('category')) for p in productos.values() if p.get('category') is not None})
+
+
+def escribir_shards(products, criterio='rubro', directorio=SHARDS_DIR, ensure_ascii=True):
+    """
+    Escribe un archivo por fragmento y el master_index.json. Los fragmentos que
+    ya no existen se borran. Devuelve el índice generado.
+    """
+    if criterio not in CRITERIOS:
+        raise ValueError(f'Criterio de shards desconocido: {criterio} (opciones: {", ".join(CRITERIOS)})')
+
+    os.makedirs(directorio, exist_ok=True)
+    shards = agrupar_productos(products, criterio)
+    entradas = []
+    for nombre, productos in shards.items():
+        archivo = f'{PREFIJO_SHARD}{nombre}.json'
+        path = os.path.join(directorio, archivo)
+        write_json(path, productos, indent=2, ensure_ascii=ensure_ascii)
+        with open(path, 'rb') as f:
+            contenido = f.read()
+        entradas.append({
+            'name': nombre,
+            'file': archivo,
+            'categories': _categorias(productos),
+            'count': len(productos),
+            'bytes': len(contenido),
+            'hash': hashlib.sha256(contenido).hexdigest(),
+        })
+
+    vigentes = {e['file'] for e in entradas}
+    for archivo in os.listdir(directorio):
+        if archivo.startswith(PREFIJO_SHARD) and archivo.endswith('.json') and archivo not in vigentes:
+            os.remove(os.path.join(directorio, archivo))
+            print(f'Fragmento eliminado: {archivo}')
+
+    # La versión depende solo del contenido: sin cambios, el índice no se reescribe
+    version = hashlib.sha256(''.join(e['hash'] for e in entradas).encode('ascii')).hexdigest()[:16]
+    indice = {
+        'version': version,
+        'lastUpdated': datetime.now().isoformat(),
+        'metadata': {
+            'totalProducts': len(products),
+            'shardBy': criterio,
+            'totalShards': len(entradas),
+        },
+        'shards': entradas,
+    }
+    write_json(os.path.join(directorio, MASTER_INDEX), indice, indent=2, conservar=('lastUpdated',))
+    print(f'{len(entradas)} fragmentos de productos generados en {directorio} (por {criterio})')
+    return indice
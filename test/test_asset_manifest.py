@@ -0,0 +1,47 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from scripts import asset_manifest
+from scripts.asset_manifest import publicar_hasheados
+
+
+class TestAssetManifest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        json_dir = self.dir.name
+        for nombre, valor in (('JSON_DIR', json_dir),
+                              ('HASHED_DIR', os.path.join(json_dir, 'hashed')),
+                              ('MANIFEST_PATH', os.path.join(json_dir, 'manifest.json'))):
+            patch = mock.patch.object(asset_manifest, nombre, valor)
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def publicar(self, data):
+        with open(os.path.join(self.dir.name, 'productos.json'), 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        return publicar_hasheados(['productos.json', 'no_existe.json'])
+
+    def test_manifest_points_to_hashed_copy(self):
+        manifest = self.publicar({'A': 1})
+        self.assertEqual(list(manifest['files']), ['productos.json'])
+        with open(os.path.join(self.dir.name, manifest['files']['productos.json']), encoding='utf-8') as f:
+            self.assertEqual(json.load(f), {'A': 1})
+        self.assertEqual(self.publicar({'A': 1}), manifest)
+
+    def test_keeps_previous_generation_only(self):
+        primero = self.publicar({'A': 1})['files']['productos.json']
+        segundo = self.publicar({'A': 2})['files']['productos.json']
+        self.assertNotEqual(primero, segundo)
+        self.assertTrue(os.path.exists(os.path.join(self.dir.name, primero)))
+        self.publicar({'A': 3})
+        self.assertFalse(os.path.exists(os.path.join(self.dir.name, primero)))
+        self.assertTrue(os.path.exists(os.path.join(self.dir.name, segundo)))
+
+
+if __name__ == '__main__':
+    unittest.main()
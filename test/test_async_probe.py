@@ -0,0 +1,131 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from scripts.async_probe import TokenBucket, espera_backoff, sondear
+
+IMG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'img')
+with open(os.path.join(IMG_DIR, 'logo.png'), 'rb') as f:
+    LOGO = f.read()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """
+    `/ok/<n>` sirve logo.png; `/206/<n>` lo sirve respetando el Range;
+    `/429/<n>` responde 429 las dos primeras veces; `/404/<n>` no existe
+    """
+    lock = threading.Lock()
+    intentos = {}
+    en_curso = 0
+    maximo = 0
+
+    def do_GET(self):
+        with _Handler.lock:
+            _Handler.intentos[self.path] = _Handler.intentos.get(self.path, 0) + 1
+            intento = _Handler.intentos[self.path]
+            _Handler.en_curso += 1
+            _Handler.maximo = max(_Handler.maximo, _Handler.en_curso)
+        try:
+            time.sleep(0.02)
+            if self.path.startswith('/404/'):
+                self.send_response(404)
+                self.end_headers()
+            elif self.path.startswith('/429/') and intento <= 2:
+                self.send_response(429)
+                self.send_header('Retry-After', '0')
+                self.end_headers()
+            elif self.path.startswith('/206/'):
+                fin = int(self.headers['Range'].split('-')[1])
+                parcial = LOGO[:fin + 1]
+                self.send_response(206)
+                self.send_header('Content-Range', f'bytes 0-{len(parcial) - 1}/{len(LOGO)}')
+                self.send_header('Content-Length', str(len(parcial)))
+                self.end_headers()
+                self.wfile.write(parcial)
+            else:
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(LOGO)))
+                self.end_headers()
+                self.wfile.write(LOGO)
+        finally:
+            with _Handler.lock:
+                _Handler.en_curso -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+class TestSondeoAsincrono(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        _Handler.intentos.clear()
+        _Handler.maximo = 0
+        self.eventos = []
+
+    def sondear(self, urls, **opciones):
+        opciones.setdefault('backoff_base', 0.01)
+        return sondear(urls, reportar=self.eventos.append, **opciones)
+
+    def test_bounded_concurrency(self):
+        urls = {f'P{i}': f'{self.base}/ok/{i}' for i in range(20)}
+        resultados, metricas = self.sondear(urls, concurrencia=3, tasa_por_host=1000, rafaga=1000)
+        self.assertEqual(set(resultados.values()), {(300, 309, 'png')})
+        self.assertLessEqual(_Handler.maximo, 3)
+        self.assertEqual(metricas['ok'], 20)
+        self.assertEqual(self.eventos[-1]['evento'], 'fin')
+
+    def test_retries_on_429(self):
+        resultados, metricas = self.sondear({'P1': f'{self.base}/429/1'})
+        self.assertEqual(resultados['P1'], (300, 309, 'png'))
+        self.assertEqual(metricas['reintentos'], 2)
+        self.assertEqual(metricas['estados_http'], {'429': 2, '200': 1})
+
+    def test_partial_content_is_recorded(self):
+        resultados, metricas = self.sondear({'P1': f'{self.base}/206/1', 'P2': f'{self.base}/ok/1'})
+        self.assertEqual(resultados['P1'], (300, 309, 'png'))
+        self.assertEqual(metricas['estados_http'], {'206': 1, '200': 1})
+
+    def test_gives_up_on_client_errors(self):
+        resultados, metricas = self.sondear({'P1': f'{self.base}/404/1'})
+        self.assertIsNone(resultados['P1'])
+        self.assertEqual((metricas['errores'], metricas['reintentos']), (1, 0))
+        self.assertEqual(_Handler.intentos['/404/1'], 1)
+
+    def test_retries_are_bounded(self):
+        resultados, metricas = self.sondear({'P1': f'{self.base}/429/2'}, reintentos=1)
+        self.assertIsNone(resultados['P1'])
+        self.assertEqual(_Handler.intentos['/429/2'], 2)
+
+
+class TestLimites(unittest.TestCase):
+    def test_token_bucket_rate(self):
+        async def consumir():
+            bucket = TokenBucket(tasa=50, capacidad=1)
+            inicio = time.monotonic()
+            for _ in range(6):
+                await bucket.adquirir()
+            return time.monotonic() - inicio
+        # 1 token inicial + 5 a 50/s: al menos ~0.1s
+        self.assertGreaterEqual(asyncio.run(consumir()), 0.09)
+
+    def test_backoff_with_jitter(self):
+        esperas = [espera_backoff(3, base=0.5, maximo=16) for _ in range(200)]
+        self.assertTrue(all(0 <= e <= 4 for e in esperas))
+        self.assertGreater(len(set(esperas)), 1)
+        self.assertEqual(espera_backoff(0, base=0.5, maximo=16, retry_after='7'), 7)
+
+
+if __name__ == '__main__':
+    unittest.main()
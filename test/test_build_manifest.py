@@ -0,0 +1,155 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+from scripts import build_manifest
+from scripts.build_manifest import construir, orden_por_niveles
+
+LLAMADAS = []
+
+
+def _convertir_a():
+    LLAMADAS.append('a')
+    with open('entrada.txt', encoding='utf-8') as f, open('a.json', 'w', encoding='utf-8') as salida:
+        salida.write(f'"{f.read()}"')
+
+
+def _convertir_b():
+    LLAMADAS.append('b')
+    with open('a.json', encoding='utf-8') as f, open('b.json', 'w', encoding='utf-8') as salida:
+        salida.write(f'[{f.read()}]')
+
+
+def _convertir_c():
+    """Como los conversores de excel_to_json: atrapa el error y devuelve False"""
+    LLAMADAS.append('c')
+    if not os.path.exists('entrada_c.txt'):
+        print('Error procesando c: falta entrada_c.txt')
+        return False
+    with open('c.json', 'w', encoding='utf-8') as salida:
+        salida.write('{}')
+    return True
+
+
+def _convertir_sin_salida():
+    LLAMADAS.append('d')
+
+
+OBJETIVOS = {
+    'b': {'entradas': ['a.json'], 'salidas': ['b.json'], 'conversor': f'{__name__}:_convertir_b'},
+    'a': {'entradas': ['entrada.txt'], 'salidas': ['a.json'], 'conversor': f'{__name__}:_convertir_a'},
+}
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.dir.name)
+        self.escribir('entrada.txt', 'v1')
+        LLAMADAS.clear()
+        patch = mock.patch.dict(build_manifest.OBJETIVOS, OBJETIVOS, clear=True)
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.dir.cleanup()
+
+    def escribir(self, path, texto):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(texto)
+
+    def test_dependency_order(self):
+        self.assertEqual(orden_por_niveles(['b', 'a']), [['a'], ['b']])
+
+    def test_real_targets_order(self):
+        with mock.patch.object(build_manifest, 'OBJETIVOS', OBJETIVOS_REALES):
+            niveles = orden_por_niveles(list(OBJETIVOS_REALES))
+        anterior = next(i for i, nivel in enumerate(niveles) if 'catalogo_imagenes' in nivel)
+        posterior = next(i for i, nivel in enumerate(niveles) if 'catalogo_dimensiones' in nivel)
+        self.assertLess(anterior, posterior)
+
+    def test_real_targets_only_local_inputs(self):
+        # Lo que viene de Google Sheets lo maneja excel_to_json con su propio cache
+        for definicion in OBJETIVOS_REALES.values():
+            self.assertNotIn('js/config.js', definicion['entradas'])
+            self.assertNotIn('hojas', definicion)
+
+    def test_builds_in_order_then_skips_up_to_date(self):
+        self.assertEqual(construir(), {'a': 'reconstruido', 'b': 'reconstruido'})
+        self.assertEqual(LLAMADAS, ['a', 'b'])
+        LLAMADAS.clear()
+        self.assertEqual(construir(), {'a': 'al día', 'b': 'al día'})
+        self.assertEqual(LLAMADAS, [])
+
+    def test_changed_input_rebuilds_dependents(self):
+        construir()
+        LLAMADAS.clear()
+        self.escribir('entrada.txt', 'v2')
+        self.assertEqual(construir(), {'a': 'reconstruido', 'b': 'reconstruido'})
+        with open('b.json', encoding='utf-8') as f:
+            self.assertEqual(f.read(), '["v2"]')
+
+    def test_replaced_output_rebuilds(self):
+        construir()
+        LLAMADAS.clear()
+        self.escribir('b.json', '["de la hoja"]')  # p. ej. escrito desde Google Sheets
+        self.assertEqual(construir(), {'a': 'al día', 'b': 'reconstruido'})
+        self.assertEqual(LLAMADAS, ['b'])
+
+    def test_local_fallback_skips_up_to_date(self):
+        from scripts.excel_to_json import FallbackLocal
+        FallbackLocal().ejecutar(['a', 'b'])
+        self.assertEqual(LLAMADAS, ['a', 'b'])
+        LLAMADAS.clear()
+        FallbackLocal().ejecutar(['a', 'b', 'inexistente'])
+        self.assertEqual(LLAMADAS, [])
+
+    def test_failed_conversion_is_retried(self):
+        build_manifest.OBJETIVOS['c'] = {'entradas': ['entrada.txt'], 'salidas': ['c.json'],
+                                         'conversor': f'{__name__}:_convertir_c'}
+        self.assertEqual(construir(['c']), {'c': 'error'})
+        self.assertEqual(construir(['c']), {'c': 'error'})
+        self.assertEqual(LLAMADAS, ['c', 'c'])
+
+        self.escribir('entrada_c.txt', '')
+        self.assertEqual(construir(['c']), {'c': 'reconstruido'})
+        self.assertEqual(construir(['c']), {'c': 'al día'})
+
+    def test_failure_after_success_is_retried(self):
+        build_manifest.OBJETIVOS['c'] = {'entradas': ['entrada.txt'], 'salidas': ['c.json'],
+                                         'conversor': f'{__name__}:_convertir_c'}
+        self.escribir('entrada_c.txt', '')
+        construir(['c'])
+        os.remove('entrada_c.txt')
+        self.escribir('entrada.txt', 'v2')
+        self.assertEqual(construir(['c']), {'c': 'error'})
+        self.escribir('entrada.txt', 'v1')  # aunque vuelva a las entradas registradas antes
+        self.assertEqual(construir(['c']), {'c': 'error'})
+
+    def test_missing_output_is_an_error(self):
+        build_manifest.OBJETIVOS['d'] = {'entradas': ['entrada.txt'], 'salidas': ['d.json'],
+                                         'conversor': f'{__name__}:_convertir_sin_salida'}
+        self.assertEqual(construir(['d']), {'d': 'error'})
+        self.assertEqual(construir(['d']), {'d': 'error'})
+        self.assertEqual(LLAMADAS, ['d', 'd'])
+
+    def test_local_fallback_keeps_sheets_cache_on_error(self):
+        from scripts import excel_to_json
+        build_manifest.OBJETIVOS['c'] = {'entradas': ['entrada.txt'], 'salidas': ['c.json'],
+                                         'conversor': f'{__name__}:_convertir_c'}
+        with mock.patch.object(excel_to_json, 'invalidar_cache_sheets') as invalidar:
+            excel_to_json.FallbackLocal().ejecutar(['a', 'c'])
+        invalidar.assert_called_once_with('json/a.json')
+
+    def test_dry_run_builds_nothing(self):
+        self.assertEqual(construir(dry_run=True), {'a': 'pendiente', 'b': 'pendiente'})
+        self.assertEqual(LLAMADAS, [])
+
+
+OBJETIVOS_REALES = dict(build_manifest.OBJETIVOS)
+
+
+if __name__ == '__main__':
+    unittest.main()
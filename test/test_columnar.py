@@ -0,0 +1,30 @@
+import json
+import unittest
+from scripts.columnar import productos_a_columnas, columnas_a_productos
+
+PRODUCTOS = {
+    'ABF2031000': {'name': 'ALAMBRE', 'category': '8.ALAMBRE DE FARDO AB', 'bulk': 10.0,
+                   'prices': {'D': 1161, 'E': 1250, 'F': 1072}},
+    'ABR9612': {'name': 'RESISTENCIA', 'category': '1.DUCHA ELECTRICA/ACCESO', 'bulk': 1.0,
+                'prices': {'D': 3604, 'E': 3881, 'F': 3465}},
+    'ABF2031001': {'name': 'ALAMBRE 2', 'category': '8.ALAMBRE DE FARDO AB', 'bulk': 10.0,
+                   'prices': {'D': 1200, 'E': 1300, 'F': 1100}},
+}
+
+
+class TestColumnar(unittest.TestCase):
+    def test_dictionary_encoded_categories(self):
+        data = productos_a_columnas(PRODUCTOS)
+        self.assertEqual(data['categories'], ['8.ALAMBRE DE FARDO AB', '1.DUCHA ELECTRICA/ACCESO'])
+        self.assertEqual(data['category'], [0, 1, 0])
+        self.assertEqual(data['prices']['D'], [1161, 3604, 1200])
+
+    def test_roundtrip_through_json(self):
+        data = json.loads(json.dumps(productos_a_columnas(PRODUCTOS)))
+        reconstruidos = columnas_a_productos(data)
+        self.assertEqual(reconstruidos, PRODUCTOS)
+        self.assertEqual(list(reconstruidos), list(PRODUCTOS))
+
+
+if __name__ == '__main__':
+    unittest.main()
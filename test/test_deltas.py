@@ -0,0 +1,66 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from scripts import deltas
+from scripts.deltas import calcular_delta, aplicar_delta, registrar_versiones
+
+
+class TestDeltas(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        raiz = self.dir.name
+        self.path = os.path.join(raiz, 'catalogo_imagenes.json')
+        patches = [
+            mock.patch.object(deltas, 'DELTAS_DIR', os.path.join(raiz, 'deltas')),
+            mock.patch.object(deltas, 'MANIFEST_PATH', os.path.join(raiz, 'deltas', 'manifest.json')),
+            mock.patch.object(deltas, 'SNAPSHOTS_DIR', os.path.join(raiz, 'snapshots')),
+            mock.patch.dict(deltas.DATASETS, {'catalogo_imagenes': {'path': self.path, 'registros': 'images'}}, clear=True),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def publicar(self, data):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+
+    def test_delta_roundtrip(self):
+        anterior = {'A': {'D': 1}, 'B': {'D': 2}, 'C': {'D': 3}}
+        nuevo = {'A': {'D': 1}, 'B': {'D': 5}, 'E': {'D': 9}}
+        delta = calcular_delta(anterior, nuevo)
+        self.assertEqual(delta, {'added': {'E': {'D': 9}}, 'removed': ['C'], 'changed': {'B': {'D': 5}}})
+        self.assertEqual(aplicar_delta(anterior, delta), nuevo)
+
+    def test_nested_records(self):
+        anterior = {'lastUpdate': 't0', 'totalImages': 2, 'images': {'A': 'id1', 'B': 'id2'}}
+        nuevo = {'lastUpdate': 't1', 'totalImages': 2, 'images': {'A': 'id1', 'B': 'id3'}}
+        delta = calcular_delta(anterior, nuevo, 'images')
+        self.assertEqual(delta['fields'], {'lastUpdate': 't1'})
+        self.assertEqual(aplicar_delta(anterior, delta, 'images'), nuevo)
+
+    def test_chain_of_versions(self):
+        base = {'lastUpdate': 't0', 'images': {f'P{i}': f'id{i}' for i in range(50)}}
+        self.publicar(base)
+        self.assertEqual(registrar_versiones(), ['catalogo_imagenes'])
+        self.assertEqual(registrar_versiones(), [])  # sin cambios no hay versión nueva
+
+        nuevo = dict(base, images=dict(base['images'], P1='otro'))
+        self.publicar(nuevo)
+        registrar_versiones()
+        with open(deltas.MANIFEST_PATH, encoding='utf-8') as f:
+            estado = json.load(f)['datasets']['catalogo_imagenes']
+        self.assertEqual(len(estado['chain']), 1)
+        parche = estado['chain'][0]
+        self.assertEqual(parche['to'], estado['current'])
+        self.assertEqual(parche['changed'], 1)
+        with open(os.path.join(deltas.DELTAS_DIR, 'catalogo_imagenes', parche['file']), encoding='utf-8') as f:
+            self.assertEqual(aplicar_delta(base, json.load(f), 'images'), nuevo)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from scripts.dimension_cache import (armar_dimensiones, cargar_cache, entrada, guardar_cache,
+                                     planificar)
+
+FIRMA = {'modifiedTime': '2026-08-01T10:00:00.000Z', 'md5': 'abc'}
+
+
+class TestDimensionCache(unittest.TestCase):
+    def test_listing_dimensions_skip_probe(self):
+        metadatos = {'d1': dict(FIRMA, width=1200, height=900)}
+        cache, pendientes = planificar({'A': 'd1'}, metadatos, {})
+        self.assertEqual(pendientes, {})
+        self.assertEqual(cache['d1']['source'], 'drive')
+        self.assertEqual(cache['d1']['ratio'], 1.333)
+
+    def test_without_cache_everything_is_probed(self):
+        metadatos = {'d1': dict(FIRMA, width=None, height=None)}
+        cache, pendientes = planificar({'A': 'd1', 'B': 'd2'}, metadatos, {})
+        self.assertEqual(cache, {})
+        self.assertEqual(list(pendientes), ['d1', 'd2'])
+
+    def test_unchanged_file_reuses_entry(self):
+        metadatos = {'d1': dict(FIRMA, width=None, height=None)}
+        anterior = {'d1': entrada(640, 480, 'probe', FIRMA)}
+        cache, pendientes = planificar({'A': 'd1'}, metadatos, anterior)
+        self.assertEqual(pendientes, {})
+        self.assertIs(cache['d1'], anterior['d1'])
+
+    def test_changed_file_is_reprobed(self):
+        metadatos = {'d1': {'width': None, 'height': None, 'modifiedTime': '2026-09-01T00:00:00.000Z', 'md5': 'xyz'}}
+        anterior = {'d1': entrada(640, 480, 'probe', FIRMA)}
+        cache, pendientes = planificar({'A': 'd1'}, metadatos, anterior)
+        self.assertEqual(list(pendientes), ['d1'])
+        self.assertEqual(pendientes['d1']['md5'], 'xyz')
+        self.assertNotIn('d1', cache)
+
+    def test_modified_time_used_without_md5(self):
+        firma = {'modifiedTime': '2026-08-01T10:00:00.000Z', 'md5': None}
+        anterior = {'d1': entrada(640, 480, 'probe', firma)}
+        metadatos = {'d1': dict(firma, width=None, height=None)}
+        self.assertEqual(planificar({'A': 'd1'}, metadatos, anterior)[1], {})
+        metadatos['d1']['modifiedTime'] = '2026-09-01T00:00:00.000Z'
+        self.assertEqual(list(planificar({'A': 'd1'}, metadatos, anterior)[1]), ['d1'])
+
+    def test_default_values_are_retried(self):
+        anterior = {'d1': entrada(800, 600, 'default', FIRMA)}
+        metadatos = {'d1': dict(FIRMA, width=None, height=None)}
+        self.assertEqual(list(planificar({'A': 'd1'}, metadatos, anterior)[1]), ['d1'])
+
+    def test_deleted_images_dropped(self):
+        anterior = {'d1': entrada(640, 480, 'probe', FIRMA), 'viejo': entrada(10, 10, 'probe', FIRMA)}
+        cache, _ = planificar({'A': 'd1'}, {}, anterior)
+        self.assertEqual(list(cache), ['d1'])
+        previas = {'B': {'width': 10, 'height': 10, 'ratio': 1.0}, 'A': {'width': 640, 'height': 480, 'ratio': 1.333}}
+        self.assertEqual(list(armar_dimensiones({'A': 'd1'}, cache, previas)), ['A'])
+
+    def test_unchanged_entries_keep_extra_fields_and_order(self):
+        cache = {'d1': entrada(640, 480, 'probe', FIRMA), 'd2': entrada(1000, 500, 'probe', FIRMA),
+                 'd3': entrada(300, 600, 'probe', FIRMA)}
+        previas = {
+            'B': {'width': 100, 'height': 100, 'ratio': 1.0, 'imageType': 'square'},
+            'A': {'width': 640, 'height': 480, 'ratio': 1.333, 'imageType': 'standard', 'bottomPosition': 0.94},
+        }
+        resultado = armar_dimensiones({'A': 'd1', 'B': 'd2', 'C': 'd3'}, cache, previas)
+        self.assertEqual(list(resultado), ['B', 'A', 'C'])
+        self.assertIs(resultado['A'], previas['A'])
+        self.assertEqual(resultado['B'], {'width': 1000, 'height': 500, 'ratio': 2.0})
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'cache', 'dimensiones_cache.json')
+            self.assertEqual(cargar_cache(path), {})
+            cache = {'d1': entrada(640, 480, 'probe', FIRMA)}
+            guardar_cache(cache, path)
+            self.assertEqual(cargar_cache(path), cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
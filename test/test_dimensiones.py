@@ -0,0 +1,47 @@
+import unittest
+from scripts.dimensiones import (clasificar_ratio, clasificar_ratios, compactar_v2, expandir_v3,
+                                 posiciones_pendientes, BOTTOM_POSITIONS)
+
+V2 = {
+    'version': '2.0',
+    'lastUpdate': '2026-08-04T15:26:05',
+    'images_dimensions': {
+        'LY580063': {'width': 800, 'height': 449, 'ratio': 1.78, 'imageType': 'very_horizontal',
+                     'bottomPosition': BOTTOM_POSITIONS['very_horizontal'], 'autoGenerated': True,
+                     'lastCalculated': '2026-08-04T15:26:05'},
+        'ABR9612': {'width': 800, 'height': 533, 'ratio': 1.501, 'imageType': 'horizontal',
+                    'bottomPosition': BOTTOM_POSITIONS['horizontal'], 'autoGenerated': True,
+                    'lastCalculated': '2026-08-04T15:26:05'},
+    },
+}
+
+
+class TestDimensiones(unittest.TestCase):
+    def test_classification_thresholds(self):
+        self.assertEqual(clasificar_ratio(1.6), 'very_horizontal')
+        self.assertEqual(clasificar_ratio(1.2), 'horizontal')
+        self.assertEqual(clasificar_ratio(0.8), 'square')
+        self.assertEqual(clasificar_ratio(0.75), 'vertical')
+
+    def test_vectorized_classification_matches(self):
+        ratios = [2.0, 1.6, 1.59, 1.2, 1.0, 0.8, 0.79, 0.5, 0.0]
+        self.assertEqual(clasificar_ratios(ratios), [clasificar_ratio(r) for r in ratios])
+
+    def test_pending_positions_only_new_or_changed(self):
+        imagenes = dict(V2['images_dimensions'])
+        imagenes['NUEVO'] = {'width': 300, 'height': 600, 'ratio': 0.5}
+        imagenes['CAMBIADO'] = dict(imagenes['ABR9612'], ratio=1.0)
+        self.assertEqual(posiciones_pendientes(imagenes), {'NUEVO': 'vertical', 'CAMBIADO': 'square'})
+
+    def test_compact_tuples(self):
+        v3 = compactar_v2(V2)
+        self.assertEqual(v3['images']['LY580063'], [1.78, 0])
+        # 800 / 1.501 no da 533: el alto se guarda explícito
+        self.assertEqual(v3['images']['ABR9612'], [1.501, 1, 800, 533])
+
+    def test_upgrade_back_to_v2(self):
+        self.assertEqual(expandir_v3(compactar_v2(V2)), V2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+import unittest.mock
+
+try:
+    import drive_scanner
+except ImportError:  # necesita las librerías de Google y pandas
+    drive_scanner = None
+
+
+@unittest.skipIf(drive_scanner is None, 'dependencias de drive_scanner no instaladas')
+class TestMetadatosDrive(unittest.TestCase):
+    def test_listing_metadata_columns(self):
+        archivo = {'id': 'x', 'size': '52311', 'md5Checksum': 'abc', 'modifiedTime': '2026-08-01T10:00:00.000Z',
+                   'imageMediaMetadata': {'width': 1200, 'height': 900, 'rotation': 0}}
+        self.assertEqual(drive_scanner.metadatos_archivo(archivo), {
+            'ancho': 1200, 'alto': 900, 'rotacion': 0, 'tamano': 52311,
+            'md5': 'abc', 'modificado': '2026-08-01T10:00:00.000Z'})
+
+    def test_rotated_images_swap_dimensions(self):
+        archivo = {'imageMediaMetadata': {'width': 1200, 'height': 900, 'rotation': 1}}
+        meta = drive_scanner.metadatos_archivo(archivo)
+        self.assertEqual((meta['ancho'], meta['alto']), (900, 1200))
+
+    def test_missing_metadata(self):
+        self.assertIsNone(drive_scanner.metadatos_archivo({'id': 'x'})['ancho'])
+
+
+class ServicioFalso:
+    """Imita service.files().list(...).execute() con una sola página"""
+
+    def __init__(self, archivos):
+        self.archivos = archivos
+        self.listados = 0
+
+    def files(self):
+        return self
+
+    def list(self, **kwargs):
+        self.listados += 1
+        return self
+
+    def execute(self):
+        return {'files': self.archivos}
+
+
+@unittest.skipIf(drive_scanner is None, 'dependencias de drive_scanner no instaladas')
+class TestCompletarMetadatos(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'imagenes_drive.xlsx')
+        drive_scanner.pd.DataFrame([
+            {'id': 'a', 'articulo': 'A'},
+            {'id': 'b', 'articulo': 'B'},
+        ]).to_excel(self.path, index=False)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_rows_listed_once(self):
+        servicio = ServicioFalso([
+            {'id': 'a', 'md5Checksum': 'x', 'imageMediaMetadata': {'width': 10, 'height': 20}},
+            {'id': 'b', 'md5Checksum': 'y'},  # Drive no informa dimensiones
+        ])
+        drive_scanner.completar_metadatos_excel(servicio, 'carpeta', self.path)
+        self.assertEqual(servicio.listados, 1)
+        df = drive_scanner.pd.read_excel(self.path)
+        self.assertEqual(df['ancho'].tolist()[0], 10)
+        self.assertTrue(drive_scanner.pd.isna(df['ancho'].tolist()[1]))
+        self.assertTrue(df[drive_scanner.COLUMNA_LISTADO].all())
+
+        # La fila sin dimensiones ya se listó: no se vuelve a listar toda la carpeta
+        drive_scanner.completar_metadatos_excel(servicio, 'carpeta', self.path)
+        self.assertEqual(servicio.listados, 1)
+
+    def test_only_new_rows_are_filled(self):
+        servicio = ServicioFalso([{'id': 'a', 'md5Checksum': 'x'}, {'id': 'b', 'md5Checksum': 'y'}])
+        drive_scanner.completar_metadatos_excel(servicio, 'carpeta', self.path)
+        df = drive_scanner.pd.read_excel(self.path)
+        nueva = drive_scanner.pd.DataFrame([{'id': 'c', 'articulo': 'C'}])
+        drive_scanner.pd.concat([df, nueva], ignore_index=True).to_excel(self.path, index=False)
+
+        servicio = ServicioFalso([{'id': 'a', 'md5Checksum': 'cambiado'}, {'id': 'b', 'md5Checksum': 'y'},
+                                  {'id': 'c', 'md5Checksum': 'z'}])
+        drive_scanner.completar_metadatos_excel(servicio, 'carpeta', self.path)
+        self.assertEqual(servicio.listados, 1)
+        self.assertEqual(drive_scanner.pd.read_excel(self.path)['md5'].tolist(), ['x', 'y', 'z'])
+
+
+@unittest.skipIf(drive_scanner is None, 'dependencias de drive_scanner no instaladas')
+class TestDimensionesUnaEscritura(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.dir.name)
+        os.makedirs('json')
+        drive_scanner.write_json('json/catalogo_imagenes.json', {'images': {'A': 'd1'}})
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.dir.cleanup()
+
+    def test_single_write_with_positions(self):
+        metadatos = {'d1': {'width': 1000, 'height': 500, 'md5': 'x', 'modifiedTime': 't'}}
+        with unittest.mock.patch.object(drive_scanner, 'cargar_metadatos_drive', return_value=metadatos), \
+             unittest.mock.patch.object(drive_scanner, 'write_json', wraps=drive_scanner.write_json) as escritura:
+            dimensiones = drive_scanner.generar_json_dimensiones_rapido()
+            self.assertFalse(os.path.exists('json/catalogo_dimensiones.json'))
+            drive_scanner.generar_posiciones_bottom_completo(dimensiones)
+
+        escritos = [llamada.args[0] for llamada in escritura.call_args_list]
+        self.assertEqual(escritos.count('./json/catalogo_dimensiones.json'), 1)
+        publicado = drive_scanner.load('json/catalogo_dimensiones.json')['images_dimensions']['A']
+        self.assertEqual((publicado['ratio'], publicado['imageType']), (2.0, 'very_horizontal'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import pandas as pd
+from scripts import excel_reader
+from scripts.excel_reader import leer_excel
+
+
+class TestExcelCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'PRODUCTOS.xlsx')
+        self.cache_dir = os.path.join(self.dir.name, 'cache')
+        patch = mock.patch.object(excel_reader, 'EXCEL_CACHE_DIR', self.cache_dir)
+        patch.start()
+        self.addCleanup(patch.stop)
+        self.escribir([{'CODIGO': 'P1', 'ARTICULO': 'Martillo', 'OTRA': 1}])
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def escribir(self, filas):
+        pd.DataFrame(filas).to_excel(self.path, index=False)
+
+    def leer(self, **opciones):
+        with mock.patch.object(excel_reader.pd, 'read_excel', wraps=pd.read_excel) as lectura:
+            datos = leer_excel(self.path, columnas=['CODIGO', 'ARTICULO'], **opciones)
+        return datos, lectura.call_count
+
+    def test_unchanged_file_hits_cache(self):
+        primera, parseos = self.leer()
+        self.assertEqual(parseos, 1)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)  # .pkl + .json
+
+        segunda, parseos = self.leer()
+        self.assertEqual(parseos, 0)
+        pd.testing.assert_frame_equal(primera, segunda)
+        self.assertEqual(list(segunda.columns), ['CODIGO', 'ARTICULO'])
+
+    def test_changed_content_rebuilds(self):
+        self.leer()
+        self.escribir([{'CODIGO': 'P1', 'ARTICULO': 'Pinza', 'OTRA': 1}])
+        datos, parseos = self.leer()
+        self.assertEqual(parseos, 1)
+        self.assertEqual(datos['ARTICULO'].tolist(), ['Pinza'])
+
+        # La entrada nueva queda en el cache para la próxima lectura
+        _, parseos = self.leer()
+        self.assertEqual(parseos, 0)
+
+    def test_other_columns_are_another_entry(self):
+        self.leer()
+        with mock.patch.object(excel_reader.pd, 'read_excel', wraps=pd.read_excel) as lectura:
+            datos = leer_excel(self.path, columnas=['CODIGO'])
+        self.assertEqual(lectura.call_count, 1)
+        self.assertEqual(list(datos.columns), ['CODIGO'])
+
+    def test_cache_disabled(self):
+        self.leer(cache=False)
+        self.assertFalse(os.path.exists(self.cache_dir))
+        _, parseos = self.leer(cache=False)
+        self.assertEqual(parseos, 1)
+
+    def corromper_pickle(self, contenido):
+        for nombre in os.listdir(self.cache_dir):
+            if nombre.endswith('.pkl'):
+                path = os.path.join(self.cache_dir, nombre)
+                with open(path, 'rb') as f:
+                    original = f.read()
+                with open(path, 'wb') as f:
+                    f.write(contenido(original))
+
+    def assert_rebuilds(self):
+        datos, parseos = self.leer()
+        self.assertEqual(parseos, 1)
+        self.assertEqual(datos['CODIGO'].tolist(), ['P1'])
+        # La entrada rota se reemplazó por una buena
+        _, parseos = self.leer()
+        self.assertEqual(parseos, 0)
+
+    def test_empty_pickle_rebuilds(self):
+        self.leer()
+        self.corromper_pickle(lambda original: b'')
+        self.assert_rebuilds()
+
+    def test_truncated_pickle_rebuilds(self):
+        self.leer()
+        self.corromper_pickle(lambda original: original[:len(original) // 2])
+        self.assert_rebuilds()
+
+    def test_garbage_pickle_rebuilds(self):
+        self.leer()
+        self.corromper_pickle(lambda original: b'\x80\x04basura que no es un pickle')
+        self.assert_rebuilds()
+
+    def test_pickle_from_other_versions_rebuilds(self):
+        self.leer()
+        for error in (AttributeError("no attribute '_Manager'"), ModuleNotFoundError('numpy._core')):
+            with mock.patch.object(excel_reader.pd, 'read_pickle', side_effect=error):
+                datos, parseos = self.leer()
+            self.assertEqual(parseos, 1)
+            self.assertEqual(datos['CODIGO'].tolist(), ['P1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
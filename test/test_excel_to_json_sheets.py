@@ -0,0 +1,83 @@
+import unittest
+from unittest import mock
+from scripts import excel_to_json
+from scripts.gviz import gviz_rows, gviz_to_columns, CELDA_VACIA
+
+COLUMNAS = [{'id': 'A', 'label': 'CODIGO', 'type': 'string'}]
+
+
+def ventana(valores):
+    return {'table': {'cols': COLUMNAS, 'rows': [{'c': [{'v': v}]} for v in valores]}}
+
+
+class TestSheetRanged(unittest.TestCase):
+    def descargar(self, ventana_de, completa=None, **opciones):
+        with mock.patch.object(excel_to_json, 'get_sheet_window',
+                               side_effect=lambda sheet_id, offset, limite, *a: ventana_de(offset, limite)), \
+             mock.patch.object(excel_to_json, 'get_sheet_data', return_value=completa) as entera:
+            data = excel_to_json.get_sheet_data_ranged('id', limite=2, paralelas=2, **opciones)
+        return data, entera
+
+    def test_windows_merged_in_order(self):
+        filas = ['a', 'b', 'c', 'd', 'e']
+        data, entera = self.descargar(lambda offset, limite: ventana(filas[offset:offset + limite]))
+        self.assertEqual([r['c'][0]['v'] for r in gviz_rows(data)], filas)
+        entera.assert_not_called()
+
+    def test_ignored_offset_stops(self):
+        # gviz devuelve siempre las mismas filas: sin tope, el ciclo no terminaría nunca
+        completa = ventana(['a', 'b', 'c'])
+        data, entera = self.descargar(lambda offset, limite: ventana(['a', 'b']), completa, max_filas=20)
+        self.assertIs(data, completa)
+        entera.assert_called_once()
+
+    def test_window_larger_than_limit_falls_back(self):
+        completa = ventana(['a', 'b', 'c'])
+        data, entera = self.descargar(lambda offset, limite: ventana(['a', 'b', 'c']), completa)
+        self.assertIs(data, completa)
+        entera.assert_called_once()
+
+
+def columnas_de(*filas):
+    """Tabla gviz con las filas dadas (None = celda nula) pasada a columnas"""
+    data = {'table': {'cols': [{'id': str(i)} for i in range(len(filas[0]))],
+                      'rows': [{'c': list(fila)} for fila in filas]}}
+    return gviz_to_columns(data, decode_dates=False, vacia=CELDA_VACIA)[1]
+
+
+class TestCeldasNulas(unittest.TestCase):
+    """Una celda nula toma el valor por defecto; {"v": null} queda como lo dejaba el proceso por filas"""
+
+    def test_product_fields(self):
+        result = {}
+        excel_to_json.process_product_columns(result, columnas_de(
+            [{'v': 'P1'}, None, {'v': None}, None, {'v': 10.9}, {'v': None}, None],
+            [{'v': None}, {'v': 'sin codigo'}, None, None, None, None, None],
+        ))
+        self.assertEqual(result, {'P1': {'name': '', 'category': None, 'bulk': '',
+                                         'prices': {'D': 10, 'E': 0, 'F': 0}}})
+
+    def test_list_fields(self):
+        result = {}
+        excel_to_json.process_group_columns(result, columnas_de(
+            [{'v': 'G1'}, None], [{'v': 'G2'}, {'v': None}], [{'v': 'G3'}, {'v': '1,2'}]))
+        self.assertEqual(result, {'groups': {'G1': [], 'G2': ['None'], 'G3': ['1', '2']}})
+
+    def test_margin_null_cell_defaults_and_null_value_skips(self):
+        result = {}
+        excel_to_json.process_margin_columns(result, columnas_de(
+            [None, {'v': 1.0}, {'v': 'A'}, None, None],
+            [None, {'v': 2.0}, {'v': 'B'}, {'v': None}, None],
+            [None, {'v': None}, {'v': 'C'}, {'v': 5}, None],
+        ))
+        self.assertEqual(result, {'1': {'nombre': 'A', 'margen': 0, 'mostrar': 'lista', 'ultima_actualizacion': ''}})
+
+    def test_short_rows(self):
+        result = {}
+        excel_to_json.process_client_columns(result, columnas_de(
+            [{'v': 7.0}, {'v': 'Ana'}, {'v': 'X'}, {'v': 'D'}], [{'v': 8.0}]))
+        self.assertEqual(result['8'], {'name': '', 'categories': '', 'priceList': ''})
+
+
+if __name__ == '__main__':
+    unittest.main()
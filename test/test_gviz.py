@@ -0,0 +1,115 @@
+import unittest
+from datetime import date, datetime
+from scripts.gviz import (
+    decode_gviz_payload, read_gviz_response, gviz_columns, gviz_rows,
+    gviz_to_columns, parse_gviz_date, merge_gviz_windows,
+)
+
+
+PAYLOAD = (
+    '/*O_o*/\ngoogle.visualization.Query.setResponse('
+    '{"version":"0.6","reqId":"0","status":"ok","sig":"123",'
+    '"table":{"cols":[{"id":"A","label":"CODIGO","type":"string"},'
+    '{"id":"B","label":"PRECIO","type":"number","pattern":"General"}],'
+    '"rows":[{"c":[{"v":"P100"},{"v":1500.0}]},{"c":[{"v":"Ñandú"},null]}],'
+    '"parsedNumHeaders":1}});'
+)
+
+
+class FakeResponse:
+    """Respuesta mínima con la interfaz de requests usada por read_gviz_response"""
+
+    def __init__(self, body, encoding='utf-8'):
+        self.body = body.encode('utf-8')
+        self.encoding = encoding  # el que requests deduce de los headers
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self.body), chunk_size):
+            yield self.body[i:i + chunk_size]
+
+
+class TestGviz(unittest.TestCase):
+    def test_decode_payload(self):
+        data = decode_gviz_payload(PAYLOAD)
+        self.assertEqual(len(gviz_rows(data)), 2)
+        self.assertEqual(gviz_rows(data)[1]['c'][0]['v'], 'Ñandú')
+
+    def test_prefix_length_does_not_matter(self):
+        data = decode_gviz_payload(PAYLOAD.replace('/*O_o*/\n', ''))
+        self.assertEqual(gviz_rows(data)[0]['c'][0]['v'], 'P100')
+
+    def test_columns_metadata(self):
+        cols = gviz_columns(decode_gviz_payload(PAYLOAD))
+        self.assertEqual([c['type'] for c in cols], ['string', 'number'])
+        self.assertEqual(cols[1]['label'], 'PRECIO')
+        self.assertIsNone(cols[0]['pattern'])
+
+    def test_read_response_in_chunks(self):
+        # Bloques chicos cortan caracteres multibyte a la mitad
+        data = read_gviz_response(FakeResponse(PAYLOAD), chunk_size=7)
+        self.assertEqual(gviz_rows(data)[1]['c'][0]['v'], 'Ñandú')
+
+    def test_read_response_ignores_header_encoding(self):
+        # Sin charset en el Content-Type, requests informa ISO-8859-1
+        data = read_gviz_response(FakeResponse(PAYLOAD, encoding='ISO-8859-1'))
+        self.assertEqual(gviz_rows(data)[1]['c'][0]['v'], 'Ñandú')
+
+    def test_missing_envelope(self):
+        with self.assertRaises(ValueError):
+            decode_gviz_payload('<html>Sign in</html>')
+
+    def test_error_status(self):
+        error = 'google.visualization.Query.setResponse({"status":"error","errors":[{"message":"Acceso denegado"}]});'
+        with self.assertRaisesRegex(ValueError, 'Acceso denegado'):
+            decode_gviz_payload(error)
+
+    def test_to_columns(self):
+        cols, columnas = gviz_to_columns(decode_gviz_payload(PAYLOAD))
+        self.assertEqual(len(cols), 2)
+        self.assertEqual(columnas, [['P100', 'Ñandú'], [1500.0, None]])
+
+    def test_to_columns_decodes_dates(self):
+        data = {'table': {
+            'cols': [{'id': 'A', 'type': 'date'}, {'id': 'B', 'type': 'datetime'}],
+            'rows': [{'c': [{'v': 'Date(2025,11,31)'}, {'v': 'Date(2026,7,21,14,2,10)'}]}, {'c': [None]}],
+        }}
+        _, columnas = gviz_to_columns(data)
+        self.assertEqual(columnas[0], [date(2025, 12, 31), None])
+        self.assertEqual(columnas[1], [datetime(2026, 8, 21, 14, 2, 10), None])
+
+        _, crudas = gviz_to_columns(data, decode_dates=False)
+        self.assertEqual(crudas[0][0], 'Date(2025,11,31)')
+
+    def test_parse_date_passthrough(self):
+        self.assertEqual(parse_gviz_date('2025-12-31'), '2025-12-31')
+        self.assertEqual(parse_gviz_date(None), None)
+
+
+def ventana(codigos, cols=None):
+    return {'table': {
+        'cols': cols or [{'id': 'A', 'label': 'CODIGO', 'type': 'string'}],
+        'rows': [{'c': [{'v': c}]} for c in codigos],
+    }}
+
+
+class TestMergeWindows(unittest.TestCase):
+    def test_merge_in_order(self):
+        data = merge_gviz_windows([(0, ventana(['a', 'b'])), (2, ventana(['c', 'd'])), (4, ventana(['e']))], 2)
+        self.assertEqual([r['c'][0]['v'] for r in gviz_rows(data)], ['a', 'b', 'c', 'd', 'e'])
+
+    def test_missing_rows(self):
+        with self.assertRaises(ValueError):
+            merge_gviz_windows([(0, ventana(['a'])), (2, ventana(['c']))], 2)
+
+    def test_duplicated_boundary(self):
+        with self.assertRaises(ValueError):
+            merge_gviz_windows([(0, ventana(['a', 'b'])), (2, ventana(['b', 'c']))], 2)
+
+    def test_columns_mismatch(self):
+        otras = [{'id': 'A', 'label': 'ARTICULO', 'type': 'string'}]
+        with self.assertRaises(ValueError):
+            merge_gviz_windows([(0, ventana(['a', 'b'])), (2, ventana(['c'], otras))], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+import os
+import struct
+import threading
+import unittest
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from scripts.image_probe import dimensiones_de_cabecera, sondear_imagen, BYTES_INICIALES
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+IMG_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'img')
+
+FIXTURES = {
+    'logo.png': (300, 309, 'png'),
+    'no-img.png': (533, 541, 'png'),
+    'login-bg.png': (2048, 1384, 'png'),
+    'loading-product.gif': (150, 150, 'gif'),
+    'placeholder.jpg': (980, 980, 'jpeg'),
+}
+
+
+def _cabecera(nombre, largo=BYTES_INICIALES):
+    with open(os.path.join(IMG_DIR, nombre), 'rb') as f:
+        return f.read(largo)
+
+
+def _jpeg(ancho, alto, orientacion=None):
+    datos = b'\xff\xd8'
+    if orientacion is not None:
+        # APP1 Exif con un IFD de una sola entrada (Orientation)
+        tiff = b'II*\x00' + struct.pack('<I', 8) + struct.pack('<H', 1)
+        tiff += struct.pack('<HHIHH', 0x0112, 3, 1, orientacion, 0) + b'\x00\x00\x00\x00'
+        segmento = b'Exif\x00\x00' + tiff
+        datos += b'\xff\xe1' + struct.pack('>H', len(segmento) + 2) + segmento
+    sof = b'\x08' + struct.pack('>HH', alto, ancho) + b'\x03' + b'\x01\x22\x00' * 3
+    return datos + b'\xff\xc0' + struct.pack('>H', len(sof) + 2) + sof
+
+
+def _webp(chunk, payload):
+    cuerpo = b'WEBP' + chunk + struct.pack('<I', len(payload)) + payload
+    return b'RIFF' + struct.pack('<I', len(cuerpo)) + cuerpo
+
+
+class TestCabeceras(unittest.TestCase):
+    def test_fixture_images(self):
+        for nombre, esperado in FIXTURES.items():
+            self.assertEqual(dimensiones_de_cabecera(_cabecera(nombre)), esperado, nombre)
+
+    def test_jpeg_exif_orientation(self):
+        self.assertEqual(dimensiones_de_cabecera(_jpeg(1200, 900)), (1200, 900, 'jpeg'))
+        self.assertEqual(dimensiones_de_cabecera(_jpeg(1200, 900, orientacion=6)), (900, 1200, 'jpeg'))
+
+    def test_webp_variants(self):
+        vp8 = b'\x00' * 3 + b'\x9d\x01\x2a' + struct.pack('<HH', 640, 480)
+        self.assertEqual(dimensiones_de_cabecera(_webp(b'VP8 ', vp8)), (640, 480, 'webp'))
+        bits = (640 - 1) | ((480 - 1) << 14)
+        vp8l = b'\x2f' + struct.pack('<I', bits)
+        self.assertEqual(dimensiones_de_cabecera(_webp(b'VP8L', vp8l + b'\x00' * 5)), (640, 480, 'webp'))
+        vp8x = b'\x00' * 4 + (640 - 1).to_bytes(3, 'little') + (480 - 1).to_bytes(3, 'little')
+        self.assertEqual(dimensiones_de_cabecera(_webp(b'VP8X', vp8x)), (640, 480, 'webp'))
+
+    def test_truncated_or_unknown(self):
+        self.assertIsNone(dimensiones_de_cabecera(_cabecera('placeholder.jpg', 20)))
+        self.assertIsNone(dimensiones_de_cabecera(b'<html>no es una imagen</html>'))
+
+
+class _RangeHandler(SimpleHTTPRequestHandler):
+    """Sirve img/ respetando `Range: bytes=0-N` (salvo en /sin-range/)"""
+    pedidos = []
+
+    def do_GET(self):
+        _RangeHandler.pedidos.append((self.path, self.headers.get('Range')))
+        ignorar = self.path.startswith('/sin-range/')
+        path = self.translate_path(self.path.replace('/sin-range/', '/', 1))
+        if not os.path.isfile(path):
+            self.send_error(404)
+            return
+        with open(path, 'rb') as f:
+            contenido = f.read()
+        rango = self.headers.get('Range')
+        if rango and not ignorar:
+            fin = min(int(rango.split('-')[1]), len(contenido) - 1)
+            self.send_response(206)
+            self.send_header('Content-Range', f'bytes 0-{fin}/{len(contenido)}')
+            contenido = contenido[:fin + 1]
+        else:
+            self.send_response(200)
+        self.send_header('Content-Length', str(len(contenido)))
+        self.end_headers()
+        self.wfile.write(contenido)
+
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipIf(requests is None, 'requests no está instalado')
+class TestSondeoHTTP(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), partial(_RangeHandler, directory=IMG_DIR))
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        cls.session = requests.Session()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.session.close()
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_probe_uses_range(self):
+        _RangeHandler.pedidos.clear()
+        self.assertEqual(sondear_imagen(self.session, f'{self.base}/login-bg.png'), (2048, 1384, 'png'))
+        self.assertEqual(_RangeHandler.pedidos, [('/login-bg.png', f'bytes=0-{BYTES_INICIALES - 1}')])
+
+    def test_server_ignoring_range(self):
+        self.assertEqual(sondear_imagen(self.session, f'{self.base}/sin-range/logo.png'), (300, 309, 'png'))
+
+    def test_missing_image(self):
+        with self.assertRaises(requests.HTTPError):
+            sondear_imagen(self.session, f'{self.base}/no-existe.png')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import json
+import os
+import unittest
+from unittest import mock
+from scripts import json_backend
+from scripts.json_backend import dumps_bytes, loads, compatible_con_orjson
+
+CASOS = [
+    {'P100': {'name': 'ALAMBRE Nº14 “x” 😀\x7f', 'category': '8.ALAMBRE', 'bulk': 10.0,
+              'prices': {'D': 1161, 'E': 1250, 'F': 1072}}},
+    {'vacios': {}, 'lista': [], 'anidado': [[], {}], 'nulo': None, 'bool': True, 'texto': 'a\b\f\n\r\t\x00"\\/'},
+    {'exponentes': [1e16, 1.5e-07, 1e22, 0.0, -0.0, 12345678.9]},
+    {'no_finitos': [float('nan'), float('inf')]},
+    {1: 'clave entera', 'grande': 2 ** 70},
+]
+
+
+@unittest.skipIf(json_backend.orjson is None, 'orjson no está instalado')
+class TestJsonBackend(unittest.TestCase):
+    def test_byte_compatible_with_stdlib(self):
+        for data in CASOS:
+            for ensure_ascii in (True, False):
+                for sort_keys in (False, True):
+                    if sort_keys and 1 in data:
+                        continue  # la estándar tampoco puede ordenar claves mezcladas
+                    esperado = json.dumps(data, indent=2, ensure_ascii=ensure_ascii, sort_keys=sort_keys)
+                    self.assertEqual(dumps_bytes(data, indent=2, ensure_ascii=ensure_ascii, sort_keys=sort_keys),
+                                     esperado.encode('utf-8'))
+                    compacto = json.dumps(data, separators=(',', ':'), ensure_ascii=ensure_ascii, sort_keys=sort_keys)
+                    self.assertEqual(dumps_bytes(data, ensure_ascii=ensure_ascii, sort_keys=sort_keys, minificar=True),
+                                     compacto.encode('utf-8'))
+
+    def test_incompatible_data_is_detected(self):
+        self.assertTrue(compatible_con_orjson(CASOS[0]))
+        self.assertFalse(compatible_con_orjson(CASOS[2]))
+        self.assertFalse(compatible_con_orjson(CASOS[3]))
+        self.assertFalse(compatible_con_orjson(CASOS[4]))
+
+    def test_loads_falls_back_for_nan(self):
+        self.assertTrue(loads(b'{"a": NaN}')['a'] != loads(b'{"a": NaN}')['a'])
+        self.assertEqual(loads('{"a": 1}'), {'a': 1})
+
+    def test_stdlib_can_be_forced(self):
+        with mock.patch.dict(os.environ, {'JSON_BACKEND': 'json'}):
+            self.assertEqual(json_backend.backend(), 'json')
+
+
+if __name__ == '__main__':
+    unittest.main()
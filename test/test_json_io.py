@@ -0,0 +1,76 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from scripts.json_io import write_json, conservar_marcas, COMPRIMIR_DESDE
+
+
+class TestJsonIO(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'productos.json')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_same_format_as_json_dump(self):
+        data = {'P100': {'name': 'ALAMBRE Nº14', 'prices': {'D': 1161}}}
+        write_json(self.path, data, indent=2)
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), json.dumps(data, indent=2))
+
+    def test_skips_unchanged_content(self):
+        self.assertTrue(write_json(self.path, {'a': 1}))
+        os.utime(self.path, (0, 0))
+        self.assertFalse(write_json(self.path, {'a': 1}))
+        self.assertEqual(os.stat(self.path).st_mtime, 0)
+        self.assertTrue(write_json(self.path, {'a': 2}))
+
+    def test_regular_file_permissions(self):
+        from scripts import json_io
+        with mock.patch.object(json_io.os, 'umask', side_effect=AssertionError('no debe tocar la umask')):
+            write_json(self.path, {'a': 1})
+        self.assertEqual(os.stat(self.path).st_mode & 0o777, json_io.MODO_ARCHIVO)
+
+    def test_no_temp_files_left(self):
+        write_json(self.path, {'a': 1})
+        self.assertEqual(os.listdir(self.dir.name), ['productos.json'])
+
+    def test_keeps_timestamps_when_data_is_equal(self):
+        write_json(self.path, {'lastUpdate': 'ayer', 'images': {'A': 'id1'}}, conservar=('lastUpdate',))
+        self.assertFalse(write_json(self.path, {'lastUpdate': 'hoy', 'images': {'A': 'id1'}}, conservar=('lastUpdate',)))
+        self.assertTrue(write_json(self.path, {'lastUpdate': 'hoy', 'images': {'A': 'id2'}}, conservar=('lastUpdate',)))
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)['lastUpdate'], 'hoy')
+
+    def test_nested_timestamps_only_change_where_data_changed(self):
+        anterior = {'A': {'ratio': 1.0, 'lastCalculated': 't0'}, 'B': {'ratio': 1.5, 'lastCalculated': 't0'}}
+        nuevo = {'A': {'ratio': 1.0, 'lastCalculated': 't1'}, 'B': {'ratio': 1.78, 'lastCalculated': 't1'}}
+        resultado = conservar_marcas(nuevo, anterior, {'lastCalculated'})
+        self.assertEqual(resultado['A']['lastCalculated'], 't0')
+        self.assertEqual(resultado['B']['lastCalculated'], 't1')
+
+    def test_minified_output(self):
+        data = {'P100': {'name': 'ALAMBRE', 'prices': {'D': 1161}}}
+        with mock.patch.dict(os.environ, {'JSON_MINIFY': '1'}):
+            write_json(self.path, data)
+        with open(self.path, encoding='utf-8') as f:
+            self.assertEqual(f.read(), '{"P100":{"name":"ALAMBRE","prices":{"D":1161}}}')
+
+    def test_precompressed_sidecars_follow_content(self):
+        data = {f'P{i}': {'name': f'ARTICULO {i}'} for i in range(COMPRIMIR_DESDE // 10)}
+        with mock.patch.dict(os.environ, {'JSON_PRECOMPRESS': '1'}):
+            write_json(self.path, data)
+        with open(self.path, 'rb') as f, open(self.path + '.gz', 'rb') as gz:
+            self.assertEqual(gzip.decompress(gz.read()), f.read())
+
+        # Sin precompresión, al reescribir se borran las variantes desactualizadas
+        with mock.patch.dict(os.environ, {'JSON_PRECOMPRESS': '0'}):
+            write_json(self.path, {'a': 1})
+        self.assertFalse(os.path.exists(self.path + '.gz'))
+
+
+if __name__ == '__main__':
+    unittest.main()
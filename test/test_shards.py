@@ -0,0 +1,52 @@
+import hashlib
+import json
+import os
+import tempfile
+import unittest
+from scripts.shards import agrupar_productos, escribir_shards, MASTER_INDEX
+
+PRODUCTOS = {
+    'ABF2031000': {'name': 'ALAMBRE', 'category': '8.ALAMBRE DE FARDO AB', 'bulk': 10.0, 'prices': {'D': 1161}},
+    'ABR9612': {'name': 'RESISTENCIA', 'category': '1.DUCHA ELECTRICA/ACCESO', 'bulk': 1.0, 'prices': {'D': 3604}},
+    'BM100': {'name': 'BULON', 'category': '8.BULONES', 'bulk': 1.0, 'prices': {'D': 50}},
+}
+
+
+class TestShards(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_groups_by_category_family(self):
+        shards = agrupar_productos(PRODUCTOS, 'rubro')
+        self.assertEqual(list(shards), ['1', '8'])
+        self.assertEqual(list(shards['8']), ['ABF2031000', 'BM100'])
+
+    def test_groups_by_code_prefix(self):
+        self.assertEqual(list(agrupar_productos(PRODUCTOS, 'prefijo')), ['a', 'b'])
+
+    def test_manifest_describes_shards(self):
+        indice = escribir_shards(PRODUCTOS, 'rubro', directorio=self.dir.name)
+        self.assertEqual(indice['metadata']['totalProducts'], 3)
+        reunidos = {}
+        for shard in indice['shards']:
+            with open(os.path.join(self.dir.name, shard['file']), 'rb') as f:
+                contenido = f.read()
+            self.assertEqual(shard['bytes'], len(contenido))
+            self.assertEqual(shard['hash'], hashlib.sha256(contenido).hexdigest())
+            self.assertEqual(shard['count'], len(json.loads(contenido)))
+            reunidos.update(json.loads(contenido))
+        self.assertEqual(reunidos, PRODUCTOS)
+        self.assertIn('8.BULONES', indice['shards'][1]['categories'])
+
+    def test_removes_stale_shards(self):
+        escribir_shards(PRODUCTOS, 'prefijo', directorio=self.dir.name)
+        escribir_shards(PRODUCTOS, 'rubro', directorio=self.dir.name)
+        self.assertEqual(sorted(os.listdir(self.dir.name)),
+                         [MASTER_INDEX, 'productos_1.json', 'productos_8.json'])
+
+
+if __name__ == '__main__':
+    unittest.main()